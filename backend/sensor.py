@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from .sensorsutils import SensorsUtils
 
 class Sensor:
     """
@@ -9,8 +10,20 @@ class Sensor:
     Sensor instance must declare following members:
      - TYPES (list): list of supported sensors types (temperature, motion, humidity, pressure...)
      - SUBTYPE (string): name of subtype. Usually name of sensor type (dht, onewire...)
+
+    Sensor instance can declare following members:
+     - READERS (list): names of static hardware reader functions. They can be run in a worker process
+       when process isolation is enabled (see _run_reader)
+     - MULTI_CHANNEL (bool): True if a physical sensor is stored as several sensors (one per TYPES
+       channel) sharing the same physicaluuid field (see _get_channels)
+     - EVENTS (list): names of events handled by process_event. Gpio events are routed to addon of
+       sensor connected to event gpio, other events are sent to addon without sensor
     """
 
+    READERS = []
+    MULTI_CHANNEL = False
+    EVENTS = []
+
     def __init__(self, sensors):
         """
         Constructor
@@ -24,20 +37,28 @@ class Sensor:
         # will be filled by sensors during module configuration
         self.raspi_gpios = {}
         self.drivers = {}
+        # will be set by sensors when process isolation is enabled
+        self.worker = None
         self.cleep_filesystem = sensors.cleep_filesystem
-        self.__task = None
         self._check_parameters = sensors._check_parameters
 
         # trick to avoid pylint errors about protected function access
         self.sensors_fn = {
             "register_driver": self.sensors._register_driver,
             "get_event": self.sensors._get_event,
-            "update_device": self.sensors._update_device,
+            "update_fields": self.sensors._update_sensor_fields,
+            "update_channels": self.sensors._update_sensors_fields,
+            "get_channels": self.sensors._get_sensor_channels,
+            "check_deadband": self.sensors._check_sensor_deadband,
+            "add_stats": self.sensors._add_sensor_stats,
             "search_device": self.sensors._search_device,
             "search_devices": self.sensors._search_devices,
             "search_by_gpio": self.sensors._search_by_gpio,
             "get_device": self.sensors._get_device,
+            "get_device_field": self.sensors._get_device_field,
             "get_assigned_gpios": self.sensors._get_assigned_gpios,
+            "get_batch_value": self.sensors._get_batch_value,
+            "submit_event_job": self.sensors._submit_event_job,
         }
 
     def _register_driver(self, driver):
@@ -76,12 +97,79 @@ class Sensor:
 
     def update_value(self, sensor):
         """
-        Update sensor values (timestamp, temperature, motion status...)
+        Update sensor values (timestamp, temperature, motion status...).
+        Values are kept in memory and periodically persisted by sensors module
 
         Args:
             sensor (dict): sensor data
+
+        Returns:
+            bool: True if values updated
+        """
+        fields = {field: sensor[field] for field in SensorsUtils.READING_FIELDS if field in sensor}
+        return self.update_fields(sensor["uuid"], fields) is not None
+
+    def update_fields(self, sensor_uuid, fields):
         """
-        return self.sensors_fn["update_device"](sensor["uuid"], sensor)
+        Update only specified sensor reading fields. Unchanged fields are no-ops
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            fields (dict): reading fields to update (celsius, lastupdate...)
+
+        Returns:
+            dict: changed fields, None if sensor doesn't exist
+        """
+        return self.sensors_fn["update_fields"](sensor_uuid, fields)
+
+    def update_channels(self, fields_by_sensor):
+        """
+        Update reading fields of all channels of a physical device at once (atomic update)
+
+        Args:
+            fields_by_sensor (dict): reading fields to update by channel sensor uuid
+
+        Returns:
+            dict: changed fields by sensor uuid, None if a sensor doesn't exist
+        """
+        return self.sensors_fn["update_channels"](fields_by_sensor)
+
+    def _check_deadband(self, sensor, values):
+        """
+        Check if polled sensor values must be reported (events and persistence) according to sensor
+        deadband and heartbeat
+
+        Args:
+            sensor (dict): sensor data
+            values (dict): polled values by field (celsius, humidity...)
+
+        Returns:
+            bool: True if values must be reported, False if they are invalid or didn't change enough
+        """
+        return self.sensors_fn["check_deadband"](sensor["uuid"], values)
+
+    def _add_stats(self, sensor, values):
+        """
+        Add polled sensor values to sensor statistics. All polled values must be added, including
+        the ones filtered by sensor deadband
+
+        Args:
+            sensor (dict): sensor data
+            values (dict): polled values by field (celsius, humidity...)
+        """
+        self.sensors_fn["add_stats"](sensor["uuid"], values)
+
+    def _get_channels(self, sensor):
+        """
+        Return channels of sensor physical device
+
+        Args:
+            sensor (dict): one of physical device channels
+
+        Returns:
+            dict: channels sensors by sensor type
+        """
+        return self.sensors_fn["get_channels"](sensor["uuid"])
 
     def _search_device(self, key, value):
         """
@@ -111,19 +199,36 @@ class Sensor:
             gpio_uuid (string): gpio uuid to search
 
         Returns:
-            dict: sensor data or None if nothing found
+            MappingProxyType: read-only sensor data or None if nothing found
         """
         return self.sensors_fn["search_by_gpio"](gpio_uuid)
 
     def _get_device(self, uuid):
         """
-        Return device according to uuid
+        Return read-only device according to uuid. Readings are not part of returned device (see
+        _get_device_field)
 
         Args:
             uuid (string): device uuid
+
+        Returns:
+            MappingProxyType: read-only device data or None if device doesn't exist
         """
         return self.sensors_fn["get_device"](uuid)
 
+    def _get_device_field(self, sensor, key):
+        """
+        Return sensor field value. Reading fields are read from sensors readings
+
+        Args:
+            sensor (dict): sensor data
+            key (str): field key
+
+        Returns:
+            any: field value or None if field doesn't exist
+        """
+        return self.sensors_fn["get_device_field"](sensor, key)
+
     def _get_assigned_gpios(self):
         """
         Return assigned gpios
@@ -133,6 +238,46 @@ class Sensor:
         """
         return self.sensors_fn["get_assigned_gpios"]()
 
+    def _submit_event_job(self, func, *args):
+        """
+        Queue function execution in lane processing gpio events (timers callbacks...)
+
+        Args:
+            func (callable): function to execute
+            *args: function arguments
+        """
+        self.sensors_fn["submit_event_job"](func, *args)
+
+    def _get_batch_value(self, key, loader):
+        """
+        Return value shared by all sensors of a bulk add (loaded once per batch)
+
+        Args:
+            key (str): value key
+            loader (callable): function returning value
+
+        Returns:
+            any: loaded value
+        """
+        return self.sensors_fn["get_batch_value"](key, loader)
+
+    def get_bus(self, sensor):
+        """
+        Return name of bus the sensor is connected to. Sensors on the same bus are read sequentially
+        during aligned sampling
+
+        Note:
+            Can be overwritten if addon sensors share a bus not identified by their gpio
+
+        Args:
+            sensor (dict): sensor data
+
+        Returns:
+            str: bus name
+        """
+        gpios = sensor.get("gpios") or []
+        return f"{self.SUBTYPE}:{gpios[0]['gpio']}" if gpios else self.SUBTYPE
+
     def update(self, sensor, params):  # pragma: no cover
         """
         Returns sensor data to update
@@ -218,35 +363,59 @@ class Sensor:
         Args:
             sensor (dict): sensor instance
 
+        Note:
+            A new task is built at each call. Sensors instance is in charge of keeping running tasks
+
         Returns:
-            Task: task instance that will be launched by sensors instance or None if no task needed
+            SensorTask: task instance that will be launched by sensors instance or None if no task needed
         """
-        # instanciate singleton
-        if self.__task is None:
-            self.__task = self._get_task(sensor)
-
-        return self.__task
+        return self._get_task(sensor)
 
     def _get_task(self, sensor):  # pragma: no cover
         """
         Prepare specific sensor task
 
         Args:
-            sensors (list): list of sensors data (dict)
+            sensor (dict): sensor data
 
         Returns:
-            Task: task instance that will be launched by sensors instance or None if no task needed
+            SensorTask: task instance that will be launched by sensors instance or None if no task needed
         """
         raise NotImplementedError(
             f'Function "get_task" must be implemented in "{self.__class__.__name__}"'
         )
 
+    def _run_reader(self, reader_name, *args):
+        """
+        Run hardware reader function. It is executed in addon worker process if process isolation
+        is enabled, in current thread otherwise
+
+        Args:
+            reader_name (str): reader function name (must be declared in READERS)
+            *args: reader function arguments
+
+        Returns:
+            any: reader function result
+        """
+        if self.worker:
+            return self.worker.call(reader_name, *args)
+        return getattr(self, reader_name)(*args)
+
+    def cancel_reads(self):
+        """
+        Cancel in-flight hardware reads. Called by sensors instance when application is stopped
+
+        Note:
+            Can be overwritten by addon that runs long reads
+        """
+        return
+
     def process_event(self, event, sensor):  # pragma: no cover
         """
         Process received event. Can be a gpio or driver event
 
         Args:
             event (MessageRequest): event
-            sensor (dict): sensor data
+            sensor (MappingProxyType): read-only sensor data (gpio event) or None
         """
         return
@@ -1,17 +1,25 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import asyncio
 import json
+import shlex
+import subprocess
+import threading
 import time
+from uuid import uuid4
 from cleep.exception import InvalidParameter
-from cleep.libs.internals.console import Console
 from .sensor import Sensor
 from .sensorsutils import SensorsUtils
+from .sensortask import SensorTask
 
 
 class SensorDht22(Sensor):
     """
     Sensor DHT22 addon
+
+    DHT22 physical device is stored as two channels (temperature and humidity sensors) sharing the
+    same physicaluuid. Channels are read by a single task and updated together.
     """
 
     TYPE_HUMIDITY = "humidity"
@@ -20,6 +28,10 @@ class SensorDht22(Sensor):
     SUBTYPE = "dht22"
 
     DHT22_CMD = "/usr/local/bin/dht22 %s"
+    DHT22_TIMEOUT = 11
+
+    READERS = ["_read_dht22_binary"]
+    MULTI_CHANNEL = True
 
     def __init__(self, sensors):
         """
@@ -34,27 +46,23 @@ class SensorDht22(Sensor):
         self.sensors_temperature_update = self._get_event("sensors.temperature.update")
         self.sensors_humidity_update = self._get_event("sensors.humidity.update")
 
-    def _get_dht22_devices(self, name):
+        # running dht22 processes
+        self.__processes = set()
+        self.__processes_lock = threading.Lock()
+
+    def _get_dht22_devices(self, sensor):
         """
-        Search for DHT22 devices using specified name
+        Return DHT22 channels of physical device of specified sensor
 
         Args:
-            name (string): device name
+            sensor (dict): one of DHT22 sensor (temperature or humidity)
 
         Returns:
             tuple: temperature and humidity sensors
         """
-        humidity_device = None
-        temperature_device = None
-
-        for device in self._search_devices("name", name):
-            if device["subtype"] == self.SUBTYPE:
-                if device["type"] == self.TYPE_TEMPERATURE:
-                    temperature_device = device
-                elif device["type"] == self.TYPE_HUMIDITY:
-                    humidity_device = device
+        channels = self._get_channels(sensor)
 
-        return (temperature_device, humidity_device)
+        return (channels.get(self.TYPE_TEMPERATURE), channels.get(self.TYPE_HUMIDITY))
 
     def add(self, params):
         """
@@ -129,6 +137,7 @@ class SensorDht22(Sensor):
                 f'Gpio "{params.get("gpio")}" does not exist for this raspberry pi'
             )
 
+        physical_uuid = str(uuid4())
         gpio_data = {
             "name": params.get("name") + "_dht22",
             "gpio": params.get("gpio"),
@@ -142,6 +151,7 @@ class SensorDht22(Sensor):
             "gpios": [],
             "type": self.TYPE_TEMPERATURE,
             "subtype": self.SUBTYPE,
+            "physicaluuid": physical_uuid,
             "interval": params.get("interval"),
             "offset": params.get("offset"),
             "offsetunit": params.get("offset_unit"),
@@ -155,6 +165,7 @@ class SensorDht22(Sensor):
             "gpios": [],
             "type": self.TYPE_HUMIDITY,
             "subtype": self.SUBTYPE,
+            "physicaluuid": physical_uuid,
             "interval": params.get("interval"),
             "lastupdate": int(time.time()),
             "humidity": None,
@@ -234,9 +245,9 @@ class SensorDht22(Sensor):
             ]
         )
 
-        # search all sensors with same name
+        # get all channels of physical device
         old_name = sensor["name"]
-        (temperature_device, humidity_device) = self._get_dht22_devices(sensor["name"])
+        (temperature_device, humidity_device) = self._get_dht22_devices(sensor)
 
         # reconfigure gpio
         gpios = []
@@ -288,8 +299,8 @@ class SensorDht22(Sensor):
         # check params
         self._check_parameters([{"name": "sensor", "value": sensor, "type": dict}])
 
-        # search all sensors with same name
-        (temperature_device, humidity_device) = self._get_dht22_devices(sensor["name"])
+        # get all channels of physical device
+        (temperature_device, humidity_device) = self._get_dht22_devices(sensor)
 
         # gpios
         gpios = [
@@ -308,20 +319,117 @@ class SensorDht22(Sensor):
             "sensors": sensors,
         }
 
+    @staticmethod
+    def _read_dht22_binary(cmd, timeout):  # pragma: no cover
+        """
+        Execute dht22 binary command and return its output. Used in worker process
+
+        Args:
+            cmd (str): dht22 command
+            timeout (float): command timeout
+
+        Returns:
+            dict: dht22 binary output
+        """
+        resp = subprocess.run(shlex.split(cmd), capture_output=True, timeout=timeout, check=False)
+        return json.loads(resp.stdout.decode("utf-8").splitlines()[0])
+
     def _execute_command(self, sensor):  # pragma: no cover
         """
         Execute dht22 binary command
         Useful for unit testing
         """
-        console = Console()
         cmd = self.DHT22_CMD % sensor["gpios"][0]["pin"]
         self.logger.debug('Read DHT22 sensor values from command "%s"', cmd)
-        resp = console.command(cmd, timeout=11)
-        self.logger.debug("Read DHT command response: %s", resp)
-        if resp["error"] or resp["killed"]:
-            self.logger.error("DHT22 command failed: %s", resp)
+        if self.worker:
+            return self._run_reader("_read_dht22_binary", cmd, self.DHT22_TIMEOUT)
 
-        return json.loads(resp["stdout"][0])
+        process = subprocess.Popen(shlex.split(cmd), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        with self.__processes_lock:
+            self.__processes.add(process)
+        try:
+            (stdout, stderr) = process.communicate(timeout=self.DHT22_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            (stdout, stderr) = process.communicate()
+        finally:
+            with self.__processes_lock:
+                self.__processes.discard(process)
+        self.logger.debug("Read DHT command response: %s (returncode=%s)", stdout, process.returncode)
+        if process.returncode != 0:
+            self.logger.error("DHT22 command failed: %s", stderr)
+
+        return json.loads(stdout.decode("utf-8").splitlines()[0])
+
+    def cancel_reads(self):
+        """
+        Kill running dht22 processes
+        """
+        with self.__processes_lock:
+            processes = list(self.__processes)
+        for process in processes:
+            self.logger.debug("Kill running DHT22 process %s", process.pid)
+            process.kill()
+
+    async def _async_execute_command(self, sensor):  # pragma: no cover
+        """
+        Execute dht22 binary command without blocking event loop.
+        Process is killed if coroutine is cancelled
+        """
+        cmd = self.DHT22_CMD % sensor["gpios"][0]["pin"]
+        self.logger.debug('Read DHT22 sensor values from command "%s"', cmd)
+        if self.worker:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._run_reader, "_read_dht22_binary", cmd, self.DHT22_TIMEOUT
+            )
+
+        process = await asyncio.create_subprocess_exec(
+            *shlex.split(cmd), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            (stdout, stderr) = await asyncio.wait_for(process.communicate(), self.DHT22_TIMEOUT)
+        except BaseException:
+            # timeout or cancellation
+            if process.returncode is None:
+                process.kill()
+            raise
+        self.logger.debug("Read DHT command response: %s (returncode=%s)", stdout, process.returncode)
+        if process.returncode != 0:
+            self.logger.error("DHT22 command failed: %s", stderr)
+
+        return json.loads(stdout.decode("utf-8").splitlines()[0])
+
+    def _convert_dht22_values(self, sensor, data):
+        """
+        Convert dht22 binary output to sensor values
+
+        Args:
+            sensor (dict): sensor data
+            data (dict): dht22 binary output
+
+        Returns:
+            tuple: (temp celsius, temp fahrenheit, humidity)
+
+        Raises:
+            RuntimeError: if dht22 binary failed
+        """
+        # check read errors
+        if len(data["error"]) > 0:
+            self.logger.error(
+                "Error occured during DHT22 command execution: %s", data["error"]
+            )
+            raise RuntimeError("DHT22 command failed")
+
+        # get DHT22 values
+        (temp_c, temp_f) = SensorsUtils.convert_temperatures_from_celsius(
+            data["celsius"], sensor["offset"], sensor["offsetunit"]
+        )
+        hum_p = data["humidity"]
+        self.logger.info(
+            "Read values from DHT22: %s°C, %s°F, %s%%", temp_c, temp_f, hum_p
+        )
+
+        return (temp_c, temp_f, hum_p)
 
     def _read_dht22(self, sensor):
         """
@@ -333,34 +441,32 @@ class SensorDht22(Sensor):
         Returns:
             tuple: (temp celsius, temp fahrenheit, humidity)
         """
-        temp_c = None
-        temp_f = None
-        hum_p = None
-
         try:
             # get values from external binary (binary hardcoded timeout set to 10 seconds)
             data = self._execute_command(sensor)
+            return self._convert_dht22_values(sensor, data)
+        except Exception:
+            self.logger.exception("Error executing DHT22 command")
 
-            # check read errors
-            if len(data["error"]) > 0:
-                self.logger.error(
-                    "Error occured during DHT22 command execution: %s", data["error"]
-                )
-                raise RuntimeError("DHT22 command failed")
+        return (None, None, None)
 
-            # get DHT22 values
-            (temp_c, temp_f) = SensorsUtils.convert_temperatures_from_celsius(
-                data["celsius"], sensor["offset"], sensor["offsetunit"]
-            )
-            hum_p = data["humidity"]
-            self.logger.info(
-                "Read values from DHT22: %s°C, %s°F, %s%%", temp_c, temp_f, hum_p
-            )
+    async def _async_read_dht22(self, sensor):
+        """
+        Read temperature from dht22 sensor without blocking event loop
+
+        Params:
+            sensor (dict): sensor data
 
+        Returns:
+            tuple: (temp celsius, temp fahrenheit, humidity)
+        """
+        try:
+            data = await self._async_execute_command(sensor)
+            return self._convert_dht22_values(sensor, data)
         except Exception:
             self.logger.exception("Error executing DHT22 command")
 
-        return (temp_c, temp_f, hum_p)
+        return (None, None, None)
 
     def _task(self, temperature_device, humidity_device):
         """
@@ -371,61 +477,105 @@ class SensorDht22(Sensor):
             humidity_device (dict): humidity sensor
         """
         # read values
-        (temp_c, temp_f, hum_p) = self._read_dht22(
+        values = self._read_dht22(
             (temperature_device or humidity_device)
         )
+        self._update_values(temperature_device, humidity_device, values)
+
+    async def _async_task(self, temperature_device, humidity_device):
+        """
+        DHT22 async task
+
+        Args:
+            temperature_device (dict): temperature sensor
+            humidity_device (dict): humidity sensor
+        """
+        values = await self._async_read_dht22(temperature_device or humidity_device)
+        # in-memory update, run on event loop
+        self._update_values(temperature_device, humidity_device, values)
+
+    def _update_values(self, temperature_device, humidity_device, values):
+        """
+        Update DHT22 sensors values at once and send events. Values that didn't move out of their
+        sensor deadband are not updated nor sent, only sensor last update is recorded
+
+        Args:
+            temperature_device (dict): temperature sensor
+            humidity_device (dict): humidity sensor
+            values (tuple): (temp celsius, temp fahrenheit, humidity) values
+        """
+        (temp_c, temp_f, hum_p) = values
 
         now = int(time.time())
+        fields_by_sensor = {}
+        reported = set()
         if temperature_device and temp_c is not None and temp_f is not None:
-            # temperature values are valid, update sensor values
-            temperature_device["celsius"] = temp_c
-            temperature_device["fahrenheit"] = temp_f
-            temperature_device["lastupdate"] = now
-
-            # and send event if update succeed (if not device may has been removed)
-            if self.update_value(temperature_device):
-                params = {
-                    "sensor": temperature_device["name"],
-                    "celsius": temp_c,
-                    "fahrenheit": temp_f,
-                    "lastupdate": now,
-                }
-                self.sensors_temperature_update.send(
-                    params=params, device_id=temperature_device["uuid"]
-                )
+            # temperature values are valid, update sensor values if they changed
+            fields = {"lastupdate": now}
+            self._add_stats(temperature_device, {"celsius": temp_c})
+            if self._check_deadband(temperature_device, {"celsius": temp_c}):
+                fields.update({"celsius": temp_c, "fahrenheit": temp_f})
+                reported.add(temperature_device["uuid"])
+            temperature_device.update(fields)
+            fields_by_sensor[temperature_device["uuid"]] = fields
 
         if humidity_device and hum_p is not None:
-            # humidity value is valid, update sensor value
-            humidity_device["humidity"] = hum_p
-            humidity_device["lastupdate"] = now
-
-            # and send event if update succeed (if not device may has been removed)
-            if self.update_value(humidity_device):
-                params = {
-                    "sensor": humidity_device["name"],
-                    "humidity": hum_p,
-                    "lastupdate": now,
-                }
-                self.sensors_humidity_update.send(
-                    params=params, device_id=humidity_device["uuid"]
-                )
+            # humidity value is valid, update sensor value if it changed
+            fields = {"lastupdate": now}
+            self._add_stats(humidity_device, {"humidity": hum_p})
+            if self._check_deadband(humidity_device, {"humidity": hum_p}):
+                fields["humidity"] = hum_p
+                reported.add(humidity_device["uuid"])
+            humidity_device.update(fields)
+            fields_by_sensor[humidity_device["uuid"]] = fields
 
         if temp_c is None and temp_f is None and hum_p is None:
             self.logger.warning("No value returned by DHT22 sensor!")
+        if not fields_by_sensor:
+            return
+
+        # send events if update succeed (if not device may has been removed)
+        if self.update_channels(fields_by_sensor) is None:
+            return
+
+        if temperature_device and temperature_device["uuid"] in reported:
+            params = {
+                "sensor": temperature_device["name"],
+                "celsius": temp_c,
+                "fahrenheit": temp_f,
+                "lastupdate": now,
+            }
+            self.sensors_temperature_update.send(
+                params=params, device_id=temperature_device["uuid"]
+            )
+
+        if humidity_device and humidity_device["uuid"] in reported:
+            params = {
+                "sensor": humidity_device["name"],
+                "humidity": hum_p,
+                "lastupdate": now,
+            }
+            self.sensors_humidity_update.send(
+                params=params, device_id=humidity_device["uuid"]
+            )
 
     def _get_task(self, sensor):
         """
-        Prepare task for DHT sensor only. It should have 2 devices with the same name.
+        Prepare single task reading both channels of DHT22 physical device
 
         Args:
             sensor (dict): one of DHT22 sensor (temperature or humidity)
 
         Returns:
-            Task: sensor task
+            SensorTask: sensor task
         """
-        # search all sensors with same name
-        (temperature_device, humidity_device) = self._get_dht22_devices(sensor["name"])
-
-        return self.task_factory.create_task(
-            float(sensor["interval"]), self._task, [temperature_device, humidity_device]
+        # get all channels of physical device
+        (temperature_device, humidity_device) = self._get_dht22_devices(sensor)
+
+        return SensorTask(
+            float(sensor["interval"]),
+            self._task,
+            [temperature_device, humidity_device],
+            self.logger,
+            async_task=self._async_task,
         )
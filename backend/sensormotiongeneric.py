@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import threading
 import time
 from cleep.exception import InvalidParameter
 from .sensor import Sensor
@@ -8,12 +9,20 @@ from .sensor import Sensor
 class SensorMotionGeneric(Sensor):
     """
     Sensor motion addon
+
+    Gpio edges are turned into motion sessions according to sensor settings:
+     - debounce: motion must last at least debounce seconds to start a session, shorter motions
+       (sensor chatter) are ignored
+     - holdtime: session ends holdtime seconds after last motion. Motion retriggered within hold time
+       keeps session on, so a session produces a single on and a single off event
     """
 
     TYPE_MOTION = "motion"
     TYPES = [TYPE_MOTION]
     SUBTYPE = "generic"
 
+    EVENTS = ["gpios.gpio.on", "gpios.gpio.off"]
+
     def __init__(self, sensors):
         """
         Constructor
@@ -27,6 +36,10 @@ class SensorMotionGeneric(Sensor):
         self.sensors_motion_on = self._get_event("sensors.motion.on")
         self.sensors_motion_off = self._get_event("sensors.motion.off")
 
+        # motion sessions by sensor uuid
+        self.__sessions = {}
+        self.__sessions_lock = threading.Lock()
+
     def add(self, params):
         """
         Return sensor data to add.
@@ -39,6 +52,8 @@ class SensorMotionGeneric(Sensor):
                     name (str): sensor name
                     gpio (str): used gpio
                     inverted (bool): True if gpio is inverted
+                    debounce (int): minimum motion duration (seconds). Optional, default 0
+                    holdtime (int): duration session stays on after last motion (seconds). Optional, default 0
                 }
 
         Returns:
@@ -70,6 +85,20 @@ class SensorMotionGeneric(Sensor):
                 'message': f'Gpio "{params.get("gpio")}" is already used',
             },
             {'name': 'inverted', 'value': params.get("inverted"), 'type': bool},
+            {
+                'name': 'debounce',
+                'value': params.get("debounce", 0),
+                'type': int,
+                'validator': lambda val: val >= 0,
+                'message': 'Debounce must be positive',
+            },
+            {
+                'name': 'holdtime',
+                'value': params.get("holdtime", 0),
+                'type': int,
+                'validator': lambda val: val >= 0,
+                'message': 'Hold time must be positive',
+            },
         ])
         # TODO add new validator directly in Cleep core
         self.logger.debug('Gpios: %s', self.raspi_gpios)
@@ -92,6 +121,8 @@ class SensorMotionGeneric(Sensor):
             "subtype": self.SUBTYPE,
             "on": False,
             "inverted": params.get("inverted"),
+            "debounce": params.get("debounce", 0),
+            "holdtime": params.get("holdtime", 0),
             "lastupdate": 0,
             "lastduration": 0,
         }
@@ -123,6 +154,9 @@ class SensorMotionGeneric(Sensor):
                 {
                     name (str): sensor name
                     inverted (bool): True if gpio is inverted
+                    debounce (int): minimum motion duration (seconds). Optional, current value by default
+                    holdtime (int): duration session stays on after last motion (seconds). Optional,
+                        current value by default
                 }
 
         Returns:
@@ -151,6 +185,20 @@ class SensorMotionGeneric(Sensor):
                 'message': f'Name "{params.get("name")}" is already used',
             },
             {'name': 'inverted', 'value': params.get("inverted"), 'type': bool},
+            {
+                'name': 'debounce',
+                'value': params.get("debounce", sensor.get("debounce", 0)),
+                'type': int,
+                'validator': lambda val: val >= 0,
+                'message': 'Debounce must be positive',
+            },
+            {
+                'name': 'holdtime',
+                'value': params.get("holdtime", sensor.get("holdtime", 0)),
+                'type': int,
+                'validator': lambda val: val >= 0,
+                'message': 'Hold time must be positive',
+            },
         ])
 
         gpio_data = {
@@ -163,6 +211,8 @@ class SensorMotionGeneric(Sensor):
         # update sensor
         sensor["name"] = params.get("name")
         sensor["inverted"] = params.get("inverted")
+        sensor["debounce"] = params.get("debounce", sensor.get("debounce", 0))
+        sensor["holdtime"] = params.get("holdtime", sensor.get("holdtime", 0))
 
         return {
             "gpios": [
@@ -179,45 +229,197 @@ class SensorMotionGeneric(Sensor):
 
         Args:
             event (MessageRequest): event
-            sensor (dict): sensor data
+            sensor (MappingProxyType): read-only sensor data
         """
         # get current time
-        now = int(time.time())
-
-        if event["event"] == "gpios.gpio.on" and not sensor["on"]:
-            # sensor not yet triggered, trigger it
-            self.logger.debug('Motion sensor "%s" turned on', sensor["name"])
-
-            # motion sensor triggered
-            sensor["lastupdate"] = now
-            sensor["on"] = True
-            self.update_value(sensor)
-
-            # new motion event
-            self.sensors_motion_on.send(
-                params={"sensor": sensor["name"], "lastupdate": now},
-                device_id=sensor["uuid"],
-            )
-
-        elif event["event"] == "gpios.gpio.off" and sensor["on"]:
-            # sensor is triggered, need to stop it
-            self.logger.debug('Motion sensor "%s" turned off', sensor["name"])
-
-            # motion sensor triggered
-            sensor["lastupdate"] = now
-            sensor["on"] = False
-            sensor["lastduration"] = event["params"]["duration"]
-            self.update_value(sensor)
-
-            # new motion event
-            self.sensors_motion_off.send(
-                params={
-                    "sensor": sensor["name"],
-                    "duration": sensor["lastduration"],
-                    "lastupdate": now,
-                },
-                device_id=sensor["uuid"],
-            )
+        now = time.time()
+
+        if sensor.get("debounce", 0) <= 0 and sensor.get("holdtime", 0) <= 0:
+            with self.__sessions_lock:
+                tracked = sensor["uuid"] in self.__sessions
+            if not tracked:
+                # no session settings, gpio events drive sensor state
+                self.__process_gpio_event(event, sensor, now)
+                return
+
+        if event["event"] == "gpios.gpio.on":
+            with self.__sessions_lock:
+                session = self.__sessions.get(sensor["uuid"])
+                if session and session["ending"]:
+                    # motion retriggered during hold time, session goes on
+                    self.logger.debug('Motion sensor "%s" retriggered', sensor["name"])
+                    self.__cancel_session_timer(session)
+                    session["ending"] = False
+                    return
+                if self._get_device_field(sensor, "on") or session:
+                    # sensor already triggered or session start is debounced
+                    return
+
+                session = {"start": now, "ending": False, "timer": None, "duration": 0}
+                self.__sessions[sensor["uuid"]] = session
+                if sensor.get("debounce", 0) > 0:
+                    self.__start_session_timer(session, sensor.get("debounce"), self._start_session, sensor["uuid"])
+                    return
+
+            self._turn_on(sensor, int(now))
+
+        elif event["event"] == "gpios.gpio.off":
+            with self.__sessions_lock:
+                session = self.__sessions.get(sensor["uuid"])
+                if session and not session["ending"] and session["timer"]:
+                    # motion shorter than debounce, drop it
+                    self.logger.debug('Motion sensor "%s" debounced', sensor["name"])
+                    self.__cancel_session_timer(session)
+                    del self.__sessions[sensor["uuid"]]
+                    return
+                if (not self._get_device_field(sensor, "on") and not session) or (session and session["ending"]):
+                    return
+
+                # sensor is triggered, need to stop it
+                duration = round(now - session["start"], 2) if session else event["params"]["duration"]
+                if sensor.get("holdtime", 0) > 0:
+                    session = session or {"start": now - duration, "timer": None}
+                    session["ending"] = True
+                    session["duration"] = duration
+                    self.__sessions[sensor["uuid"]] = session
+                    self.__start_session_timer(session, sensor.get("holdtime"), self._end_session, sensor["uuid"])
+                    return
+                self.__sessions.pop(sensor["uuid"], None)
+
+            self._turn_off(sensor, int(now), duration)
+
+    def __process_gpio_event(self, event, sensor, now):
+        """
+        Process gpio event of sensor without session settings: motion duration is the one reported
+        by gpio
+
+        Args:
+            event (MessageRequest): event
+            sensor (MappingProxyType): read-only sensor data
+            now (float): event timestamp
+        """
+        on = self._get_device_field(sensor, "on")
+        if event["event"] == "gpios.gpio.on" and not on:
+            self._turn_on(sensor, int(now))
+        elif event["event"] == "gpios.gpio.off" and on:
+            self._turn_off(sensor, int(now), event["params"]["duration"])
+
+    def __start_session_timer(self, session, delay, callback, sensor_uuid):
+        """
+        Start session timer (sessions lock must be acquired). Timer callback is queued in gpio
+        events lane, so it runs in order with gpio events
+
+        Args:
+            session (dict): motion session
+            delay (float): timer delay (seconds)
+            callback (callable): timer callback, called with sensor uuid and session
+            sensor_uuid (str): sensor uuid
+        """
+        timer = threading.Timer(delay, self._submit_event_job, args=(callback, sensor_uuid, session))
+        timer.daemon = True
+        session["timer"] = timer
+        timer.start()
+
+    def __cancel_session_timer(self, session):
+        """
+        Cancel session timer (sessions lock must be acquired)
+
+        Args:
+            session (dict): motion session
+        """
+        if session["timer"]:
+            session["timer"].cancel()
+        session["timer"] = None
+
+    def _start_session(self, sensor_uuid, session):
+        """
+        Start motion session after debounce
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            session (dict): debounced motion session
+        """
+        with self.__sessions_lock:
+            if self.__sessions.get(sensor_uuid) is not session or session["timer"] is None:
+                # session cancelled meanwhile
+                return
+            session["timer"] = None
+
+        sensor = self._get_device(sensor_uuid)
+        if sensor is None:
+            with self.__sessions_lock:
+                self.__sessions.pop(sensor_uuid, None)
+            return
+        self._turn_on(sensor, int(session["start"]))
+
+    def _end_session(self, sensor_uuid, session):
+        """
+        End motion session after hold time
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            session (dict): ending motion session
+        """
+        with self.__sessions_lock:
+            if self.__sessions.get(sensor_uuid) is not session or not session["ending"] or session["timer"] is None:
+                # session retriggered meanwhile
+                return
+            del self.__sessions[sensor_uuid]
+
+        sensor = self._get_device(sensor_uuid)
+        if sensor is not None and self._get_device_field(sensor, "on"):
+            self._turn_off(sensor, int(time.time()), session["duration"])
+
+    def _turn_on(self, sensor, now):
+        """
+        Turn on motion sensor and send motion on event
+
+        Args:
+            sensor (MappingProxyType): read-only sensor data
+            now (int): motion timestamp
+        """
+        self.logger.debug('Motion sensor "%s" turned on', sensor["name"])
+
+        # motion sensor triggered
+        self.update_fields(sensor["uuid"], {"lastupdate": now, "on": True})
+
+        # new motion event
+        self.sensors_motion_on.send(
+            params={"sensor": sensor["name"], "lastupdate": now},
+            device_id=sensor["uuid"],
+        )
+
+    def _turn_off(self, sensor, now, duration):
+        """
+        Turn off motion sensor and send motion off event
+
+        Args:
+            sensor (MappingProxyType): read-only sensor data
+            now (int): motion end timestamp
+            duration (float): motion duration (seconds)
+        """
+        self.logger.debug('Motion sensor "%s" turned off', sensor["name"])
+
+        self.update_fields(sensor["uuid"], {"lastupdate": now, "on": False, "lastduration": duration})
+
+        # new motion event
+        self.sensors_motion_off.send(
+            params={
+                "sensor": sensor["name"],
+                "duration": duration,
+                "lastupdate": now,
+            },
+            device_id=sensor["uuid"],
+        )
+
+    def cancel_reads(self):
+        """
+        Cancel pending motion sessions timers
+        """
+        with self.__sessions_lock:
+            for session in self.__sessions.values():
+                self.__cancel_session_timer(session)
+            self.__sessions.clear()
 
     def _get_task(self, sensor):
         """
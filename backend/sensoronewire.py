@@ -4,9 +4,11 @@
 import os
 import glob
 import time
+import asyncio
 from cleep.exception import CommandError
 from .sensor import Sensor
 from .sensorsutils import SensorsUtils
+from .sensortask import SensorTask
 from .onewiredriver import OnewireDriver
 
 class SensorOnewire(Sensor):
@@ -25,6 +27,10 @@ class SensorOnewire(Sensor):
     ONEWIRE_PATH = "/sys/bus/w1/devices/"
     ONEWIRE_SLAVE = "w1_slave"
 
+    READERS = ["_read_onewire_file"]
+
+    EVENTS = ["system.driver.install", "system.driver.uninstall"]
+
     def __init__(self, sensors):
         """
         Constructor
@@ -107,12 +113,8 @@ class SensorOnewire(Sensor):
             },
         ])
 
-        # get 1wire gpio
-        gpio_resp = self.sensors.send_command(
-            "get_reserved_gpio", "gpios", {"usage": self.USAGE_ONEWIRE}
-        )
-        self.logger.debug("Get reserved gpio resp: %s", gpio_resp)
-        gpio_device = gpio_resp.data
+        # get 1wire gpio (requested once per bulk add)
+        gpio_device = self._get_batch_value("onewire_gpio", self._get_onewire_gpio)
 
         # prepare sensor
         sensor_data = {
@@ -136,8 +138,12 @@ class SensorOnewire(Sensor):
             "fahrenheit": None,
         }
 
-        # read temperature
-        (temp_c, temp_f) = self._read_onewire_temperature(sensor_data)
+        # read temperature (each probe is read once per bulk add)
+        probes = self._get_batch_value("onewire_probes", dict)
+        probe_key = (sensor_data["path"], sensor_data["offset"], sensor_data["offsetunit"])
+        if probe_key not in probes:
+            probes[probe_key] = self._read_onewire_temperature(sensor_data)
+        (temp_c, temp_f) = probes[probe_key]
         sensor_data["celsius"] = temp_c
         sensor_data["fahrenheit"] = temp_f
 
@@ -222,6 +228,19 @@ class SensorOnewire(Sensor):
             ],
         }
 
+    def _get_onewire_gpio(self):
+        """
+        Return gpio reserved for onewire bus
+
+        Returns:
+            dict: reserved gpio data
+        """
+        gpio_resp = self.sensors.send_command(
+            "get_reserved_gpio", "gpios", {"usage": self.USAGE_ONEWIRE}
+        )
+        self.logger.debug("Get reserved gpio resp: %s", gpio_resp)
+        return gpio_resp.data
+
     def get_onewire_devices(self):
         """
         Scan for devices connected on 1wire bus
@@ -293,6 +312,62 @@ class SensorOnewire(Sensor):
                 )
                 self.logger.debug("Delete gpio result: %s", resp)
 
+    @staticmethod
+    def _read_onewire_file(path):
+        """
+        Read 1wire device file content
+
+        Args:
+            path (str): onewire device file path
+
+        Returns:
+            list: file lines
+
+        Raises:
+            ValueError: if onewire device doesn't exist
+        """
+        if not os.path.exists(path):
+            raise ValueError(f'Onewire device "{path}" doesn\'t exist')
+
+        # we don't use cleep filesystem here because we only need a readonly access
+        with open(path, "r") as fdesc:
+            return fdesc.readlines()
+
+    def _convert_onewire_temperature(self, sensor, raw):
+        """
+        Convert 1wire device file content to temperatures
+
+        Args:
+            sensor (dict): sensor data
+            raw (list): onewire device file lines
+
+        Returns:
+            tuple: temperature infos::
+
+                (<celsius>, <fahrenheit>)
+
+        Raises:
+            ValueError: if file content is invalid
+        """
+        equals_pos = raw[1].find("t=")
+        if equals_pos == -1:
+            # no temperature found in file
+            sensor_path = sensor["path"]
+            raise ValueError(f'No temperature found for onewire "{sensor_path}"')
+
+        temp_str = raw[1][equals_pos + 2 :].strip()
+
+        # check value
+        if temp_str in ("85000", "-62"):
+            # invalid value
+            raise ValueError(f'Invalid temperature "{temp_str}"')
+
+        # convert temperatures
+        temp_c = float(temp_str) / 1000.0
+        return SensorsUtils.convert_temperatures_from_celsius(
+            temp_c, sensor["offset"], sensor["offsetunit"]
+        )
+
     def _read_onewire_temperature(self, sensor):
         """
         Read temperature from 1wire device
@@ -306,62 +381,67 @@ class SensorOnewire(Sensor):
                 (<celsius>, <fahrenheit>) or (None, None) if error occured
 
         """
-        temp_c = None
-        temp_f = None
-
         try:
-            if os.path.exists(sensor["path"]):
-                # we don't use cleep filesystem here because we only need a readonly access
-                with open(sensor["path"], "r") as fdesc:
-                    raw = fdesc.readlines()
-                equals_pos = raw[1].find("t=")
-
-                if equals_pos != -1:
-                    temp_str = raw[1][equals_pos + 2 :].strip()
-
-                    # check value
-                    if temp_str in ("85000", "-62"):
-                        # invalid value
-                        raise ValueError(f'Invalid temperature "{temp_str}"')
-
-                    # convert temperatures
-                    temp_c = float(temp_str) / 1000.0
-                    (temp_c, temp_f) = SensorsUtils.convert_temperatures_from_celsius(
-                        temp_c, sensor["offset"], sensor["offsetunit"]
-                    )
-
-                else:
-                    # no temperature found in file
-                    sensor_path = sensor["path"]
-                    raise ValueError(f'No temperature found for onewire "{sensor_path}"')
-
-            else:
-                # onewire device doesn't exist
-                sensor_path = sensor["path"]
-                raise ValueError(f'Onewire device "{sensor_path}" doesn\'t exist')
+            raw = self._run_reader("_read_onewire_file", sensor["path"])
+            return self._convert_onewire_temperature(sensor, raw)
+        except Exception:
+            sensor_path = sensor["path"]
+            self.logger.exception(
+                f'Unable to read 1wire device file "{sensor_path}":'
+            )
+
+        return (None, None)
+
+    async def _async_read_onewire_temperature(self, sensor):
+        """
+        Read temperature from 1wire device without blocking event loop
+
+        Params:
+            sensor (dict): sensor data
+
+        Returns:
+            tuple: temperature infos::
+
+                (<celsius>, <fahrenheit>) or (None, None) if error occured
 
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            raw = await loop.run_in_executor(None, self._run_reader, "_read_onewire_file", sensor["path"])
+            return self._convert_onewire_temperature(sensor, raw)
         except Exception:
             sensor_path = sensor["path"]
             self.logger.exception(
                 f'Unable to read 1wire device file "{sensor_path}":'
             )
 
-        return (temp_c, temp_f)
+        return (None, None)
 
-    def _task(self, sensor):
+    def _update_temperature(self, sensor, temperatures):
         """
-        Onewire sensor task
+        Update sensor temperature and send event. Nothing is done if read failed. If temperature
+        didn't move out of sensor deadband, only sensor last update is recorded
 
         Args:
             sensor (dict): sensor data
+            temperatures (tuple): (<celsius>, <fahrenheit>) temperatures
         """
-        # read values
-        (temp_c, temp_f) = self._read_onewire_temperature(sensor)
+        (temp_c, temp_f) = temperatures
+        if temp_c is None or temp_f is None:
+            self.logger.warning("No temperature read from onewire device %s", sensor["uuid"])
+            return
+        now = int(time.time())
+        self._add_stats(sensor, {"celsius": temp_c})
+        if not self._check_deadband(sensor, {"celsius": temp_c}):
+            # sensor is alive, only temperature update and event are suppressed
+            sensor["lastupdate"] = now
+            self.update_fields(sensor["uuid"], {"lastupdate": now})
+            return
 
         # update sensor
         sensor["celsius"] = temp_c
         sensor["fahrenheit"] = temp_f
-        sensor["lastupdate"] = int(time.time())
+        sensor["lastupdate"] = now
         if not self.update_value(sensor):
             self.logger.error("Unable to update onewire device %s", sensor["uuid"])
 
@@ -370,10 +450,30 @@ class SensorOnewire(Sensor):
             "sensor": sensor["name"],
             "celsius": temp_c,
             "fahrenheit": temp_f,
-            "lastupdate": int(time.time()),
+            "lastupdate": now,
         }
         self.sensors_temperature_update.send(params=params, device_id=sensor["uuid"])
 
+    def _task(self, sensor):
+        """
+        Onewire sensor task
+
+        Args:
+            sensor (dict): sensor data
+        """
+        self._update_temperature(sensor, self._read_onewire_temperature(sensor))
+
+    async def _async_task(self, sensor):
+        """
+        Onewire sensor async task
+
+        Args:
+            sensor (dict): sensor data
+        """
+        temperatures = await self._async_read_onewire_temperature(sensor)
+        # in-memory update, run on event loop
+        self._update_temperature(sensor, temperatures)
+
     def _get_task(self, sensor):
         """
         Return sensor task
@@ -381,9 +481,7 @@ class SensorOnewire(Sensor):
         Args:
             sensor (dict): sensor data
         """
-        return self.task_factory.create_task(
-            float(sensor["interval"]),
-            self._task,
-            [sensor]
+        return SensorTask(
+            float(sensor["interval"]), self._task, [sensor], self.logger, async_task=self._async_task
         )
 
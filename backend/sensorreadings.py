@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# value of fields never set
+_UNSET = object()
+
+
+class SensorReadings:
+    """
+    Sensor readings record
+
+    Compact typed record (no per-instance dict) holding readings of a sensor kind. Values are stored
+    as int, float or bool, and are converted to dict only at API edge (see to_dict). Fields never set
+    are not part of dict.
+    """
+
+    __slots__ = ("lastupdate", "lastduration")
+
+    # record fields (filled for each record class)
+    FIELDS = frozenset(__slots__)
+
+    # field converters
+    CONVERTERS = {
+        "celsius": float,
+        "fahrenheit": float,
+        "humidity": float,
+        "on": bool,
+        "lastupdate": int,
+        "lastduration": float,
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Compute record class fields
+        """
+        super().__init_subclass__(**kwargs)
+        fields = set()
+        for klass in cls.__mro__:
+            fields.update(getattr(klass, "__slots__", ()))
+        cls.FIELDS = frozenset(fields)
+
+    @staticmethod
+    def create(fields, values=None):
+        """
+        Create smallest record able to hold specified fields
+
+        Args:
+            fields (iterable): readings fields names
+            values (dict): initial readings values
+
+        Returns:
+            SensorReadings: readings record
+
+        Raises:
+            ValueError: if a field is not a reading field
+        """
+        fields = set(fields)
+        for klass in (SensorReadings, TemperatureReadings, HumidityReadings, MotionReadings, GenericReadings):
+            if fields <= klass.FIELDS:
+                record = klass()
+                if values:
+                    record.update(values)
+                return record
+
+        raise ValueError(f"Unsupported readings fields {sorted(fields - GenericReadings.FIELDS)}")
+
+    def update(self, fields):
+        """
+        Update record fields. Only fields whose value changed are applied
+
+        Args:
+            fields (dict): readings fields. All fields must be part of record
+
+        Returns:
+            dict: changed fields with their converted value
+        """
+        changed = {}
+        for field, value in fields.items():
+            if value is not None:
+                value = self.CONVERTERS[field](value)
+            if getattr(self, field, _UNSET) != value:
+                setattr(self, field, value)
+                changed[field] = value
+
+        return changed
+
+    def to_dict(self):
+        """
+        Convert record to dict
+
+        Returns:
+            dict: readings fields
+        """
+        readings = {}
+        for field in self.FIELDS:
+            if hasattr(self, field):
+                readings[field] = getattr(self, field)
+        return readings
+
+
+class TemperatureReadings(SensorReadings):
+    """
+    Temperature sensor readings
+    """
+
+    __slots__ = ("celsius", "fahrenheit")
+
+
+class HumidityReadings(SensorReadings):
+    """
+    Humidity sensor readings
+    """
+
+    __slots__ = ("humidity",)
+
+
+class MotionReadings(SensorReadings):
+    """
+    Motion sensor readings
+    """
+
+    __slots__ = ("on",)
+
+
+class GenericReadings(SensorReadings):
+    """
+    Readings of sensor mixing several kinds of values
+    """
+
+    __slots__ = ("celsius", "fahrenheit", "humidity", "on")
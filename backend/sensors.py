@@ -2,11 +2,28 @@
 # -*- coding: utf-8 -*-
 
 import copy
+import threading
+import time
+from types import MappingProxyType
+from uuid import uuid4
 from cleep.exception import MissingParameter, InvalidParameter, CommandError
 from cleep.core import CleepModule
 from .sensormotiongeneric import SensorMotionGeneric
 from .sensordht22 import SensorDht22
 from .sensoronewire import SensorOnewire
+from .sensorssampler import SensorsSampler
+from .sensorslane import SensorsLane
+from .sensorsdispatcher import SensorsDispatcher
+from .sensorsdemand import SensorsDemand
+from .sensorsdeadband import SensorsDeadband
+from .sensorsbatcher import SensorsBatcher
+from .sensorsstats import SensorsStats
+from .sensorszones import SensorsZones
+from .sensorsasyncengine import SensorsAsyncEngine
+from .sensorsworker import SensorsWorker
+from .sensorsstatestore import SensorsStateStore
+from .sensortask import SensorTask
+from .sensorsutils import SensorsUtils
 
 __all__ = ["Sensors"]
 
@@ -39,7 +56,35 @@ class Sensors(CleepModule):
     MODULE_URLSITE = None
 
     MODULE_CONFIG_FILE = "sensors.conf"
-    DEFAULT_CONFIG = {}
+    DEFAULT_CONFIG = {
+        "alignedsampling": False,
+        "idlepolling": False,
+        "idleinterval": 3600,
+        "alwayson": [],
+        "asyncengine": False,
+        "processisolation": False,
+        "flushinterval": 300,
+        "statesnapshot": True,
+        "deadbands": {},
+        "readingsbatch": False,
+        "statswindows": [3600],
+        "statssummary": False,
+        "zones": {},
+    }
+
+    STOP_TIMEOUT = 0.5
+    POLLING_WORKERS = 2
+    DEMAND_TIMEOUT = 3600
+    DEMAND_CHECK_INTERVAL = 60
+    STATE_RESTORE_PATH = "/etc/cleep/sensors.state.json"
+    STATE_SNAPSHOT_PATH = "/dev/shm/cleep/sensors.state.json"
+    STATE_JOURNAL_PATH = "/etc/cleep/sensors.state.journal"
+    WARM_START_MIN_DELAY = 5.0
+    DEADBAND_HEARTBEAT = 3600
+    BATCH_WINDOW = 1.0
+    GPIO_EVENTS = ("gpios.gpio.on", "gpios.gpio.off")
+    STATS_CHECK_INTERVAL = 60
+    STATS_MIN_WINDOW = 60
 
     def __init__(self, bootstrap, debug_enabled):
         """
@@ -54,10 +99,47 @@ class Sensors(CleepModule):
 
         # members
         self._tasks_by_device_uuid = {}
+        self._sensors_by_gpio_uuid = {}
+        self._gpios_by_sensor = {}
+        self._gpio_uses = {}
+        self._sensors_by_name = {}
+        self._names_by_sensor = {}
+        self._channels_by_physical = {}
+        self._physical_by_sensor = {}
+        self._batch_assigned_gpios = None
+        self._batch_cache = None
+        self._devices_snapshot = None
+        self._devices_lock = threading.RLock()
         self.raspi_gpios = {}
         self.addons_by_name = {}
         self.addons_by_type = {}
         self.sensors_types = {}
+        self._sampler = SensorsSampler(self.logger, self._get_task_bus, self._on_snapshot)
+        self._snapshots_by_interval = {}
+        self._event_lane = SensorsLane("events", 1, self.logger)
+        self._polling_lane = SensorsLane("polling", self.POLLING_WORKERS, self.logger)
+        self._dispatcher = SensorsDispatcher(self.logger)
+        self._async_engine = SensorsAsyncEngine(self.logger)
+        self._workers_by_addon = {}
+        self._demand = SensorsDemand(self.DEMAND_TIMEOUT)
+        self._demand_task = SensorTask(self.DEMAND_CHECK_INTERVAL, self._check_sensors_demand, [], self.logger)
+        self._deadband = SensorsDeadband(self.DEADBAND_HEARTBEAT)
+        self._batcher = SensorsBatcher(self.BATCH_WINDOW, self._on_readings_batch, self.logger)
+        self._readings_batch = False
+        self._stats = SensorsStats(self.DEFAULT_CONFIG["statswindows"])
+        self._stats_task = SensorTask(self.STATS_CHECK_INTERVAL, self._roll_sensors_stats, [], self.logger)
+        self._zones = SensorsZones(self._on_zone_change, self.logger)
+        self._state_store = SensorsStateStore(
+            self.logger, self.cleep_filesystem, self.STATE_RESTORE_PATH, self.STATE_JOURNAL_PATH
+        )
+        self._flush_task = SensorTask(self.DEFAULT_CONFIG["flushinterval"], self._flush_readings, [], self.logger)
+
+        # events
+        self.sensors_snapshot_update = self._get_event("sensors.snapshot.update")
+        self.sensors_readings_batch = self._get_event("sensors.readings.batch")
+        self.sensors_stats_summary = self._get_event("sensors.stats.summary")
+        self.sensors_zone_occupied = self._get_event("sensors.zone.occupied")
+        self.sensors_zone_vacant = self._get_event("sensors.zone.vacant")
 
         # addons
         self._register_addon(SensorMotionGeneric(self))
@@ -89,18 +171,33 @@ class Sensors(CleepModule):
         # save addon by name
         self.addons_by_name[addon.__class__.__name__] = addon
 
+        # compile addon events in dispatch table
+        for event_name in addon.EVENTS:
+            if event_name in self.GPIO_EVENTS:
+                self._dispatcher.register(event_name, "gpios", self._on_gpio_event)
+            else:
+                self._dispatcher.register(
+                    event_name,
+                    addon.__class__.__name__,
+                    lambda event, addon_=addon: addon_.process_event(event, None),
+                )
+
         # inject in sensors public addon methods
         blacklist = [
             "add_gpio",
             "update_gpio",
             "get_reserved_gpio",
             "update_value",
+            "update_fields",
+            "update_channels",
             "update",
             "add",
             "delete",
             "get_task",
             "process_event",
+            "cancel_reads",
             "has_drivers",
+            "get_bus",
             "send_command",
             "cleep_filesystem",
         ]
@@ -122,92 +219,1504 @@ class Sensors(CleepModule):
             self.logger.debug('Register method "%s" from addon "%s"', method_name, addon.__class__.__name__)
             setattr(self, method_name, getattr(addon, method_name))
 
-    def _on_start(self):
+    def _on_start(self):
+        """
+        Start application
+        """
+        # raspi gpios
+        self.raspi_gpios = self._get_raspi_gpios()
+
+        # update addons
+        for _, addon in self.addons_by_name.items():
+            addon.raspi_gpios = self.raspi_gpios
+
+        # start lanes
+        self._event_lane.start()
+        self._polling_lane.start()
+
+        # restore sensors state and build sensors indexes
+        self._state_store.load(self._get_state_snapshot_path())
+        self._migrate_sensors_readings()
+        self._migrate_sensors_channels()
+        self._build_sensors_indexes()
+
+        # apply settings before first sensors reads
+        self._demand.set_always_on(self._get_config_field("alwayson"))
+        self._deadband.set_settings(self._get_config_field("deadbands"))
+        self._readings_batch = self._get_config_field("readingsbatch")
+        self._stats.set_windows(self._get_config_field("statswindows"))
+        self._zones.set_active_sensors([
+            sensor_uuid for sensor_uuid, readings in self._state_store.get_all().items() if readings.get("on")
+        ])
+        self._zones.set_zones(self._get_config_field("zones"))
+
+        # launch tasks
+        if self._get_config_field("asyncengine"):
+            self._async_engine.start()
+        if self._get_config_field("processisolation"):
+            self._start_workers()
+        self._start_sensors_tasks()
+        self._demand_task.start()
+        self._stats_task.start()
+        self._flush_task.reconfigure(interval=self._get_config_field("flushinterval"))
+        self._flush_task.start()
+
+    def _on_stop(self):
+        """
+        Stop application
+        """
+        # signal all tasks at once
+        tasks = set(self._tasks_by_device_uuid.values())
+        tasks.update(self._sampler.stop())
+        tasks.add(self._demand_task)
+        tasks.add(self._flush_task)
+        tasks.add(self._stats_task)
+        for task in tasks:
+            task.stop(wait=False)
+
+        # drop queued jobs (stopped tasks skip the ones already dequeued)
+        self._event_lane.stop()
+        self._polling_lane.stop()
+
+        # kill in-flight hardware reads
+        deadline = time.time() + self.STOP_TIMEOUT
+        for _, addon in self.addons_by_name.items():
+            addon.cancel_reads()
+        self._async_engine.stop(self.STOP_TIMEOUT)
+        self._stop_workers(0.0)
+
+        # and wait for tasks end within a global deadline
+        for task in tasks:
+            if not task.join(max(0.0, deadline - time.time())):
+                self.logger.warning("Sensor task [%s] did not stop in time", id(task))
+
+        # send pending readings batch and persist last readings
+        self._zones.stop()
+        self._batcher.flush()
+        self._flush_readings()
+        self._state_store.save()
+
+    def _start_sensors_tasks(self, sensors=None):
+        """
+        Start tasks of all sensors
+
+        Args:
+            sensors (list): start tasks of specified sensors only. All sensors if None
+        """
+        if sensors is None:
+            sensors = list(self.get_module_devices().values())
+        for sensor in sensors:
+            if sensor["uuid"] in self._tasks_by_device_uuid:
+                # task already launched by another sensor of the same device (dht22)
+                continue
+            addon = self._get_addon(sensor["type"], sensor["subtype"])
+            if addon is None:
+                continue
+            task = addon.get_task(sensor)
+            self._start_sensor_task(task, task.sensors if task else [sensor])
+
+    def _stop_sensors_tasks(self):
+        """
+        Stop tasks of all sensors and wait for end of their current run, so restarted tasks never
+        read a sensor while a previous read is still in progress
+        """
+        tasks = set(self._tasks_by_device_uuid.values())
+        addons = {
+            self._get_addon(sensor["type"], sensor["subtype"]) for task in tasks for sensor in task.sensors
+        }
+        tasks.update(self._sampler.stop())
+        for task in tasks:
+            task.stop(wait=False)
+
+        # kill in-flight hardware reads of polled sensors (other addons keep their running state)
+        deadline = time.time() + self.STOP_TIMEOUT
+        for addon in addons:
+            if addon is not None:
+                addon.cancel_reads()
+
+        # and wait for tasks end within a global deadline
+        for task in tasks:
+            if not task.join(max(0.0, deadline - time.time())):
+                self.logger.warning("Sensor task [%s] did not stop in time", id(task))
+        self._tasks_by_device_uuid.clear()
+
+    def set_aligned_sampling(self, enabled):
+        """
+        Enable or disable aligned sampling.
+        When enabled, sensors with the same interval are read together on wall-clock boundaries
+        and a single snapshot of all their values is sent at each tick.
+
+        Args:
+            enabled (bool): True to enable aligned sampling
+
+        Returns:
+            bool: True if aligned sampling updated
+        """
+        self._check_parameters([{"name": "enabled", "value": enabled, "type": bool}])
+
+        if not self._update_config({"alignedsampling": enabled}):
+            raise CommandError("Unable to save configuration")
+
+        # restart tasks with new sampling mode
+        self._stop_sensors_tasks()
+        self._start_sensors_tasks()
+
+        return True
+
+    def set_async_engine(self, enabled):
+        """
+        Enable or disable async acquisition engine.
+        When enabled, sensors reads are run as coroutines on a single event loop instead of
+        polling lane workers.
+
+        Args:
+            enabled (bool): True to enable async engine
+
+        Returns:
+            bool: True if async engine updated
+        """
+        self._check_parameters([{"name": "enabled", "value": enabled, "type": bool}])
+
+        if not self._update_config({"asyncengine": enabled}):
+            raise CommandError("Unable to save configuration")
+
+        # restart tasks on new engine
+        self._stop_sensors_tasks()
+        if enabled:
+            self._async_engine.start()
+        else:
+            self._async_engine.stop(self.STOP_TIMEOUT)
+        self._start_sensors_tasks()
+
+        return True
+
+    def set_process_isolation(self, enabled):
+        """
+        Enable or disable process isolation.
+        When enabled, hardware reads of each addon are run in a supervised worker process.
+
+        Args:
+            enabled (bool): True to enable process isolation
+
+        Returns:
+            bool: True if process isolation updated
+        """
+        self._check_parameters([{"name": "enabled", "value": enabled, "type": bool}])
+
+        if not self._update_config({"processisolation": enabled}):
+            raise CommandError("Unable to save configuration")
+
+        # restart tasks with new readers
+        self._stop_sensors_tasks()
+        if enabled:
+            self._start_workers()
+        else:
+            self._stop_workers(self.STOP_TIMEOUT)
+        self._start_sensors_tasks()
+
+        return True
+
+    def _start_workers(self):
+        """
+        Start worker process of each addon that declares hardware readers
+        """
+        for addon_name, addon in self.addons_by_name.items():
+            if not addon.READERS or addon_name in self._workers_by_addon:
+                continue
+            readers = {reader_name: getattr(addon, reader_name) for reader_name in addon.READERS}
+            worker = SensorsWorker(addon_name, readers, self.logger)
+            worker.start()
+            self._workers_by_addon[addon_name] = worker
+            addon.worker = worker
+
+    def _stop_workers(self, timeout):
+        """
+        Stop all addons worker processes
+
+        Args:
+            timeout (float): maximum time to wait for each worker end before killing it
+        """
+        for addon_name, worker in self._workers_by_addon.items():
+            self.addons_by_name[addon_name].worker = None
+            worker.stop(timeout)
+        self._workers_by_addon.clear()
+
+    def get_sensors_snapshots(self):
+        """
+        Return last snapshot built for each interval during aligned sampling
+
+        Returns:
+            dict: snapshots by interval::
+
+                {
+                    interval (int): {
+                        timestamp (int): snapshot timestamp
+                        interval (int): sampling interval
+                        sensors (dict): sensors values by sensor uuid
+                    },
+                    ...
+                }
+
+        """
+        return copy.deepcopy(self._snapshots_by_interval)
+
+    def set_idle_polling(self, enabled, idle_interval):
+        """
+        Enable or disable idle polling.
+        When enabled, sensors whose values are not consumed (no subscriber, no recent read and
+        not always on) are polled at idle interval instead of their own interval.
+
+        Args:
+            enabled (bool): True to enable idle polling
+            idle_interval (int): polling interval of sensors without demand (seconds)
+
+        Returns:
+            bool: True if idle polling updated
+        """
+        self._check_parameters([
+            {"name": "enabled", "value": enabled, "type": bool},
+            {
+                "name": "idle_interval",
+                "value": idle_interval,
+                "type": int,
+                "validator": lambda val: val >= 60,
+                "message": "Idle interval must be greater or equal than 60",
+            },
+        ])
+
+        if not self._update_config({"idlepolling": enabled, "idleinterval": idle_interval}):
+            raise CommandError("Unable to save configuration")
+        self._check_sensors_demand()
+
+        return True
+
+    def set_sensor_always_on(self, sensor_uuid, always_on):
+        """
+        Flag sensor as always in demand: it is always polled at its own interval
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            always_on (bool): True to keep sensor always in demand
+
+        Returns:
+            bool: True if sensor flag updated
+        """
+        self._check_parameters([
+            {
+                "name": "sensor_uuid",
+                "value": sensor_uuid,
+                "type": str,
+                "validator": lambda val: self._get_device(val) is not None,
+                "message": f'Sensor with uuid "{sensor_uuid}" doesn\'t exist',
+            },
+            {"name": "always_on", "value": always_on, "type": bool},
+        ])
+
+        uuids = [uuid for uuid in self._get_config_field("alwayson") if uuid != sensor_uuid]
+        if always_on:
+            uuids.append(sensor_uuid)
+        if not self._update_config({"alwayson": uuids}):
+            raise CommandError("Unable to save configuration")
+        self._demand.set_always_on(uuids)
+        self._apply_sensor_demand(sensor_uuid)
+
+        return True
+
+    def set_sensor_deadband(self, sensor_uuid, absolute, relative, heartbeat):
+        """
+        Set sensor deadband: sensor values updates (events and persistence) only happen when values moved
+        by more than deadband, or when nothing was reported during heartbeat duration
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            absolute (float): absolute deadband (sensor value unit). 0 to disable it
+            relative (float): relative deadband (0.05 for 5%). 0 to disable it
+            heartbeat (int): maximum duration without update (seconds). 0 to disable it
+
+        Returns:
+            bool: True if sensor deadband updated
+        """
+        # integral deadbands (json numbers) are accepted
+        if isinstance(absolute, int) and not isinstance(absolute, bool):
+            absolute = float(absolute)
+        if isinstance(relative, int) and not isinstance(relative, bool):
+            relative = float(relative)
+
+        self._check_parameters([
+            {
+                "name": "sensor_uuid",
+                "value": sensor_uuid,
+                "type": str,
+                "validator": lambda val: self._get_device(val) is not None,
+                "message": f'Sensor with uuid "{sensor_uuid}" doesn\'t exist',
+            },
+            {
+                "name": "absolute",
+                "value": absolute,
+                "type": float,
+                "validator": lambda val: val >= 0,
+                "message": "Absolute deadband must be positive",
+            },
+            {
+                "name": "relative",
+                "value": relative,
+                "type": float,
+                "validator": lambda val: 0 <= val <= 1,
+                "message": "Relative deadband must be between 0 and 1",
+            },
+            {
+                "name": "heartbeat",
+                "value": heartbeat,
+                "type": int,
+                "validator": lambda val: val >= 0,
+                "message": "Heartbeat must be positive",
+            },
+        ])
+
+        deadbands = dict(self._get_config_field("deadbands"))
+        deadbands[sensor_uuid] = {"absolute": absolute, "relative": relative, "heartbeat": heartbeat}
+        if not self._update_config({"deadbands": deadbands}):
+            raise CommandError("Unable to save configuration")
+        self._deadband.set_settings(deadbands)
+
+        return True
+
+    def _check_sensor_deadband(self, sensor_uuid, values):
+        """
+        Check if sensor values moved out of sensor deadband (or heartbeat elapsed)
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            values (dict): sensor values by field
+
+        Returns:
+            bool: True if values must be reported
+        """
+        return self._deadband.accept(sensor_uuid, values)
+
+    def _add_sensor_stats(self, sensor_uuid, values):
+        """
+        Add polled sensor values to sensor statistics
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            values (dict): sensor values by field
+        """
+        self._stats.add(sensor_uuid, values)
+
+    def get_sensor_stats(self, sensor_uuid):
+        """
+        Return sensor values statistics (count, min, max, mean, variance) over statistics windows
+
+        Args:
+            sensor_uuid (str): sensor uuid
+
+        Returns:
+            list: statistics by window (see SensorsStats.get)
+        """
+        if not sensor_uuid:
+            raise MissingParameter("Uuid parameter is missing")
+        if self._get_device(sensor_uuid) is None:
+            raise InvalidParameter(f'Sensor with uuid "{sensor_uuid}" doesn\'t exist')
+
+        return self._stats.get(sensor_uuid)
+
+    def set_stats_windows(self, windows):
+        """
+        Set sensors statistics windows. Current statistics are reset
+
+        Args:
+            windows (list): windows durations (seconds)
+
+        Returns:
+            bool: True if statistics windows updated
+        """
+        self._check_parameters([
+            {
+                "name": "windows",
+                "value": windows,
+                "type": list,
+                "validator": lambda val: len(val) > 0
+                and all(isinstance(window, int) and window >= self.STATS_MIN_WINDOW for window in val),
+                "message": f"Windows must be a list of durations greater or equal than {self.STATS_MIN_WINDOW}",
+            },
+        ])
+
+        if not self._update_config({"statswindows": windows}):
+            raise CommandError("Unable to save configuration")
+        self._stats.set_windows(windows)
+
+        return True
+
+    def set_stats_summary(self, enabled):
+        """
+        Enable or disable sensors statistics summary event. When enabled, a sensors.stats.summary event
+        is sent for each sensor at the end of each statistics window
+
+        Args:
+            enabled (bool): True to enable statistics summary event
+
+        Returns:
+            bool: True if statistics summary updated
+        """
+        self._check_parameters([{"name": "enabled", "value": enabled, "type": bool}])
+
+        if not self._update_config({"statssummary": enabled}):
+            raise CommandError("Unable to save configuration")
+
+        return True
+
+    def _roll_sensors_stats(self):
+        """
+        Close ended statistics windows and send their summary if statistics summary is enabled
+        """
+        summaries = self._stats.roll()
+        if not self._get_config_field("statssummary"):
+            return
+
+        for summary in summaries:
+            self.sensors_stats_summary.send(
+                params={
+                    "window": summary["window"],
+                    "start": summary["start"],
+                    "end": summary["end"],
+                    "stats": summary["stats"],
+                },
+                device_id=summary["uuid"],
+            )
+
+    def read_sensor(self, sensor_uuid):
+        """
+        Return sensor data. Sensor is considered in demand for a while after read
+
+        Args:
+            sensor_uuid (str): sensor uuid
+
+        Returns:
+            dict: sensor data
+        """
+        if not sensor_uuid:
+            raise MissingParameter("Uuid parameter is missing")
+        sensor = self._get_device_data(sensor_uuid)
+        if sensor is None:
+            raise InvalidParameter(f'Sensor with uuid "{sensor_uuid}" doesn\'t exist')
+
+        self._demand.touch(sensor_uuid)
+        self._apply_sensor_demand(sensor_uuid)
+
+        return sensor
+
+    def subscribe_sensor(self, sensor_uuid):
+        """
+        Subscribe to sensor values. Subscribed sensor is polled at its own interval
+
+        Args:
+            sensor_uuid (str): sensor uuid
+
+        Returns:
+            bool: True if subscription succeed
+        """
+        if not sensor_uuid:
+            raise MissingParameter("Uuid parameter is missing")
+        if self._get_device(sensor_uuid) is None:
+            raise InvalidParameter(f'Sensor with uuid "{sensor_uuid}" doesn\'t exist')
+
+        self._demand.subscribe(sensor_uuid)
+        self._apply_sensor_demand(sensor_uuid)
+
+        return True
+
+    def unsubscribe_sensor(self, sensor_uuid):
+        """
+        Unsubscribe from sensor values
+
+        Args:
+            sensor_uuid (str): sensor uuid
+
+        Returns:
+            bool: True if unsubscription succeed
+        """
+        if not sensor_uuid:
+            raise MissingParameter("Uuid parameter is missing")
+        if self._get_device(sensor_uuid) is None:
+            raise InvalidParameter(f'Sensor with uuid "{sensor_uuid}" doesn\'t exist')
+
+        self._demand.unsubscribe(sensor_uuid)
+        self._apply_sensor_demand(sensor_uuid)
+
+        return True
+
+    def _check_sensors_demand(self):
+        """
+        Apply sensors demand on all sensor tasks
+        """
+        for task in set(self._tasks_by_device_uuid.values()):
+            self._apply_task_demand(task)
+
+    def _apply_sensor_demand(self, sensor_uuid):
+        """
+        Apply demand on task of specified sensor
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        task = self._tasks_by_device_uuid.get(sensor_uuid)
+        if task:
+            self._apply_task_demand(task)
+
+    def _apply_task_demand(self, task):
+        """
+        Set task interval according to its sensors demand: sensors interval if at least one sensor
+        is in demand, idle interval otherwise. Aligned sampling tasks are not handled.
+
+        Args:
+            task (SensorTask): sensor task
+        """
+        if not task.is_running() or not task.sensors:
+            return
+
+        interval = task.sensors[0]["interval"]
+        if self._get_config_field("idlepolling") and not any(
+            self._demand.has_demand(sensor["uuid"]) for sensor in task.sensors
+        ):
+            interval = max(interval, self._get_config_field("idleinterval"))
+
+        if task.interval != float(interval):
+            self.logger.debug(
+                "Set polling interval of sensors %s to %ss",
+                [sensor["name"] for sensor in task.sensors],
+                interval,
+            )
+            task.reconfigure(interval=interval)
+
+    def _is_aligned_sampling(self):
+        """
+        Return aligned sampling status
+
+        Returns:
+            bool: True if aligned sampling is enabled
+        """
+        return self._get_config_field("alignedsampling")
+
+    def _get_task_bus(self, task):
+        """
+        Return bus name of specified sensor task
+
+        Args:
+            task (SensorTask): sensor task
+
+        Returns:
+            str: bus name
+        """
+        sensor = task.sensors[0]
+        addon = self._get_addon(sensor["type"], sensor["subtype"])
+        return addon.get_bus(sensor) if addon else sensor["subtype"]
+
+    def _on_snapshot(self, snapshot):
+        """
+        Store and send snapshot built by aligned sampler
+
+        Args:
+            snapshot (dict): sensors snapshot
+        """
+        self._snapshots_by_interval[snapshot["interval"]] = snapshot
+        self.sensors_snapshot_update.send(params=snapshot)
+
+    def on_event(self, event):
+        """
+        Event received
+
+        Params:
+            event (MessageRequest): event data
+        """
+        # drop startup events
+        if event["startup"]:
+            self.logger.debug("Drop startup event")
+            return
+
+        self._dispatcher.dispatch(event)
+
+    def _on_gpio_event(self, event):
+        """
+        Gpio event handler
+
+        Args:
+            event (MessageRequest): gpio event
+        """
+        # drop gpio init
+        if event["params"]["init"]:
+            self.logger.debug("Drop gpio init event")
+            return
+
+        # process event in high priority lane, apart from sensors polling
+        self._event_lane.submit(self._process_gpio_event, event)
+
+    def _submit_event_job(self, func, *args):
+        """
+        Queue function execution in gpio events lane, so it is serialized with gpio events processing
+
+        Args:
+            func (callable): function to execute
+            *args: function arguments
+        """
+        self._event_lane.submit(func, *args)
+
+    def _process_gpio_event(self, event):
+        """
+        Process gpio event on addon of sensor connected to event gpio
+
+        Args:
+            event (MessageRequest): gpio event
+        """
+        # get uuid event
+        gpio_uuid = event["device_id"]
+
+        # search sensor
+        sensor = self._search_by_gpio(gpio_uuid)
+        self.logger.debug("Found sensor: %s", sensor)
+        if not sensor:
+            return
+
+        # process event on addon
+        addon = self._get_addon(sensor["type"], sensor["subtype"])
+        self.logger.debug("Found addon: %s", addon)
+        if addon:
+            addon.process_event(event, sensor)
+
+    def get_lanes_stats(self):
+        """
+        Return execution lanes metrics
+
+        Returns:
+            dict: metrics by lane name::
+
+                {
+                    events (dict): gpio events lane metrics (see SensorsLane.get_stats)
+                    polling (dict): sensors polling lane metrics (see SensorsLane.get_stats)
+                }
+
+        """
+        return {
+            self._event_lane.name: self._event_lane.get_stats(),
+            self._polling_lane.name: self._polling_lane.get_stats(),
+        }
+
+    def get_events_stats(self):
+        """
+        Return events dispatch metrics
+
+        Returns:
+            dict: events handlers metrics (see SensorsDispatcher.get_stats)
+        """
+        return self._dispatcher.get_stats()
+
+    def _search_by_gpio(self, gpio_uuid):
+        """
+        Search sensor connected to specified gpio_uuid
+
+        Params:
+            gpio_uuid (string): gpio uuid to search
+
+        Returns:
+            MappingProxyType: read-only sensor (see _get_device) or None if nothing found
+        """
+        sensors_uuids = self._sensors_by_gpio_uuid.get(gpio_uuid)
+        if not sensors_uuids:
+            return None
+
+        return self._get_device(sensors_uuids[0])
+
+    def _build_sensors_indexes(self):
+        """
+        Build sensors indexes from stored devices
+        """
+        self._sensors_by_gpio_uuid = {}
+        self._gpios_by_sensor = {}
+        self._gpio_uses = {}
+        self._sensors_by_name = {}
+        self._names_by_sensor = {}
+        self._channels_by_physical = {}
+        self._physical_by_sensor = {}
+        for sensor in self._get_devices_snapshot().values():
+            self._index_sensor(sensor)
+        self.logger.debug("Gpio uses: %s", self._gpio_uses)
+
+    def _index_sensor(self, sensor):
+        """
+        Add sensor to sensors indexes (gpio uuids, gpio uses and names). Already indexed sensor is reindexed
+
+        Args:
+            sensor (dict): sensor data
+        """
+        if sensor["uuid"] in self._gpios_by_sensor:
+            self._unindex_sensor(sensor["uuid"])
+
+        gpios = [(gpio["uuid"], gpio["gpio"]) for gpio in sensor.get("gpios", [])]
+        self._gpios_by_sensor[sensor["uuid"]] = gpios
+        for (gpio_uuid, gpio_name) in gpios:
+            sensors_uuids = self._sensors_by_gpio_uuid.setdefault(gpio_uuid, [])
+            if sensor["uuid"] not in sensors_uuids:
+                sensors_uuids.append(sensor["uuid"])
+            self._gpio_uses[gpio_name] = self._gpio_uses.get(gpio_name, 0) + 1
+
+        self._names_by_sensor[sensor["uuid"]] = sensor.get("name")
+        self._sensors_by_name.setdefault(sensor.get("name"), []).append(sensor["uuid"])
+
+        physical_uuid = sensor.get("physicaluuid")
+        if physical_uuid:
+            self._physical_by_sensor[sensor["uuid"]] = physical_uuid
+            self._channels_by_physical.setdefault(physical_uuid, {})[sensor["type"]] = sensor["uuid"]
+
+    def _unindex_sensor(self, sensor_uuid):
+        """
+        Remove sensor from sensors indexes
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        for (gpio_uuid, gpio_name) in self._gpios_by_sensor.pop(sensor_uuid, []):
+            sensors_uuids = [
+                uuid for uuid in self._sensors_by_gpio_uuid.get(gpio_uuid, []) if uuid != sensor_uuid
+            ]
+            if sensors_uuids:
+                self._sensors_by_gpio_uuid[gpio_uuid] = sensors_uuids
+            else:
+                self._sensors_by_gpio_uuid.pop(gpio_uuid, None)
+
+            uses = self._gpio_uses.get(gpio_name, 0) - 1
+            if uses > 0:
+                self._gpio_uses[gpio_name] = uses
+            else:
+                self._gpio_uses.pop(gpio_name, None)
+
+        if sensor_uuid in self._names_by_sensor:
+            name = self._names_by_sensor.pop(sensor_uuid)
+            sensors_uuids = [uuid for uuid in self._sensors_by_name.get(name, []) if uuid != sensor_uuid]
+            if sensors_uuids:
+                self._sensors_by_name[name] = sensors_uuids
+            else:
+                self._sensors_by_name.pop(name, None)
+
+        physical_uuid = self._physical_by_sensor.pop(sensor_uuid, None)
+        if physical_uuid:
+            channels = {
+                type_: uuid
+                for type_, uuid in self._channels_by_physical.get(physical_uuid, {}).items()
+                if uuid != sensor_uuid
+            }
+            if channels:
+                self._channels_by_physical[physical_uuid] = channels
+            else:
+                self._channels_by_physical.pop(physical_uuid, None)
+
+    def _search_by_name(self, name):
+        """
+        Search sensors with specified name using names index. Names are case sensitive
+
+        Args:
+            name (str): sensor name
+
+        Returns:
+            list: list of sensors
+        """
+        sensors = [self._get_device_data(sensor_uuid) for sensor_uuid in self._sensors_by_name.get(name, [])]
+        return [sensor for sensor in sensors if sensor is not None]
+
+    def _get_sensor_channels(self, sensor_uuid):
+        """
+        Return channels of physical device of specified sensor (for example temperature and humidity
+        channels of a DHT22) using channels index
+
+        Args:
+            sensor_uuid (str): uuid of one of physical device channels
+
+        Returns:
+            dict: channels sensors by sensor type. Sensor alone if it is not part of multi-channel device
+        """
+        physical_uuid = self._physical_by_sensor.get(sensor_uuid)
+        if physical_uuid is None:
+            sensor = self._get_device_data(sensor_uuid)
+            return {sensor["type"]: sensor} if sensor else {}
+
+        channels = {}
+        for type_, channel_uuid in self._channels_by_physical.get(physical_uuid, {}).items():
+            sensor = self._get_device_data(channel_uuid)
+            if sensor is not None:
+                channels[type_] = sensor
+        return channels
+
+    def _search_device(self, key, value):
+        """
+        Search first device that matches specified criteria.
+        Searches by name and uuid are index lookups, other searches scan devices snapshot
+
+        Args:
+            key (str): field key
+            value (any): field value
+
+        Returns:
+            dict: device data or None if not found
+        """
+        if key == "name":
+            sensors = self._search_by_name(value)
+            return sensors[0] if sensors else None
+        if key == "uuid":
+            return self._get_device_data(value)
+
+        for device in self._get_devices_snapshot().values():
+            if self._get_device_field(device, key) == value:
+                return self._device_to_dict(device)
+        return None
+
+    def _search_devices(self, key, value):
+        """
+        Search all devices that match specified criteria.
+        Search by name is an index lookup, other searches scan devices snapshot
+
+        Args:
+            key (str): field key
+            value (any): field value
+
+        Returns:
+            list: list of devices
+        """
+        if key == "name":
+            return self._search_by_name(value)
+
+        return [
+            self._device_to_dict(device)
+            for device in self._get_devices_snapshot().values()
+            if self._get_device_field(device, key) == value
+        ]
+
+    def _get_device_field(self, device, key):
+        """
+        Return field value of snapshot device. Reading fields are read from state store
+
+        Args:
+            device (MappingProxyType): snapshot device
+            key (str): field key
+
+        Returns:
+            any: field value or None if field doesn't exist
+        """
+        if key in SensorsUtils.READING_FIELDS:
+            return self._state_store.get(device["uuid"]).get(key, device.get(key))
+        return device.get(key)
+
+    def _get_device(self, device_uuid):
+        """
+        Return read-only device from devices snapshot, without copy. Readings are not part of
+        snapshot device: use _get_device_field to read a reading field or _get_device_data to get
+        a mutable device with its readings
+
+        Args:
+            device_uuid (str): device uuid
+
+        Returns:
+            MappingProxyType: read-only device or None if device doesn't exist
+        """
+        return self._get_devices_snapshot().get(device_uuid)
+
+    def _get_device_data(self, device_uuid):
+        """
+        Return mutable device with its readings
+
+        Args:
+            device_uuid (str): device uuid
+
+        Returns:
+            dict: device data or None if device doesn't exist
+        """
+        device = self._get_device(device_uuid)
+        return self._device_to_dict(device) if device is not None else None
+
+    def _get_devices(self):
+        """
+        Return all devices with their readings
+
+        Returns:
+            dict: devices data by uuid
+        """
+        return {
+            device_uuid: self._device_to_dict(device)
+            for device_uuid, device in self._get_devices_snapshot().items()
+        }
+
+    def _get_devices_snapshot(self):
+        """
+        Return read-only snapshot of stored devices (without readings).
+
+        Snapshot is never modified: devices writers build a new snapshot and swap it (copy-on-write),
+        so it can be read without copy nor lock. Use _device_to_dict to get a mutable device from a
+        snapshot device.
+
+        Returns:
+            MappingProxyType: read-only devices (MappingProxyType) by uuid. Device lists are tuples
+        """
+        snapshot = self._devices_snapshot
+        if snapshot is None:
+            with self._devices_lock:
+                if self._devices_snapshot is None:
+                    self._refresh_devices_snapshot()
+                snapshot = self._devices_snapshot
+
+        return snapshot
+
+    def _refresh_devices_snapshot(self):
+        """
+        Build devices snapshot from stored devices and swap it (devices lock must be acquired)
+        """
+        devices = {
+            device_uuid: self._freeze_device(device)
+            for device_uuid, device in super()._get_devices().items()
+        }
+        self._devices_snapshot = MappingProxyType(devices)
+
+    def _freeze_device(self, device):
+        """
+        Convert device to read-only device
+
+        Args:
+            device (dict): device data
+
+        Returns:
+            MappingProxyType: read-only device data
+        """
+        frozen = {}
+        for key, value in device.items():
+            if isinstance(value, dict):
+                value = MappingProxyType(dict(value))
+            elif isinstance(value, list):
+                value = tuple(MappingProxyType(dict(item)) if isinstance(item, dict) else item for item in value)
+            frozen[key] = value
+
+        return MappingProxyType(frozen)
+
+    def _device_to_dict(self, device):
+        """
+        Convert snapshot device to mutable device data with its readings
+
+        Args:
+            device (MappingProxyType): snapshot device
+
+        Returns:
+            dict: device data
+        """
+        data = self._thaw_device(device)
+        data.update(self._state_store.get(device["uuid"]))
+
+        return data
+
+    def _thaw_device(self, device):
+        """
+        Convert snapshot device to mutable device data
+
+        Args:
+            device (MappingProxyType): snapshot device
+
+        Returns:
+            dict: device data
+        """
+        data = {}
+        for key, value in device.items():
+            if isinstance(value, MappingProxyType):
+                value = dict(value)
+            elif isinstance(value, tuple):
+                value = [dict(item) if isinstance(item, MappingProxyType) else item for item in value]
+            data[key] = value
+
+        return data
+
+    def _add_device(self, data):
+        """
+        Add device and replace devices snapshot
+
+        Args:
+            data (dict): device data
+
+        Returns:
+            dict: added device data or None if error occured
+        """
+        with self._devices_lock:
+            device = super()._add_device(data)
+            self._refresh_devices_snapshot()
+        return device
+
+    def _update_device(self, device_uuid, data):
+        """
+        Update device and replace devices snapshot
+
+        Args:
+            device_uuid (str): device uuid
+            data (dict): device data
+
+        Returns:
+            bool: True if device updated
+        """
+        with self._devices_lock:
+            updated = super()._update_device(device_uuid, data)
+            self._refresh_devices_snapshot()
+        return updated
+
+    def _delete_device(self, device_uuid):
+        """
+        Delete device and replace devices snapshot
+
+        Args:
+            device_uuid (str): device uuid
+
+        Returns:
+            bool: True if device deleted
+        """
+        with self._devices_lock:
+            deleted = super()._delete_device(device_uuid)
+            self._refresh_devices_snapshot()
+        return deleted
+
+    def _update_config(self, config):
+        """
+        Update configuration. Devices snapshot is replaced when devices are updated
+
+        Args:
+            config (dict): configuration fields to update
+
+        Returns:
+            bool: True if configuration updated
+        """
+        if "devices" not in config:
+            return super()._update_config(config)
+
+        with self._devices_lock:
+            updated = super()._update_config(config)
+            self._refresh_devices_snapshot()
+        return updated
+
+    def _merge_readings(self, device):
         """
-        Start application
+        Merge sensor readings from state store to device data
+
+        Args:
+            device (dict): device data
+
+        Returns:
+            dict: device data copy with readings, or device itself if there is no readings
         """
-        # raspi gpios
-        self.raspi_gpios = self._get_raspi_gpios()
+        if device is None:
+            return None
+        readings = self._state_store.get(device["uuid"])
+        return {**device, **readings} if readings else device
 
-        # update addons
-        for _, addon in self.addons_by_name.items():
-            addon.raspi_gpios = self.raspi_gpios
+    def _split_sensor(self, sensor):
+        """
+        Split sensor data into static configuration and volatile readings
 
-        # launch tasks
-        sensors = self.get_module_devices()
-        for _, sensor in sensors.items():
-            addon = self._get_addon(sensor["type"], sensor["subtype"])
-            if addon is None:
+        Args:
+            sensor (dict): sensor data
+
+        Returns:
+            tuple: sensor configuration (dict), sensor readings (dict)
+        """
+        config = {key: value for key, value in sensor.items() if key not in SensorsUtils.READING_FIELDS}
+        readings = {key: value for key, value in sensor.items() if key in SensorsUtils.READING_FIELDS}
+        return (config, readings)
+
+    def _migrate_sensors_readings(self):
+        """
+        Move readings stored in sensors configuration (previous versions) to state store
+        """
+        devices = self._get_devices_snapshot()
+        if not any(key in SensorsUtils.READING_FIELDS for device in devices.values() for key in device):
+            return
+
+        configs = {}
+        for device_uuid, device in devices.items():
+            (configs[device_uuid], readings) = self._split_sensor(self._thaw_device(device))
+            if not self._state_store.get(device_uuid):
+                self._state_store.update(device_uuid, readings)
+        if not self._update_config({"devices": configs}):
+            self.logger.error("Unable to remove readings from sensors configuration")
+
+    def _migrate_sensors_channels(self):
+        """
+        Link channels of multi-channel sensors stored by previous versions (only linked by their name
+        and gpio) to their physical device
+        """
+        devices = self._get_devices_snapshot()
+        physical_uuids = {}
+        configs = None
+        for device_uuid, device in devices.items():
+            addon = self._get_addon(device["type"], device["subtype"])
+            if not addon or not addon.MULTI_CHANNEL or device.get("physicaluuid") or not device.get("gpios"):
                 continue
-            self._start_sensor_task(addon.get_task(sensor), [sensor])
 
-    def _on_stop(self):
+            # channels of the same physical device share the same gpio
+            if configs is None:
+                configs = {uuid: self._thaw_device(device_) for uuid, device_ in devices.items()}
+            physical_uuid = physical_uuids.setdefault(device["gpios"][0]["uuid"], str(uuid4()))
+            configs[device_uuid]["physicaluuid"] = physical_uuid
+
+        if configs and not self._update_config({"devices": configs}):
+            self.logger.error("Unable to link sensors channels to their physical device")
+
+    def _update_sensor_fields(self, sensor_uuid, fields):
         """
-        Stop application
+        Update sensor readings fields in state store. Unchanged fields are ignored and readings are
+        persisted by state store flushes
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            fields (dict): reading fields to update
+
+        Returns:
+            dict: changed fields with their new value, None if sensor doesn't exist
+
+        Raises:
+            InvalidParameter: if a field is not a reading field
         """
-        # stop tasks
-        for _, task in self._tasks_by_device_uuid.items():
-            task.stop()
+        for field in fields:
+            if field not in SensorsUtils.READING_FIELDS:
+                raise InvalidParameter(f'Field "{field}" is not a sensor reading')
+        if sensor_uuid not in self._gpios_by_sensor:
+            self.logger.warning('Unable to update fields of unknown sensor "%s"', sensor_uuid)
+            return None
+
+        changed = self._state_store.update(sensor_uuid, fields)
+        self._batch_readings(sensor_uuid, fields, changed)
+        if "on" in changed:
+            self._zones.update(sensor_uuid, changed["on"])
+        return changed
+
+    def _update_sensors_fields(self, fields_by_sensor):
+        """
+        Update readings fields of several sensors (channels of the same physical device) at once.
+        Readings of all sensors are updated atomically
 
-    def on_event(self, event):
+        Args:
+            fields_by_sensor (dict): reading fields to update by sensor uuid
+
+        Returns:
+            dict: changed fields by sensor uuid, None if a sensor doesn't exist (nothing is updated)
+
+        Raises:
+            InvalidParameter: if a field is not a reading field
         """
-        Event received
+        for fields in fields_by_sensor.values():
+            for field in fields:
+                if field not in SensorsUtils.READING_FIELDS:
+                    raise InvalidParameter(f'Field "{field}" is not a sensor reading')
+        for sensor_uuid in fields_by_sensor:
+            if sensor_uuid not in self._gpios_by_sensor:
+                self.logger.warning('Unable to update fields of unknown sensor "%s"', sensor_uuid)
+                return None
+
+        changed_by_sensor = self._state_store.update_many(fields_by_sensor)
+        for sensor_uuid, changed in changed_by_sensor.items():
+            self._batch_readings(sensor_uuid, fields_by_sensor[sensor_uuid], changed)
+            if "on" in changed:
+                self._zones.update(sensor_uuid, changed["on"])
+        return changed_by_sensor
+
+    def get_zones(self):
+        """
+        Return occupancy zones
+
+        Returns:
+            list: list of zones::
+
+                [
+                    {
+                        uuid (str): zone uuid
+                        name (str): zone name
+                        sensors (list): motion sensors uuids
+                        vacancytimeout (int): vacancy timeout (seconds)
+                        occupied (bool): True if zone is occupied
+                        since (float): last zone change timestamp
+                        active (list): uuids of zone sensors that are on
+                    },
+                    ...
+                ]
 
-        Params:
-            event (MessageRequest): event data
         """
-        # drop startup events
-        if event["startup"]:
-            self.logger.debug("Drop startup event")
+        zones = []
+        for zone_uuid, zone in self._get_config_field("zones").items():
+            state = self._zones.get_state(zone_uuid) or {"occupied": False, "since": None, "active": []}
+            zones.append({"uuid": zone_uuid, **zone, **state})
+
+        return zones
+
+    def add_zone(self, name, sensors, vacancy_timeout):
+        """
+        Add occupancy zone grouping motion sensors. Zone is occupied when one of its sensors is on,
+        and vacant when all its sensors stayed off during vacancy timeout
+
+        Args:
+            name (str): zone name
+            sensors (list): motion sensors uuids
+            vacancy_timeout (int): vacancy timeout (seconds)
+
+        Returns:
+            dict: created zone
+        """
+        self._check_zone_parameters(name, sensors, vacancy_timeout)
+
+        zone_uuid = str(uuid4())
+        zones = dict(self._get_config_field("zones"))
+        zones[zone_uuid] = {"name": name, "sensors": list(sensors), "vacancytimeout": vacancy_timeout}
+        if not self._update_config({"zones": zones}):
+            raise CommandError("Unable to save configuration")
+        self._zones.set_zones(zones)
+
+        return {"uuid": zone_uuid, **zones[zone_uuid]}
+
+    def update_zone(self, zone_uuid, name, sensors, vacancy_timeout):
+        """
+        Update occupancy zone
+
+        Args:
+            zone_uuid (str): zone uuid
+            name (str): zone name
+            sensors (list): motion sensors uuids
+            vacancy_timeout (int): vacancy timeout (seconds)
+
+        Returns:
+            dict: updated zone
+        """
+        zones = dict(self._get_config_field("zones"))
+        self._check_parameters([
+            {
+                "name": "zone_uuid",
+                "value": zone_uuid,
+                "type": str,
+                "validator": lambda val: val in zones,
+                "message": f'Zone with uuid "{zone_uuid}" doesn\'t exist',
+            },
+        ])
+        self._check_zone_parameters(name, sensors, vacancy_timeout, zone_uuid)
+
+        zones[zone_uuid] = {"name": name, "sensors": list(sensors), "vacancytimeout": vacancy_timeout}
+        if not self._update_config({"zones": zones}):
+            raise CommandError("Unable to save configuration")
+        self._zones.set_zones(zones)
+
+        return {"uuid": zone_uuid, **zones[zone_uuid]}
+
+    def delete_zone(self, zone_uuid):
+        """
+        Delete occupancy zone
+
+        Args:
+            zone_uuid (str): zone uuid
+
+        Returns:
+            bool: True if zone deleted
+        """
+        zones = dict(self._get_config_field("zones"))
+        self._check_parameters([
+            {
+                "name": "zone_uuid",
+                "value": zone_uuid,
+                "type": str,
+                "validator": lambda val: val in zones,
+                "message": f'Zone with uuid "{zone_uuid}" doesn\'t exist',
+            },
+        ])
+
+        del zones[zone_uuid]
+        if not self._update_config({"zones": zones}):
+            raise CommandError("Unable to save configuration")
+        self._zones.set_zones(zones)
+
+        return True
+
+    def _check_zone_parameters(self, name, sensors, vacancy_timeout, zone_uuid=None):
+        """
+        Check zone parameters
+
+        Args:
+            name (str): zone name
+            sensors (list): motion sensors uuids
+            vacancy_timeout (int): vacancy timeout (seconds)
+            zone_uuid (str): uuid of updated zone. None for new zone
+
+        Raises:
+            MissingParameter: if a parameter is missing
+            InvalidParameter: if a parameter is invalid
+        """
+        zones = self._get_config_field("zones")
+
+        def is_motion_sensor(sensor_uuid):
+            sensor = self._get_device(sensor_uuid)
+            return sensor is not None and sensor["type"] == SensorMotionGeneric.TYPE_MOTION
+
+        self._check_parameters([
+            {
+                "name": "name",
+                "value": name,
+                "type": str,
+                "validator": lambda val: all(
+                    zone["name"] != val for uuid, zone in zones.items() if uuid != zone_uuid
+                ),
+                "message": f'Name "{name}" is already used',
+            },
+            {
+                "name": "sensors",
+                "value": sensors,
+                "type": list,
+                "validator": lambda val: len(val) > 0 and all(is_motion_sensor(uuid) for uuid in val),
+                "message": "Sensors must be a non empty list of motion sensors",
+            },
+            {
+                "name": "vacancy_timeout",
+                "value": vacancy_timeout,
+                "type": int,
+                "validator": lambda val: val >= 0,
+                "message": "Vacancy timeout must be positive",
+            },
+        ])
+
+    def _on_zone_change(self, zone_uuid, occupied, timestamp, duration):
+        """
+        Send zone occupancy change event
+
+        Args:
+            zone_uuid (str): zone uuid
+            occupied (bool): True if zone is occupied
+            timestamp (float): change timestamp
+            duration (float): occupancy duration (seconds) if zone is vacant
+        """
+        zone = self._get_config_field("zones").get(zone_uuid)
+        if zone is None:
             return
 
-        # driver event
-        if event["event"] in ("system.driver.install", "system.driver.uninstall"):
-            for _, addon in self.addons_by_name.items():
-                if addon.has_drivers():
-                    addon.process_event(event, None)
-
-        # gpio event
-        if event["event"] in ("gpios.gpio.on", "gpios.gpio.off"):
-            # drop gpio init
-            if event["params"]["init"]:
-                self.logger.debug("Drop gpio init event")
-                return
-
-            # get uuid event
-            gpio_uuid = event["device_id"]
-
-            # search sensor
-            sensor = self._search_by_gpio(gpio_uuid)
-            self.logger.debug("Found sensor: %s", sensor)
-            if not sensor:
-                return
-
-            # process event on addon
-            addon = self._get_addon(sensor["type"], sensor["subtype"])
-            self.logger.debug("Found addon: %s", addon)
-            if addon:
-                addon.process_event(event, sensor)
+        if occupied:
+            self.sensors_zone_occupied.send(
+                params={"zone": zone["name"], "lastupdate": int(timestamp)},
+                device_id=zone_uuid,
+            )
+        else:
+            self.sensors_zone_vacant.send(
+                params={"zone": zone["name"], "lastupdate": int(timestamp), "duration": duration},
+                device_id=zone_uuid,
+            )
 
-    def _search_by_gpio(self, gpio_uuid):
+    def _get_state_snapshot_path(self):
         """
-        Search sensor connected to specified gpio_uuid
+        Return state snapshot path
 
-        Params:
-            gpio_uuid (string): gpio uuid to search
+        Returns:
+            str: tmpfs snapshot path or None if state snapshot is disabled
+        """
+        return self.STATE_SNAPSHOT_PATH if self._get_config_field("statesnapshot") else None
+
+    def _flush_readings(self):
+        """
+        Snapshot sensors state to tmpfs and append changed readings to state journal.
+        Sensors configuration is never written
 
         Returns:
-            dict: sensor data or None if nothing found
+            bool: True if sensors state is persisted
         """
-        devices = self.get_module_devices()
-        for device in devices.values():
-            for gpio in device["gpios"]:
-                if gpio["uuid"] == gpio_uuid:
-                    # sensor found
-                    return device
+        persisted = True
+        snapshot_path = self._get_state_snapshot_path()
+        if snapshot_path:
+            persisted = self._state_store.snapshot(snapshot_path)
 
-        # nothing found
-        return None
+        return self._state_store.append() and persisted
+
+    def set_state_snapshot(self, enabled):
+        """
+        Enable or disable sensors state snapshot to tmpfs
+
+        Args:
+            enabled (bool): True to enable state snapshot
+
+        Returns:
+            bool: True if state snapshot updated
+        """
+        self._check_parameters([{"name": "enabled", "value": enabled, "type": bool}])
+
+        if not self._update_config({"statesnapshot": enabled}):
+            raise CommandError("Unable to save configuration")
+
+        return True
+
+    def set_readings_batch(self, enabled):
+        """
+        Enable or disable readings batch event. When enabled, readings of all sensors updated during the
+        same scheduler tick are also sent at once in a sensors.readings.batch event
+
+        Args:
+            enabled (bool): True to enable readings batch event
+
+        Returns:
+            bool: True if readings batch updated
+        """
+        self._check_parameters([{"name": "enabled", "value": enabled, "type": bool}])
+
+        if not self._update_config({"readingsbatch": enabled}):
+            raise CommandError("Unable to save configuration")
+        self._readings_batch = enabled
+        if not enabled:
+            self._batcher.flush()
+
+        return True
+
+    def _batch_readings(self, sensor_uuid, fields, changed):
+        """
+        Add updated sensor readings to current readings batch if readings batch is enabled
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            fields (dict): updated reading fields
+            changed (dict): changed reading fields
+        """
+        if not self._readings_batch or not changed:
+            return
+        values = {field: value for field, value in fields.items() if field != "lastupdate"}
+        if not values:
+            return
+        sensor = self._get_devices_snapshot().get(sensor_uuid)
+        if sensor is None:
+            return
+
+        self._batcher.add(sensor_uuid, sensor["type"], values, fields.get("lastupdate") or int(time.time()))
+
+    def _on_readings_batch(self, timestamp, readings):
+        """
+        Send readings batch event
+
+        Args:
+            timestamp (float): batch timestamp
+            readings (list): list of sensors readings [uuid, type, values, timestamp]
+        """
+        self.sensors_readings_batch.send(params={"timestamp": timestamp, "readings": readings})
+
+    def set_flush_interval(self, interval):
+        """
+        Set sensors state flush interval
+
+        Args:
+            interval (int): interval between two sensors state snapshots (seconds)
+
+        Returns:
+            bool: True if flush interval updated
+        """
+        self._check_parameters([
+            {
+                "name": "interval",
+                "value": interval,
+                "type": int,
+                "validator": lambda val: val >= 10,
+                "message": "Flush interval must be greater or equal than 10",
+            },
+        ])
+
+        if not self._update_config({"flushinterval": interval}):
+            raise CommandError("Unable to save configuration")
+        self._flush_task.reconfigure(interval=interval)
+
+        return True
 
     def get_module_config(self):
         """
@@ -216,7 +1725,23 @@ class Sensors(CleepModule):
         Returns:
             dict: module configuration
         """
-        config = {"drivers": {}, "sensorstypes": self.sensors_types}
+        config = {
+            "drivers": {},
+            "sensorstypes": self.sensors_types,
+            "alignedsampling": self._is_aligned_sampling(),
+            "idlepolling": self._get_config_field("idlepolling"),
+            "idleinterval": self._get_config_field("idleinterval"),
+            "alwayson": self._get_config_field("alwayson"),
+            "asyncengine": self._get_config_field("asyncengine"),
+            "processisolation": self._get_config_field("processisolation"),
+            "flushinterval": self._get_config_field("flushinterval"),
+            "statesnapshot": self._get_config_field("statesnapshot"),
+            "deadbands": self._get_config_field("deadbands"),
+            "readingsbatch": self._get_config_field("readingsbatch"),
+            "statswindows": self._get_config_field("statswindows"),
+            "statssummary": self._get_config_field("statssummary"),
+            "zones": self.get_zones(),
+        }
 
         # add drivers
         for _, addon in self.addons_by_name.items():
@@ -235,13 +1760,7 @@ class Sensors(CleepModule):
         Returns:
             number of devices that are using the gpio
         """
-        devices = self._get_devices()
-        uses = 0
-        for device in devices.values():
-            for gpio_ in device["gpios"]:
-                if gpio == gpio_["gpio"]:
-                    uses += 1
-        return uses
+        return self._gpio_uses.get(gpio, 0)
 
     def _get_raspi_gpios(self):
         """
@@ -259,11 +1778,15 @@ class Sensors(CleepModule):
 
     def _get_assigned_gpios(self):
         """
-        Return assigned gpios
+        Return assigned gpios. During bulk add, gpios requested at batch start completed with batch
+        gpios are returned
 
         Returns:
             list: assigned gpios
         """
+        if self._batch_assigned_gpios is not None:
+            return self._batch_assigned_gpios
+
         resp = self.send_command("get_assigned_gpios", "gpios")
         if resp.error:
             self.logger.error(resp.message)
@@ -271,6 +1794,25 @@ class Sensors(CleepModule):
 
         return resp.data
 
+    def _get_batch_value(self, key, loader):
+        """
+        Return value shared by all sensors of a bulk add, so addons request it once per batch.
+        Outside bulk add, value is loaded at each call
+
+        Args:
+            key (str): value key
+            loader (callable): function returning value
+
+        Returns:
+            any: loaded value
+        """
+        if self._batch_cache is None:
+            return loader()
+
+        if key not in self._batch_cache:
+            self._batch_cache[key] = loader()
+        return self._batch_cache[key]
+
     def _get_addon(self, sensor_type, sensor_subtype):
         """
         Return addon
@@ -319,10 +1861,10 @@ class Sensors(CleepModule):
             dict: input gpio with valid data to request gpios app
         """
         self.logger.debug("Gpio to fix: %s", gpio_device)
-        fixed_gpio_device = copy.deepcopy(gpio_device)
+        # gpio fields are flat values, no need to deep copy it
+        fixed_gpio_device = {key: value for key, value in gpio_device.items() if key != "uuid"}
         if "uuid" in gpio_device:
             fixed_gpio_device["device_uuid"] = gpio_device["uuid"]
-            del fixed_gpio_device["uuid"]
 
         return fixed_gpio_device
 
@@ -374,13 +1916,17 @@ class Sensors(CleepModule):
             # add sensors
             for sensor in sensors:
                 self.logger.debug("add_device with: %s", sensor)
-                added_sensor = self._add_device(sensor)
+                (config, readings) = self._split_sensor(sensor)
+                added_sensor = self._add_device(config)
                 if added_sensor is None:
                     raise CommandError("Unable to save new sensor")
+                self._state_store.update(added_sensor["uuid"], readings)
+                added_sensor = self._merge_readings(added_sensor)
                 sensor_devices.append(added_sensor)
+                self._index_sensor(added_sensor)
 
             # start task
-            self._start_sensor_task(addon.get_task(sensor_devices[0]), sensor_devices)
+            self._start_sensor_task(addon.get_task(sensor_devices[0]), sensor_devices, warm_start=False)
 
             return sensor_devices
 
@@ -396,6 +1942,8 @@ class Sensors(CleepModule):
             # undo saved sensors
             for sensor in sensor_devices:
                 self._delete_device(sensor["uuid"])
+                self._unindex_sensor(sensor["uuid"])
+                self._state_store.remove(sensor["uuid"])
 
             raise CommandError("Error occured adding sensor") from error
 
@@ -411,7 +1959,7 @@ class Sensors(CleepModule):
         """
         if not sensor_uuid:
             raise MissingParameter("Uuid parameter is missing")
-        sensor = self._get_device(sensor_uuid)
+        sensor = self._get_device_data(sensor_uuid)
         if sensor is None:
             raise InvalidParameter(f'Sensor with uuid "{sensor_uuid}" doesn\'t exist')
 
@@ -430,55 +1978,332 @@ class Sensors(CleepModule):
 
             # unconfigure gpios
             self.logger.debug("Gpios: %s", gpios)
-            for gpio in gpios:
-                # is a reserved gpio
-                self.logger.debug('is_reserved_gpio for gpio "%s"', gpio)
-                resp = self.send_command(
-                    "is_reserved_gpio", "gpios", {"gpio": gpio["uuid"]}
-                )
-                self.logger.debug("is_reserved_gpio: %s", resp)
-                if resp.error:
-                    raise CommandError(resp.message)
-                reserved_gpio = resp.data
-
-                # check if we can delete gpio
-                delete_gpio = True
-                if reserved_gpio:
-                    # reserved gpio, don't delete it
-                    delete_gpio = False
-                elif self._get_gpio_uses(gpio["gpio"]) > 1:
-                    # another device is using gpio, do not delete it in gpio module
-                    self.logger.info(
-                        "More than one sensor is using gpio, disable gpio deletion"
-                    )
-                    delete_gpio = False
-
-                # delete device in gpio module
-                if delete_gpio:
-                    self.logger.debug(
-                        'Delete gpio "%s" from gpios module', gpio["uuid"]
-                    )
-                    resp = self.send_command(
-                        "delete_gpio", "gpios", {"device_uuid": gpio["uuid"]}
-                    )
-                    if resp.error:
-                        self.logger.warning("Gpio can't be deleted: %s", resp.error)
-                else:
-                    self.logger.debug(
-                        "Gpio device not deleted because other sensor is using it"
-                    )
+            self._delete_gpios(self._get_deletable_gpios(gpios, sensors))
 
             # delete sensors
             for sensor in sensors:
                 self._delete_device(sensor["uuid"])
+                self._unindex_sensor(sensor["uuid"])
+                self._state_store.remove(sensor["uuid"])
+                self._demand.forget(sensor["uuid"])
+                self._deadband.forget(sensor["uuid"])
+                self._stats.forget(sensor["uuid"])
+                self._zones.forget(sensor["uuid"])
                 self.logger.debug('Sensor "%s" deleted successfully', sensor["uuid"])
 
+            # clean always on sensors
+            self._clean_always_on([sensor["uuid"] for sensor in sensors])
+            self._clean_deadbands([sensor["uuid"] for sensor in sensors])
+            self._clean_zones([sensor["uuid"] for sensor in sensors])
+
             return True
 
         except Exception as error:
             self.logger.exception('Error occured deleting sensor "%s":', sensor_uuid)
             raise CommandError("Error deleting sensor") from error
 
+    def add_sensors(self, sensors):
+        """
+        Add several sensors at once.
+        Whole batch is validated before anything is saved, all sensors are saved with a single
+        configuration write and whole batch is rolled back if something fails
+
+        Args:
+            sensors (list): list of sensors to add::
+
+                [
+                    {
+                        type (str): sensor type
+                        subtype (str): sensor subtype
+                        data (dict): sensor data (see add_sensor)
+                    },
+                    ...
+                ]
+
+        Returns:
+            list: list of created sensors::
+
+                [ SensorInstance1, SensorInstance2, ...]
+        """
+        self._check_parameters([
+            {
+                "name": "sensors",
+                "value": sensors,
+                "type": list,
+                "validator": lambda val: len(val) > 0 and all(isinstance(item, dict) for item in val),
+                "message": "Sensors must be a non empty list of sensors",
+            },
+        ])
+
+        # validate whole batch. Assigned gpios are requested once and completed with batch gpios
+        batch = []
+        names = set()
+        self._batch_assigned_gpios = list(self._get_assigned_gpios())
+        self._batch_cache = {}
+        try:
+            for item in sensors:
+                addon = self._get_addon(item.get("type"), item.get("subtype"))
+                if addon is None:
+                    raise CommandError(f'Sensor subtype "{item.get("subtype")}" doesn\'t exist')
+                data = item.get("data") or {}
+                if data.get("name") in names:
+                    raise InvalidParameter(f'Name "{data.get("name")}" is used several times')
+                names.add(data.get("name"))
+
+                (gpios, sensors_) = addon.add(data).values()
+                if not isinstance(gpios, list) or not isinstance(sensors_, list): # pragma: no cover
+                    raise TypeError("Invalid gpios or sensors type. Must be a list")
+                self._batch_assigned_gpios.extend([gpio["gpio"] for gpio in gpios])
+                batch.append((addon, gpios, sensors_))
+        finally:
+            self._batch_assigned_gpios = None
+            self._batch_cache = None
+
+        # add gpios and save all sensors at once
+        gpio_devices = []
+        added = []
+        previous_devices = {
+            device_uuid: self._thaw_device(device)
+            for device_uuid, device in self._get_devices_snapshot().items()
+        }
+        try:
+            devices = dict(previous_devices)
+            for (addon, gpios, sensors_) in batch:
+                item_gpio_devices = []
+                for gpio in gpios:
+                    resp_gpio = self.send_command("add_gpio", "gpios", self._fix_gpio_device(gpio))
+                    if resp_gpio.error:
+                        raise CommandError(resp_gpio.message)
+                    gpio_devices.append(resp_gpio.data)
+                    item_gpio_devices.append(resp_gpio.data)
+
+                item_sensors = []
+                for sensor in sensors_:
+                    self._fill_sensor_gpios(sensor, item_gpio_devices)
+                    (config, readings) = self._split_sensor(sensor)
+                    config["uuid"] = str(uuid4())
+                    devices[config["uuid"]] = config
+                    item_sensors.append((config, readings))
+                added.append((addon, item_sensors))
+
+            if not self._update_config({"devices": devices}):
+                raise CommandError("Unable to save new sensors")
+
+        except Exception as error:
+            self.logger.exception("Error occured adding sensors: %s", sensors)
+
+            # undo saved gpios
+            for gpio in gpio_devices:
+                self.send_command("delete_gpio", "gpios", {"device_uuid": gpio["uuid"]})
+
+            raise CommandError("Error occured adding sensors") from error
+
+        # index sensors and start acquisition. Whole batch is rolled back if a sensor can't be started
+        sensor_devices = []
+        try:
+            for (addon, item_sensors) in added:
+                item_devices = []
+                for (config, readings) in item_sensors:
+                    self._state_store.update(config["uuid"], readings)
+                    sensor_device = self._merge_readings(config)
+                    self._index_sensor(sensor_device)
+                    item_devices.append(sensor_device)
+                sensor_devices.extend(item_devices)
+                self._start_sensor_task(addon.get_task(item_devices[0]), item_devices, warm_start=False)
+
+        except Exception as error:
+            self.logger.exception("Error occured starting sensors: %s", sensors)
+
+            # undo started tasks, indexes and saved sensors
+            for (_, item_sensors) in added:
+                for (config, _) in item_sensors:
+                    if config["uuid"] in self._tasks_by_device_uuid:
+                        self._stop_sensor_task(config)
+                    self._unindex_sensor(config["uuid"])
+                    self._state_store.remove(config["uuid"])
+            if not self._update_config({"devices": previous_devices}):
+                self.logger.error("Unable to remove sensors %s", [sensor["uuid"] for sensor in sensor_devices])
+            for gpio in gpio_devices:
+                self.send_command("delete_gpio", "gpios", {"device_uuid": gpio["uuid"]})
+
+            raise CommandError("Error occured adding sensors") from error
+
+        return sensor_devices
+
+    def delete_sensors(self, sensor_uuids):
+        """
+        Delete several sensors at once.
+        Whole batch is validated before anything is deleted and all sensors are deleted with a single
+        configuration write. Sensors tasks are restarted if configuration can't be saved
+
+        Args:
+            sensor_uuids (list): list of sensor uuids
+
+        Returns:
+            bool: True if deletion succeed
+        """
+        self._check_parameters([
+            {
+                "name": "sensor_uuids",
+                "value": sensor_uuids,
+                "type": list,
+                "validator": lambda val: len(val) > 0,
+                "message": "Sensor uuids list is empty",
+            },
+        ])
+
+        # validate whole batch
+        deleted_sensors = {}
+        gpios_by_uuid = {}
+        for sensor_uuid in sensor_uuids:
+            if sensor_uuid in deleted_sensors:
+                # already deleted with another sensor of the same device (dht22)
+                continue
+            sensor = self._get_device_data(sensor_uuid)
+            if sensor is None:
+                raise InvalidParameter(f'Sensor with uuid "{sensor_uuid}" doesn\'t exist')
+            addon = self._get_addon(sensor["type"], sensor["subtype"])
+            if addon is None:
+                raise CommandError(f'Unhandled sensor type "{sensor["type"]}-{sensor["subtype"]}"')
+
+            (gpios, sensors) = addon.delete(sensor).values()
+            if not isinstance(gpios, list) or not isinstance(sensors, list): # pragma: no cover
+                raise TypeError("Invalid gpios or sensors type. Must be a list")
+            gpios_by_uuid.update({gpio["uuid"]: gpio for gpio in gpios})
+            deleted_sensors.update({sensor_["uuid"]: sensor_ for sensor_ in sensors})
+        sensors = list(deleted_sensors.values())
+        deletable_gpios = self._get_deletable_gpios(list(gpios_by_uuid.values()), sensors)
+
+        # stop tasks and delete all sensors at once
+        for sensor in sensors:
+            self._stop_sensor_task(sensor)
+        devices = {
+            device_uuid: self._thaw_device(device)
+            for device_uuid, device in self._get_devices_snapshot().items()
+            if device_uuid not in deleted_sensors
+        }
+        if not self._update_config({"devices": devices}):
+            self.logger.error("Unable to delete sensors %s", list(deleted_sensors.keys()))
+            self._start_sensors_tasks(sensors)
+            raise CommandError("Error deleting sensors")
+
+        for sensor in sensors:
+            self._unindex_sensor(sensor["uuid"])
+            self._state_store.remove(sensor["uuid"])
+            self._demand.forget(sensor["uuid"])
+            self._deadband.forget(sensor["uuid"])
+            self._stats.forget(sensor["uuid"])
+            self._zones.forget(sensor["uuid"])
+        self._clean_always_on(list(deleted_sensors.keys()))
+        self._clean_deadbands(list(deleted_sensors.keys()))
+        self._clean_zones(list(deleted_sensors.keys()))
+
+        # unconfigure gpios
+        self._delete_gpios(deletable_gpios)
+
+        return True
+
+    def _get_deletable_gpios(self, gpios, sensors):
+        """
+        Return gpios that can be deleted from gpios module when specified sensors are deleted.
+        Reserved gpios and gpios used by other sensors are kept
+
+        Args:
+            gpios (list): gpios of deleted sensors
+            sensors (list): deleted sensors
+
+        Returns:
+            list: gpios to delete
+
+        Raises:
+            CommandError: if gpio reservation can't be checked
+        """
+        # gpio uses from deleted sensors are not taken into account
+        deleted_gpios = [gpio_["gpio"] for sensor in sensors for gpio_ in sensor["gpios"]]
+        deletable_gpios = []
+        for gpio in gpios:
+            # is a reserved gpio
+            self.logger.debug('is_reserved_gpio for gpio "%s"', gpio)
+            resp = self.send_command(
+                "is_reserved_gpio", "gpios", {"gpio": gpio["uuid"]}
+            )
+            self.logger.debug("is_reserved_gpio: %s", resp)
+            if resp.error:
+                raise CommandError(resp.message)
+
+            # check if we can delete gpio
+            if resp.data:
+                # reserved gpio, don't delete it
+                self.logger.debug("Gpio device not deleted because it is reserved")
+            elif self._get_gpio_uses(gpio["gpio"]) > deleted_gpios.count(gpio["gpio"]):
+                # another device is using gpio, do not delete it in gpio module
+                self.logger.info(
+                    "More than one sensor is using gpio, disable gpio deletion"
+                )
+            else:
+                deletable_gpios.append(gpio)
+
+        return deletable_gpios
+
+    def _delete_gpios(self, gpios):
+        """
+        Delete gpios from gpios module
+
+        Args:
+            gpios (list): gpios to delete
+        """
+        for gpio in gpios:
+            self.logger.debug(
+                'Delete gpio "%s" from gpios module', gpio["uuid"]
+            )
+            resp = self.send_command(
+                "delete_gpio", "gpios", {"device_uuid": gpio["uuid"]}
+            )
+            if resp.error:
+                self.logger.warning("Gpio can't be deleted: %s", resp.error)
+
+    def _clean_always_on(self, sensors_uuids):
+        """
+        Remove deleted sensors from always on sensors
+
+        Args:
+            sensors_uuids (list): deleted sensors uuids
+        """
+        always_on = self._get_config_field("alwayson")
+        if any(uuid in always_on for uuid in sensors_uuids):
+            self._update_config({"alwayson": [uuid for uuid in always_on if uuid not in sensors_uuids]})
+
+    def _clean_deadbands(self, sensors_uuids):
+        """
+        Remove deadband settings of deleted sensors
+
+        Args:
+            sensors_uuids (list): deleted sensors uuids
+        """
+        deadbands = self._get_config_field("deadbands")
+        if any(uuid in deadbands for uuid in sensors_uuids):
+            self._update_config({
+                "deadbands": {uuid: settings for uuid, settings in deadbands.items() if uuid not in sensors_uuids}
+            })
+
+    def _clean_zones(self, sensors_uuids):
+        """
+        Remove deleted sensors from zones. Zones without sensor are kept
+
+        Args:
+            sensors_uuids (list): deleted sensors uuids
+        """
+        zones = self._get_config_field("zones")
+        if not any(uuid in zone["sensors"] for zone in zones.values() for uuid in sensors_uuids):
+            return
+
+        zones = {
+            zone_uuid: {**zone, "sensors": [uuid for uuid in zone["sensors"] if uuid not in sensors_uuids]}
+            for zone_uuid, zone in zones.items()
+        }
+        self._update_config({"zones": zones})
+        self._zones.set_zones(zones)
+
     def update_sensor(self, sensor_uuid, data):
         """
         Update sensor
@@ -501,7 +2326,7 @@ class Sensors(CleepModule):
         """
         if not sensor_uuid:
             raise MissingParameter("Uuid parameter is missing")
-        sensor = self._get_device(sensor_uuid)
+        sensor = self._get_device_data(sensor_uuid)
         if sensor is None:
             raise InvalidParameter(f'Sensor with uuid "{sensor_uuid}" doesn\'t exist')
 
@@ -525,17 +2350,20 @@ class Sensors(CleepModule):
                     raise CommandError(resp_gpio.message)
                 gpio_devices.append(resp_gpio.data)
 
-            # update sensors
+            # update sensors configuration. Readings are left untouched: they may have been updated
+            # by sensor task or gpio event meanwhile
             for sensor in sensors:
-                if not self._update_device(sensor["uuid"], sensor):
+                (config, _) = self._split_sensor(sensor)
+                if not self._update_device(sensor["uuid"], config):
                     raise CommandError("Unable to update sensor")
-                sensor_devices.append(sensor)
+                sensor_devices.append(self._merge_readings(config))
+                self._index_sensor(config)
 
-            # restart sensor task
+            # reconfigure sensor task in place
             task = addon.get_task(sensor)
             if task:
-                self._stop_sensor_task(sensor)
-                self._start_sensor_task(task, [sensor])
+                self._reconfigure_sensor_task(task)
+                self._apply_sensor_demand(sensor["uuid"])
 
             return sensor_devices
 
@@ -545,13 +2373,15 @@ class Sensors(CleepModule):
             )
             raise CommandError("Error updating sensor") from error
 
-    def _start_sensor_task(self, task, sensors):
+    def _start_sensor_task(self, task, sensors, warm_start=True):
         """
         Start specified sensor task
 
         Args:
-            task (Task): task to start. If None nothing will be done
+            task (SensorTask): task to start. If None nothing will be done
             sensors (list): sensors list. If None nothing will be done
+            warm_start (bool): schedule first run from sensors last-known readings instead of running
+                task immediately (default True)
         """
         # for some sensors there is no task because sensor value is updated by another way (gpio event...)
         if not task or not sensors:
@@ -563,8 +2393,37 @@ class Sensors(CleepModule):
         for sensor in sensors:
             self._tasks_by_device_uuid[sensor["uuid"]] = task
             sensor_name = sensor["name"]
-        self.logger.debug('Start task for sensor "%s" [%s]', sensor_name, id(task))
-        task.start()
+        task.lane = self._polling_lane
+        task.engine = self._async_engine if self._get_config_field("asyncengine") else None
+        if self._is_aligned_sampling():
+            self.logger.debug('Add task for sensor "%s" to aligned sampler [%s]', sensor_name, id(task))
+            self._sampler.add(task)
+            return
+        first_run = self._get_task_first_run(task, sensors) if warm_start else None
+        self.logger.debug('Start task for sensor "%s" (first run at %s) [%s]', sensor_name, first_run, id(task))
+        task.start(first_run=first_run)
+
+    def _get_task_first_run(self, task, sensors):
+        """
+        Compute first run of sensor task from sensors last-known readings (warm start), so sensors
+        recently read (before application restart) are not all read again at once.
+        First run is scheduled at oldest sensor last update plus task interval, clamped between
+        WARM_START_MIN_DELAY and task interval from now.
+
+        Args:
+            task (SensorTask): sensor task
+            sensors (list): task sensors
+
+        Returns:
+            float: first run timestamp or None if a sensor has never been read (immediate run)
+        """
+        last_updates = [self._state_store.get(sensor["uuid"]).get("lastupdate") for sensor in sensors]
+        if not last_updates or None in last_updates:
+            return None
+
+        now = time.time()
+        first_run = min(last_updates) + task.interval
+        return min(max(first_run, now + self.WARM_START_MIN_DELAY), now + task.interval)
 
     def _stop_sensor_task(self, sensor):
         """
@@ -586,10 +2445,41 @@ class Sensors(CleepModule):
 
         # stop task
         self.logger.debug('Stop task for sensor "%s" [%s]', sensor["name"], id(task))
+        self._sampler.remove(task)
         task.stop()
 
-        # purge not running task
+        # purge stopped task
         for device_uuid in list(self._tasks_by_device_uuid.keys()):
-            if not self._tasks_by_device_uuid[device_uuid].is_running():
+            if self._tasks_by_device_uuid[device_uuid] is task:
                 del self._tasks_by_device_uuid[device_uuid]
 
+    def _reconfigure_sensor_task(self, task):
+        """
+        Apply specified task configuration (interval, sensors) on running sensor task.
+        Running task thread is kept and its next run is rescheduled according to new interval.
+        If no task is running for task sensors, specified task is started.
+
+        Args:
+            task (SensorTask): task built with updated sensors
+        """
+        running_task = None
+        for sensor in task.sensors:
+            running_task = self._tasks_by_device_uuid.get(sensor["uuid"])
+            if running_task:
+                break
+        if self._is_aligned_sampling():
+            # move task to the sampler group of its new interval
+            if running_task:
+                self._sampler.remove(running_task)
+            self._start_sensor_task(task, task.sensors)
+            return
+        if running_task is None or not running_task.is_running():
+            self._start_sensor_task(task, task.sensors)
+            return
+
+        self.logger.debug(
+            'Reconfigure task for sensors %s [%s]', [sensor["name"] for sensor in task.sensors], id(running_task)
+        )
+        running_task.reconfigure(interval=task.interval, sensors=task.task_args)
+        for sensor in task.sensors:
+            self._tasks_by_device_uuid[sensor["uuid"]] = running_task
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SensorsAsyncEngine:
+    """
+    Sensors asyncio acquisition engine
+
+    Runs sensors read coroutines on a single event loop running in its own thread. Reads of many sensors
+    are executed concurrently without dedicated worker threads, and all pending reads are cancelled
+    when engine is stopped. Blocking calls that coroutines delegate to loop default executor share a
+    small bounded thread pool.
+    """
+
+    BLOCKING_WORKERS = 2
+
+    def __init__(self, logger):
+        """
+        Constructor
+
+        Args:
+            logger (Logger): logger instance
+        """
+        self.logger = logger
+        self.__loop = None
+        self.__thread = None
+        self.__executor = None
+        self.__futures = set()
+        self.__lock = threading.Lock()
+
+    def is_running(self):
+        """
+        Return engine running status
+
+        Returns:
+            bool: True if engine is running
+        """
+        return self.__loop is not None and self.__loop.is_running()
+
+    def start(self):
+        """
+        Start engine event loop
+        """
+        if self.__thread:
+            return
+
+        started = threading.Event()
+        self.__loop = asyncio.new_event_loop()
+        self.__executor = ThreadPoolExecutor(
+            max_workers=self.BLOCKING_WORKERS, thread_name_prefix="sensors-asyncengine"
+        )
+        self.__loop.set_default_executor(self.__executor)
+        self.__thread = threading.Thread(
+            target=self.__run, args=(started,), name="sensors-asyncengine", daemon=True
+        )
+        self.__thread.start()
+        started.wait()
+
+    def stop(self, timeout=None):
+        """
+        Cancel pending coroutines and stop engine event loop
+
+        Args:
+            timeout (float): maximum time to wait for loop end (seconds). None to wait indefinitely
+
+        Returns:
+            bool: True if engine is stopped
+        """
+        if not self.__thread:
+            return True
+
+        with self.__lock:
+            futures = list(self.__futures)
+        for future in futures:
+            future.cancel()
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+
+        thread = self.__thread
+        thread.join(timeout)
+        self.__thread = None
+
+        return not thread.is_alive()
+
+    def submit(self, coroutine_function, *args):
+        """
+        Schedule coroutine execution on engine event loop
+
+        Args:
+            coroutine_function (coroutine function): coroutine function to execute
+            *args: coroutine function arguments
+
+        Returns:
+            threading.Event: event set when coroutine is done (or cancelled)
+        """
+        done = threading.Event()
+        if not self.is_running():
+            self.logger.warning("Async engine is not running, coroutine is not executed")
+            done.set()
+            return done
+
+        future = asyncio.run_coroutine_threadsafe(coroutine_function(*args), self.__loop)
+        with self.__lock:
+            self.__futures.add(future)
+        future.add_done_callback(lambda future_: self.__on_done(future_, done))
+
+        return done
+
+    def __on_done(self, future, done):
+        """
+        Coroutine done callback
+
+        Args:
+            future (concurrent.futures.Future): coroutine future
+            done (threading.Event): done event
+        """
+        with self.__lock:
+            self.__futures.discard(future)
+        if not future.cancelled() and future.exception():
+            self.logger.error("Exception occured in async engine: %s", future.exception())
+        done.set()
+
+    def __run(self, started):
+        """
+        Engine thread
+
+        Args:
+            started (threading.Event): event set when loop is running
+        """
+        asyncio.set_event_loop(self.__loop)
+        self.__loop.call_soon(started.set)
+        try:
+            self.__loop.run_forever()
+        finally:
+            # let cancelled coroutines handle their cancellation
+            pending = asyncio.all_tasks(self.__loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.__loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.__loop.close()
+            self.__executor.shutdown(wait=False)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+
+class SensorsBatcher:
+    """
+    Sensors readings batcher
+
+    Collects readings of sensors updated during the same scheduler tick and passes them at once to batch
+    callback. A batch is closed window seconds after its first reading, so a sweep over many sensors
+    produces a single batch. Batch is a compact list of readings::
+
+        [sensor uuid, sensor type, values (dict), timestamp]
+
+    """
+
+    def __init__(self, window, on_batch, logger):
+        """
+        Constructor
+
+        Args:
+            window (float): duration a batch stays open after its first reading (seconds)
+            on_batch (callable): function called with batch timestamp and batch readings (list)
+            logger (Logger): logger instance
+        """
+        self.window = window
+        self.on_batch = on_batch
+        self.logger = logger
+        self.__lock = threading.Lock()
+        self.__readings = []
+        self.__timer = None
+
+    def add(self, sensor_uuid, sensor_type, values, timestamp):
+        """
+        Add sensor readings to current batch. Batch is opened if needed
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            sensor_type (str): sensor type
+            values (dict): sensor values
+            timestamp (int): readings timestamp
+        """
+        with self.__lock:
+            self.__readings.append([sensor_uuid, sensor_type, values, timestamp])
+            if self.__timer is None:
+                self.__timer = threading.Timer(self.window, self.flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def flush(self):
+        """
+        Close current batch and pass it to batch callback
+
+        Returns:
+            list: flushed readings
+        """
+        with self.__lock:
+            readings = self.__readings
+            self.__readings = []
+            timer = self.__timer
+            self.__timer = None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+        if not readings:
+            return readings
+
+        try:
+            self.on_batch(time.time(), readings)
+        except Exception:
+            self.logger.exception("Error occured sending sensors readings batch")
+
+        return readings
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+
+class SensorsDeadband:
+    """
+    Sensors values deadband filter
+
+    Filters polled sensors values so only meaningful changes are reported (events and persistence).
+    A value is reported when it moved since last reported value by at least absolute deadband, or by at
+    least relative deadband (fraction of last reported value). When no deadband is set, any change is
+    reported. Values are reported anyway when nothing was reported during heartbeat duration, unless
+    heartbeat is null. Invalid values (None) are never reported.
+
+    Sensor settings are::
+
+        {
+            absolute (float): absolute deadband (value unit)
+            relative (float): relative deadband (0.05 for 5%)
+            heartbeat (int): maximum silence duration (seconds). 0 for no heartbeat
+        }
+
+    """
+
+    def __init__(self, heartbeat):
+        """
+        Constructor
+
+        Args:
+            heartbeat (int): default maximum silence duration (seconds)
+        """
+        self.default_settings = {"absolute": 0.0, "relative": 0.0, "heartbeat": heartbeat}
+        self.__lock = threading.Lock()
+        self.__settings = {}
+        self.__last_reports = {}
+
+    def set_settings(self, settings_by_sensor):
+        """
+        Set sensors deadband settings
+
+        Args:
+            settings_by_sensor (dict): settings by sensor uuid. Sensors without settings use default ones
+        """
+        with self.__lock:
+            self.__settings = {
+                sensor_uuid: {**self.default_settings, **settings}
+                for sensor_uuid, settings in settings_by_sensor.items()
+            }
+
+    def get_settings(self, sensor_uuid):
+        """
+        Return sensor deadband settings
+
+        Args:
+            sensor_uuid (str): sensor uuid
+
+        Returns:
+            dict: sensor settings
+        """
+        with self.__lock:
+            return dict(self.__settings.get(sensor_uuid, self.default_settings))
+
+    def accept(self, sensor_uuid, values, now=None):
+        """
+        Check if sensor values must be reported. Accepted values become sensor last reported values
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            values (dict): sensor values (numbers) by field
+            now (float): current timestamp. Current time if None
+
+        Returns:
+            bool: True if values must be reported
+        """
+        if any(value is None for value in values.values()):
+            return False
+
+        now = time.time() if now is None else now
+        with self.__lock:
+            settings = self.__settings.get(sensor_uuid, self.default_settings)
+            last_report = self.__last_reports.get(sensor_uuid)
+            if (
+                last_report is not None
+                and (settings["heartbeat"] <= 0 or now - last_report[0] < settings["heartbeat"])
+                and not self.__has_changed(last_report[1], values, settings)
+            ):
+                return False
+
+            self.__last_reports[sensor_uuid] = (now, dict(values))
+            return True
+
+    def __has_changed(self, last_values, values, settings):
+        """
+        Check if values moved out of deadband
+
+        Args:
+            last_values (dict): last reported values
+            values (dict): new values
+            settings (dict): sensor settings
+
+        Returns:
+            bool: True if a value moved out of deadband
+        """
+        for field, value in values.items():
+            last_value = last_values.get(field)
+            if last_value is None:
+                return True
+
+            delta = abs(value - last_value)
+            if delta == 0:
+                continue
+            if settings["absolute"] <= 0 and settings["relative"] <= 0:
+                return True
+            if 0 < settings["absolute"] <= delta:
+                return True
+            if settings["relative"] > 0 and delta >= settings["relative"] * abs(last_value):
+                return True
+
+        return False
+
+    def forget(self, sensor_uuid):
+        """
+        Forget sensor settings and last reported values
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        with self.__lock:
+            self.__settings.pop(sensor_uuid, None)
+            self.__last_reports.pop(sensor_uuid, None)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+
+class SensorsDemand:
+    """
+    Sensors demand tracker
+
+    A sensor is in demand when its values are consumed: it has subscribers, it was read
+    recently or it is flagged as always on.
+    """
+
+    def __init__(self, demand_timeout):
+        """
+        Constructor
+
+        Args:
+            demand_timeout (float): duration a sensor read keeps sensor in demand (seconds)
+        """
+        self.demand_timeout = demand_timeout
+        self.__lock = threading.Lock()
+        self.__subscriptions = {}
+        self.__last_reads = {}
+        self.__always_on = set()
+
+    def subscribe(self, sensor_uuid):
+        """
+        Add sensor subscriber
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        with self.__lock:
+            self.__subscriptions[sensor_uuid] = self.__subscriptions.get(sensor_uuid, 0) + 1
+
+    def unsubscribe(self, sensor_uuid):
+        """
+        Remove sensor subscriber
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        with self.__lock:
+            count = self.__subscriptions.get(sensor_uuid, 0) - 1
+            if count > 0:
+                self.__subscriptions[sensor_uuid] = count
+            else:
+                self.__subscriptions.pop(sensor_uuid, None)
+
+    def touch(self, sensor_uuid):
+        """
+        Record sensor read
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        with self.__lock:
+            self.__last_reads[sensor_uuid] = time.time()
+
+    def set_always_on(self, sensor_uuids):
+        """
+        Set sensors always in demand
+
+        Args:
+            sensor_uuids (list): list of sensor uuids
+        """
+        with self.__lock:
+            self.__always_on = set(sensor_uuids)
+
+    def forget(self, sensor_uuid):
+        """
+        Remove all demand of specified sensor
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        with self.__lock:
+            self.__subscriptions.pop(sensor_uuid, None)
+            self.__last_reads.pop(sensor_uuid, None)
+            self.__always_on.discard(sensor_uuid)
+
+    def has_demand(self, sensor_uuid):
+        """
+        Return True if sensor is in demand
+
+        Args:
+            sensor_uuid (str): sensor uuid
+
+        Returns:
+            bool: True if sensor has demand
+        """
+        with self.__lock:
+            if sensor_uuid in self.__always_on or sensor_uuid in self.__subscriptions:
+                return True
+            last_read = self.__last_reads.get(sensor_uuid)
+            return last_read is not None and time.time() - last_read < self.demand_timeout
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+
+class SensorsDispatcher:
+    """
+    Sensors events dispatcher
+
+    Events handlers are registered by event name when addons are registered, and compiled in a
+    dispatch table, so a received event is routed with a single dict lookup and events nobody
+    handles are rejected without further processing.
+
+    Each handler keeps its own calls counters and execution duration metrics. Duration is the time
+    spent in handler call: work queued by handler in a lane is measured by lane metrics.
+    """
+
+    def __init__(self, logger):
+        """
+        Constructor
+
+        Args:
+            logger (Logger): logger instance
+        """
+        self.logger = logger
+        self.__handlers = {}
+        self.__stats_lock = threading.Lock()
+        self.__stats = {}
+        self.__unhandled = 0
+
+    def register(self, event_name, handler_name, handler):
+        """
+        Register event handler. A handler already registered for event is not registered again
+
+        Args:
+            event_name (str): event name
+            handler_name (str): handler name (used in metrics)
+            handler (callable): handler function. It is called with event as parameter
+        """
+        handlers = self.__handlers.setdefault(event_name, [])
+        if any(name == handler_name for (name, _) in handlers):
+            return
+
+        handlers.append((handler_name, handler))
+        with self.__stats_lock:
+            self.__stats.setdefault(handler_name, self.__get_empty_stats())
+
+    def get_events(self):
+        """
+        Return handled events
+
+        Returns:
+            list: list of event names
+        """
+        return list(self.__handlers.keys())
+
+    def dispatch(self, event):
+        """
+        Dispatch event to its handlers
+
+        Args:
+            event (MessageRequest): event data
+
+        Returns:
+            bool: True if event was dispatched, False if nobody handles it
+        """
+        handlers = self.__handlers.get(event["event"])
+        if handlers is None:
+            with self.__stats_lock:
+                self.__unhandled += 1
+            return False
+
+        for (handler_name, handler) in handlers:
+            started_at = time.time()
+            failed = False
+            try:
+                handler(event)
+            except Exception:
+                failed = True
+                self.logger.exception('Exception occured in event "%s" handler "%s"', event["event"], handler_name)
+            duration = time.time() - started_at
+
+            with self.__stats_lock:
+                stats = self.__stats[handler_name]
+                stats["calls"] += 1
+                stats["errors"] += 1 if failed else 0
+                stats["lastduration"] = duration
+                stats["maxduration"] = max(stats["maxduration"], duration)
+                stats["totalduration"] += duration
+
+        return True
+
+    def get_stats(self):
+        """
+        Return dispatcher metrics
+
+        Returns:
+            dict: dispatcher metrics::
+
+                {
+                    unhandled (int): number of rejected events (no handler)
+                    handlers (dict): metrics by handler name::
+
+                        {
+                            calls (int): number of calls
+                            errors (int): number of calls that raised an exception
+                            duration (dict): handler call duration (seconds)::
+
+                                {
+                                    last (float): last call duration
+                                    max (float): maximum duration
+                                    avg (float): average duration
+                                }
+
+                        }
+
+                }
+
+        """
+        with self.__stats_lock:
+            return {
+                "unhandled": self.__unhandled,
+                "handlers": {
+                    handler_name: {
+                        "calls": stats["calls"],
+                        "errors": stats["errors"],
+                        "duration": {
+                            "last": stats["lastduration"],
+                            "max": stats["maxduration"],
+                            "avg": stats["totalduration"] / stats["calls"] if stats["calls"] else 0.0,
+                        },
+                    }
+                    for handler_name, stats in self.__stats.items()
+                },
+            }
+
+    def reset_stats(self):
+        """
+        Reset dispatcher metrics
+        """
+        with self.__stats_lock:
+            self.__unhandled = 0
+            self.__stats = {handler_name: self.__get_empty_stats() for handler_name in self.__stats}
+
+    def __get_empty_stats(self):
+        """
+        Return empty handler metrics
+
+        Returns:
+            dict: handler metrics
+        """
+        return {
+            "calls": 0,
+            "errors": 0,
+            "lastduration": 0.0,
+            "maxduration": 0.0,
+            "totalduration": 0.0,
+        }
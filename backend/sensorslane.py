@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import queue
+import threading
+import time
+
+
+class SensorsLane:
+    """
+    Sensors execution lane
+
+    A lane is a queue processed by its own pool of worker threads. Using separate lanes for
+    latency-critical work (gpio events) and bulk work (sensors polling) ensures slow reads never
+    delay event handling. Each lane keeps its own queue depth and latency metrics.
+    """
+
+    def __init__(self, name, workers, logger):
+        """
+        Constructor
+
+        Args:
+            name (str): lane name
+            workers (int): number of worker threads
+            logger (Logger): logger instance
+        """
+        self.name = name
+        self.logger = logger
+        self.__workers_count = workers
+        self.__workers = []
+        self.__queue = queue.Queue()
+        self.__stopped = False
+        self.__stats_lock = threading.Lock()
+        self.__stats = {}
+        self.reset_stats()
+
+    def start(self):
+        """
+        Start lane workers
+        """
+        if self.__workers:
+            return
+
+        self.__stopped = False
+        for index in range(self.__workers_count):
+            worker = threading.Thread(
+                target=self.__process, name=f"sensors-{self.name}-{index}", daemon=True
+            )
+            worker.start()
+            self.__workers.append(worker)
+
+    def stop(self):
+        """
+        Stop lane workers. Queued jobs are dropped and their waiters released, jobs being processed
+        end normally
+        """
+        self.__stopped = True
+        while True:
+            try:
+                job = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job[2].set()
+
+        for _ in self.__workers:
+            self.__queue.put(None)
+        self.__workers = []
+
+    def submit(self, func, *args):
+        """
+        Queue function execution
+
+        Args:
+            func (callable): function to execute
+            *args: function arguments
+
+        Returns:
+            threading.Event: event set when function execution is done (or job dropped)
+        """
+        done = threading.Event()
+        if self.__stopped:
+            # lane is stopped, job is dropped
+            done.set()
+            return done
+
+        self.__queue.put((func, args, done, time.time()))
+        with self.__stats_lock:
+            self.__stats["maxqueued"] = max(self.__stats["maxqueued"], self.__queue.qsize())
+
+        return done
+
+    def get_stats(self):
+        """
+        Return lane metrics
+
+        Returns:
+            dict: lane metrics::
+
+                {
+                    workers (int): number of workers
+                    queued (int): current queue depth
+                    maxqueued (int): maximum queue depth
+                    processed (int): number of processed jobs
+                    latency (dict): time spent in queue (seconds)::
+
+                        {
+                            last (float): last job latency
+                            max (float): maximum latency
+                            avg (float): average latency
+                        }
+
+                    duration (dict): job execution duration (seconds)::
+
+                        {
+                            last (float): last job duration
+                            max (float): maximum duration
+                            avg (float): average duration
+                        }
+
+                }
+
+        """
+        with self.__stats_lock:
+            processed = self.__stats["processed"]
+            return {
+                "workers": self.__workers_count,
+                "queued": self.__queue.qsize(),
+                "maxqueued": self.__stats["maxqueued"],
+                "processed": processed,
+                "latency": {
+                    "last": self.__stats["lastlatency"],
+                    "max": self.__stats["maxlatency"],
+                    "avg": self.__stats["totallatency"] / processed if processed else 0.0,
+                },
+                "duration": {
+                    "last": self.__stats["lastduration"],
+                    "max": self.__stats["maxduration"],
+                    "avg": self.__stats["totalduration"] / processed if processed else 0.0,
+                },
+            }
+
+    def reset_stats(self):
+        """
+        Reset lane metrics
+        """
+        with self.__stats_lock:
+            self.__stats = {
+                "maxqueued": 0,
+                "processed": 0,
+                "lastlatency": 0.0,
+                "maxlatency": 0.0,
+                "totallatency": 0.0,
+                "lastduration": 0.0,
+                "maxduration": 0.0,
+                "totalduration": 0.0,
+            }
+
+    def __process(self):
+        """
+        Worker thread
+        """
+        while True:
+            job = self.__queue.get()
+            if job is None:
+                break
+
+            (func, args, done, queued_at) = job
+            started_at = time.time()
+            try:
+                func(*args)
+            except Exception:
+                self.logger.exception('Exception occured in sensors lane "%s"', self.name)
+            finally:
+                done.set()
+            ended_at = time.time()
+
+            latency = started_at - queued_at
+            duration = ended_at - started_at
+            with self.__stats_lock:
+                self.__stats["processed"] += 1
+                self.__stats["lastlatency"] = latency
+                self.__stats["maxlatency"] = max(self.__stats["maxlatency"], latency)
+                self.__stats["totallatency"] += latency
+                self.__stats["lastduration"] = duration
+                self.__stats["maxduration"] = max(self.__stats["maxduration"], duration)
+                self.__stats["totalduration"] += duration
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from cleep.libs.internals.event import Event
+
+
+class SensorsReadingsBatchEvent(Event):
+    """
+    Sensors.readings.batch event
+    """
+
+    EVENT_NAME = "sensors.readings.batch"
+    EVENT_PARAMS = ["timestamp", "readings"]
+
+    def __init__(self, params):
+        """
+        Constructor
+
+        Args:
+            params (dict): event parameters
+        """
+        Event.__init__(self, params)
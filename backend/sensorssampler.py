@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from functools import partial
+from .sensortask import SensorTask
+from .sensorsutils import SensorsUtils
+
+
+class SensorsSampler:
+    """
+    Aligned sensors sampler
+
+    Sensor tasks with the same interval are grouped and run together on wall-clock boundaries.
+    On each tick, tasks are grouped per bus: buses are read in parallel while tasks on the same bus
+    are read one after the other. When all reads are done, a single snapshot of all sensors of the
+    group is built and passed to snapshot callback.
+    """
+
+    def __init__(self, logger, get_bus, on_snapshot):
+        """
+        Constructor
+
+        Args:
+            logger (Logger): logger instance
+            get_bus (callable): function returning bus name of a sensor task
+            on_snapshot (callable): function called with snapshot built at each tick
+        """
+        self.logger = logger
+        self.get_bus = get_bus
+        self.on_snapshot = on_snapshot
+        self.__lock = threading.Lock()
+        self.__jobs_by_interval = {}
+        self.__tasks_by_interval = {}
+
+    def get_tasks(self):
+        """
+        Return running group tasks
+
+        Returns:
+            list: list of SensorTask
+        """
+        with self.__lock:
+            return list(self.__tasks_by_interval.values())
+
+    def add(self, task):
+        """
+        Add sensor task to sampler. Task is not started, it is run by group task of its interval
+
+        Args:
+            task (SensorTask): sensor task
+        """
+        with self.__lock:
+            interval = task.interval
+            self.__jobs_by_interval.setdefault(interval, []).append(task)
+            if interval in self.__tasks_by_interval:
+                return
+
+            group_task = SensorTask(interval, partial(self.__tick, interval), [], self.logger, aligned=True)
+            self.__tasks_by_interval[interval] = group_task
+
+        self.logger.debug("Start aligned sampling for interval %s", interval)
+        group_task.start()
+
+    def remove(self, task):
+        """
+        Remove sensor task from sampler. Group task is stopped if it has no more sensor task
+
+        Args:
+            task (SensorTask): sensor task
+        """
+        group_task = None
+        with self.__lock:
+            for interval, jobs in self.__jobs_by_interval.items():
+                if task in jobs:
+                    jobs.remove(task)
+                    if not jobs:
+                        del self.__jobs_by_interval[interval]
+                        group_task = self.__tasks_by_interval.pop(interval)
+                    break
+
+        if group_task:
+            self.logger.debug("Stop aligned sampling for interval %s", group_task.interval)
+            group_task.stop(wait=False)
+
+    def stop(self):
+        """
+        Signal all group tasks to stop
+
+        Returns:
+            list: list of stopped group tasks
+        """
+        with self.__lock:
+            tasks = list(self.__tasks_by_interval.values())
+            self.__tasks_by_interval.clear()
+            self.__jobs_by_interval.clear()
+
+        for task in tasks:
+            task.stop(wait=False)
+
+        return tasks
+
+    def __tick(self, interval):
+        """
+        Run all sensor tasks of specified interval and build snapshot
+
+        Args:
+            interval (float): group interval
+        """
+        timestamp = int(round(time.time() / interval) * interval)
+        with self.__lock:
+            jobs = list(self.__jobs_by_interval.get(interval, []))
+
+        # group jobs per bus
+        jobs_by_bus = {}
+        for job in jobs:
+            jobs_by_bus.setdefault(self.get_bus(job), []).append(job)
+
+        # read buses in parallel
+        threads = []
+        for bus, bus_jobs in jobs_by_bus.items():
+            self.logger.debug("Read %s sensor tasks on bus %s", len(bus_jobs), bus)
+            thread = threading.Thread(target=self.__read_bus, args=(bus_jobs,), daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+        # build snapshot
+        sensors = {}
+        for job in jobs:
+            for sensor in job.sensors:
+                sensors[sensor["uuid"]] = {
+                    key: value
+                    for key, value in sensor.items()
+                    if key in ("name", "type", "subtype") or key in SensorsUtils.READING_FIELDS
+                }
+        self.on_snapshot({
+            "timestamp": timestamp,
+            "interval": int(interval),
+            "sensors": sensors,
+        })
+
+    def __read_bus(self, jobs):
+        """
+        Run sensor tasks of the same bus sequentially
+
+        Args:
+            jobs (list): list of SensorTask
+        """
+        for job in jobs:
+            job.run()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from cleep.libs.internals.event import Event
+
+
+class SensorsSnapshotUpdateEvent(Event):
+    """
+    Sensors.snapshot.update event
+    """
+
+    EVENT_NAME = "sensors.snapshot.update"
+    EVENT_PARAMS = ["timestamp", "interval", "sensors"]
+
+    def __init__(self, params):
+        """
+        Constructor
+
+        Args:
+            params (dict): event parameters
+        """
+        Event.__init__(self, params)
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from .sensorreadings import SensorReadings
+
+
+class SensorsStateStore:
+    """
+    Sensors volatile state store
+
+    Holds sensors readings (temperature, humidity, motion status...) in memory, apart from sensors
+    configuration, so configuration file is only written when user edits sensors. Readings are stored
+    as compact typed records (SensorReadings) and converted to dict when returned.
+
+    State can be snapshotted to a tmpfs file (cheap, survives application restarts). Changes are also
+    appended to a journal, as small records proportional to the change, and journal is compacted into a
+    last-known values restore file when it passes a size threshold (both survive reboots). At startup,
+    the most recent of snapshot and restore file is restored and newer journal records are replayed.
+
+    Updates are field-level deltas: only changed fields are applied and recorded in per-sensor dirty
+    masks, and unchanged readings are no-ops. Files are only written when dirty masks are not empty.
+    Changes of last update alone are only snapshotted: they are not journaled nor saved to restore file.
+    Snapshot and restore files contain::
+
+        {
+            timestamp (float): state write timestamp
+            readings (dict): sensors readings by sensor uuid
+        }
+
+    Journal contains one json array per line::
+
+        [timestamp, sensor uuid, changed readings (dict) or None if sensor was removed]
+
+    A truncated last line (crash during append) is ignored during replay.
+    """
+
+    JOURNAL_MAX_SIZE = 65536
+
+    def __init__(self, logger, cleep_filesystem, restore_path, journal_path, journal_max_size=JOURNAL_MAX_SIZE):
+        """
+        Constructor
+
+        Args:
+            logger (Logger): logger instance
+            cleep_filesystem (CleepFilesystem): filesystem instance, used to write restore file and journal
+            restore_path (str): last-known values restore file path
+            journal_path (str): journal file path
+            journal_max_size (int): journal size triggering compaction (bytes)
+        """
+        self.logger = logger
+        self.cleep_filesystem = cleep_filesystem
+        self.restore_path = restore_path
+        self.journal_path = journal_path
+        self.journal_max_size = journal_max_size
+        self.__lock = threading.Lock()
+        self.__readings = {}
+        # changed fields by sensor uuid since last snapshot
+        self.__dirty_masks = {}
+        # changed fields by sensor uuid since last journal append
+        self.__journal_masks = {}
+        self.__save_dirty = False
+
+    def get(self, sensor_uuid):
+        """
+        Return sensor readings
+
+        Args:
+            sensor_uuid (str): sensor uuid
+
+        Returns:
+            dict: copy of sensor readings (empty dict if sensor has no reading)
+        """
+        with self.__lock:
+            record = self.__readings.get(sensor_uuid)
+            return record.to_dict() if record else {}
+
+    def get_all(self):
+        """
+        Return readings of all sensors
+
+        Returns:
+            dict: copy of sensors readings by sensor uuid
+        """
+        with self.__lock:
+            return {sensor_uuid: record.to_dict() for sensor_uuid, record in self.__readings.items()}
+
+    def get_dirty_masks(self):
+        """
+        Return fields changed since last snapshot
+
+        Returns:
+            dict: set of changed fields by sensor uuid
+        """
+        with self.__lock:
+            return {sensor_uuid: set(fields) for sensor_uuid, fields in self.__dirty_masks.items()}
+
+    def update(self, sensor_uuid, readings):
+        """
+        Update sensor readings. Only fields whose value changed are applied
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            readings (dict): readings to update
+
+        Returns:
+            dict: changed fields with their new value (empty dict if nothing changed)
+
+        Raises:
+            ValueError: if a field is not a reading field
+        """
+        with self.__lock:
+            return self.__update(sensor_uuid, readings)
+
+    def update_many(self, readings_by_sensor):
+        """
+        Update readings of several sensors atomically (readers never see a partial update)
+
+        Args:
+            readings_by_sensor (dict): readings to update by sensor uuid
+
+        Returns:
+            dict: changed fields by sensor uuid
+
+        Raises:
+            ValueError: if a field is not a reading field. Nothing is updated
+        """
+        for readings in readings_by_sensor.values():
+            SensorReadings.create(readings.keys())
+
+        with self.__lock:
+            return {
+                sensor_uuid: self.__update(sensor_uuid, readings)
+                for sensor_uuid, readings in readings_by_sensor.items()
+            }
+
+    def __update(self, sensor_uuid, readings):
+        """
+        Update sensor readings (lock must be acquired)
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            readings (dict): readings to update
+
+        Returns:
+            dict: changed fields with their new value
+        """
+        record = self.__readings.get(sensor_uuid)
+        if record is None:
+            record = SensorReadings.create(readings.keys())
+        elif not readings.keys() <= record.FIELDS:
+            # sensor mixes several kinds of readings, switch to wider record
+            record = SensorReadings.create(record.FIELDS | readings.keys(), record.to_dict())
+        self.__readings[sensor_uuid] = record
+
+        changed = record.update(readings)
+        if changed:
+            self.__dirty_masks.setdefault(sensor_uuid, set()).update(changed.keys())
+        if changed.keys() - {"lastupdate"}:
+            # last update alone (sensor still alive) is only written to tmpfs snapshot
+            self.__journal_masks.setdefault(sensor_uuid, set()).update(changed.keys())
+            self.__save_dirty = True
+
+        return changed
+
+    def remove(self, sensor_uuid):
+        """
+        Remove sensor readings
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        with self.__lock:
+            if self.__readings.pop(sensor_uuid, None) is not None:
+                # empty mask flags removed sensor
+                self.__dirty_masks[sensor_uuid] = set()
+                self.__journal_masks[sensor_uuid] = set()
+                self.__save_dirty = True
+
+    def load(self, snapshot_path=None):
+        """
+        Restore readings from most recent of tmpfs snapshot and restore file, then replay newer journal
+        records
+
+        Args:
+            snapshot_path (str): tmpfs snapshot file path. None if snapshot is disabled
+
+        Returns:
+            bool: True if readings were restored
+        """
+        states = []
+        if snapshot_path and os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, "r", encoding="utf-8") as snapshot_file:
+                    states.append(json.load(snapshot_file))
+            except Exception:
+                self.logger.exception('Unable to read sensors state snapshot "%s"', snapshot_path)
+        if os.path.exists(self.restore_path):
+            try:
+                states.append(self.cleep_filesystem.read_json(self.restore_path))
+            except Exception:
+                self.logger.exception('Unable to read sensors state restore file "%s"', self.restore_path)
+
+        states = [
+            state for state in states
+            if isinstance(state, dict) and isinstance(state.get("readings"), dict)
+        ]
+        state = max(states, key=lambda state_: state_.get("timestamp") or 0) if states else None
+        journal = self.__read_journal((state or {}).get("timestamp") or 0)
+        if state is None and not journal:
+            return False
+
+        records = {}
+        for sensor_uuid, readings in (state or {}).get("readings", {}).items():
+            self.__restore_readings(records, sensor_uuid, readings)
+        for (_, sensor_uuid, readings) in journal:
+            if readings is None:
+                records.pop(sensor_uuid, None)
+            else:
+                self.__restore_readings(records, sensor_uuid, readings)
+        with self.__lock:
+            self.__readings = records
+        self.logger.debug(
+            "Readings of %s sensors restored (%s journal records replayed)", len(records), len(journal)
+        )
+
+        return True
+
+    def __restore_readings(self, records, sensor_uuid, readings):
+        """
+        Apply restored readings to records
+
+        Args:
+            records (dict): records by sensor uuid
+            sensor_uuid (str): sensor uuid
+            readings (dict): restored readings
+        """
+        try:
+            record = records.get(sensor_uuid)
+            if record is None or not readings.keys() <= record.FIELDS:
+                fields = (record.FIELDS if record else set()) | readings.keys()
+                record = SensorReadings.create(fields, record.to_dict() if record else None)
+            record.update(readings)
+            records[sensor_uuid] = record
+        except Exception:
+            self.logger.warning('Invalid readings restored for sensor "%s": %s', sensor_uuid, readings)
+
+    def __read_journal(self, since):
+        """
+        Read journal records
+
+        Args:
+            since (float): only return records newer than this timestamp
+
+        Returns:
+            list: list of journal records (timestamp, sensor uuid, readings)
+        """
+        if not os.path.exists(self.journal_path):
+            return []
+
+        journal = []
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        (timestamp, sensor_uuid, readings) = json.loads(line)
+                    except ValueError:
+                        # truncated record, journal ends here
+                        self.logger.warning("Sensors state journal has a truncated record, stop replay")
+                        break
+                    if timestamp > since and (readings is None or isinstance(readings, dict)):
+                        journal.append((timestamp, sensor_uuid, readings))
+        except Exception:
+            self.logger.exception('Unable to read sensors state journal "%s"', self.journal_path)
+
+        return journal
+
+    def snapshot(self, snapshot_path):
+        """
+        Write readings to tmpfs snapshot file if some fields changed since last snapshot
+
+        Args:
+            snapshot_path (str): tmpfs snapshot file path
+
+        Returns:
+            bool: True if snapshot is up to date
+        """
+        with self.__lock:
+            if not self.__dirty_masks:
+                return True
+            state = self.__get_state()
+            dirty_masks = self.__dirty_masks
+            self.__dirty_masks = {}
+
+        try:
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            temp_path = f"{snapshot_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as snapshot_file:
+                json.dump(state, snapshot_file)
+            os.replace(temp_path, snapshot_path)
+            return True
+        except Exception:
+            self.logger.exception('Unable to write sensors state snapshot "%s"', snapshot_path)
+            with self.__lock:
+                for sensor_uuid, fields in dirty_masks.items():
+                    self.__dirty_masks.setdefault(sensor_uuid, set()).update(fields)
+            return False
+
+    def append(self):
+        """
+        Append readings changed since last append to journal. Journal is compacted when it passes
+        its size threshold
+
+        Returns:
+            bool: True if journal is up to date
+        """
+        with self.__lock:
+            if not self.__journal_masks:
+                return True
+            timestamp = time.time()
+            lines = []
+            for sensor_uuid, fields in self.__journal_masks.items():
+                record = self.__readings.get(sensor_uuid)
+                if record is None:
+                    readings = None
+                else:
+                    readings = {field: getattr(record, field) for field in fields if hasattr(record, field)}
+                lines.append(json.dumps([timestamp, sensor_uuid, readings]) + "\n")
+            journal_masks = self.__journal_masks
+            self.__journal_masks = {}
+
+        try:
+            journal_file = self.cleep_filesystem.open(self.journal_path, "a", encoding="utf-8")
+            try:
+                journal_file.write("".join(lines))
+            finally:
+                self.cleep_filesystem.close(journal_file)
+        except Exception:
+            self.logger.exception('Unable to append to sensors state journal "%s"', self.journal_path)
+            self.__restore_journal_masks(journal_masks)
+            return False
+
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) >= self.journal_max_size:
+            self.logger.debug("Sensors state journal size threshold reached, compact it")
+            return self.save()
+        return True
+
+    def save(self):
+        """
+        Compact state: write readings to restore file if they changed since last save and truncate
+        journal
+
+        Returns:
+            bool: True if restore file is up to date
+        """
+        with self.__lock:
+            if not self.__save_dirty:
+                return True
+            state = self.__get_state()
+            journal_masks = self.__journal_masks
+            self.__journal_masks = {}
+            self.__save_dirty = False
+
+        if not self.cleep_filesystem.write_json(self.restore_path, state):
+            self.logger.error('Unable to write sensors state restore file "%s"', self.restore_path)
+            self.__restore_journal_masks(journal_masks)
+            with self.__lock:
+                self.__save_dirty = True
+            return False
+
+        try:
+            self.cleep_filesystem.close(self.cleep_filesystem.open(self.journal_path, "w", encoding="utf-8"))
+        except Exception:
+            # journal records are older than restore file, they won't be replayed
+            self.logger.exception('Unable to truncate sensors state journal "%s"', self.journal_path)
+        return True
+
+    def __restore_journal_masks(self, journal_masks):
+        """
+        Restore journal masks after a failed write
+
+        Args:
+            journal_masks (dict): journal masks
+        """
+        with self.__lock:
+            for sensor_uuid, fields in journal_masks.items():
+                self.__journal_masks.setdefault(sensor_uuid, set()).update(fields)
+
+    def __get_state(self):
+        """
+        Return state to write (lock must be acquired)
+
+        Returns:
+            dict: state data
+        """
+        return {
+            "timestamp": time.time(),
+            "readings": {sensor_uuid: record.to_dict() for sensor_uuid, record in self.__readings.items()},
+        }
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import math
+import threading
+import time
+
+
+class SensorsStats:
+    """
+    Sensors streaming statistics
+
+    Keeps count, min, max, mean and variance of sensors values over windows aligned on wall-clock
+    boundaries (every multiple of window duration since epoch). Statistics are updated in constant time
+    and memory per value (Welford algorithm), values themselves are not stored.
+
+    When a window ends, its statistics become sensor last window statistics and a summary is queued
+    (see roll). Field statistics are::
+
+        {
+            count (int): number of values
+            min (float): minimum value
+            max (float): maximum value
+            mean (float): mean value
+            variance (float): population variance
+        }
+
+    """
+
+    def __init__(self, windows):
+        """
+        Constructor
+
+        Args:
+            windows (list): windows durations (seconds)
+        """
+        self.__lock = threading.Lock()
+        self.__windows = tuple(sorted(set(windows)))
+        # current window accumulators by sensor uuid: {window: [start, {field: [count, mean, m2, min, max]}]}
+        self.__accumulators = {}
+        # last window summary by sensor uuid: {window: summary}
+        self.__last_summaries = {}
+        # summaries of ended windows not returned by roll yet
+        self.__pending = []
+
+    @property
+    def windows(self):
+        """
+        Return windows durations
+
+        Returns:
+            tuple: windows durations (seconds)
+        """
+        return self.__windows
+
+    def set_windows(self, windows):
+        """
+        Set windows durations. All statistics are reset
+
+        Args:
+            windows (list): windows durations (seconds)
+        """
+        with self.__lock:
+            self.__windows = tuple(sorted(set(windows)))
+            self.__accumulators = {}
+            self.__last_summaries = {}
+            self.__pending = []
+
+    def add(self, sensor_uuid, values, now=None):
+        """
+        Add sensor values to statistics
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            values (dict): sensor values (numbers) by field. None values are ignored
+            now (float): values timestamp. Current time if None
+        """
+        now = time.time() if now is None else now
+        with self.__lock:
+            self.__close_ended(sensor_uuid, now)
+            accumulators = self.__accumulators.setdefault(sensor_uuid, {})
+            for window in self.__windows:
+                if window not in accumulators:
+                    accumulators[window] = [self.__get_start(window, now), {}]
+                fields = accumulators[window][1]
+                for field, value in values.items():
+                    if value is None:
+                        continue
+                    value = float(value)
+                    accumulator = fields.get(field)
+                    if accumulator is None:
+                        fields[field] = [1, value, 0.0, value, value]
+                        continue
+                    # Welford update
+                    accumulator[0] += 1
+                    delta = value - accumulator[1]
+                    accumulator[1] += delta / accumulator[0]
+                    accumulator[2] += delta * (value - accumulator[1])
+                    accumulator[3] = min(accumulator[3], value)
+                    accumulator[4] = max(accumulator[4], value)
+
+    def get(self, sensor_uuid, now=None):
+        """
+        Return sensor statistics
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            now (float): current timestamp. Current time if None
+
+        Returns:
+            list: statistics by window::
+
+                [
+                    {
+                        window (int): window duration (seconds)
+                        current (dict): current window summary (see roll)
+                        last (dict): last ended window summary. None if no window ended yet
+                    },
+                    ...
+                ]
+
+        """
+        now = time.time() if now is None else now
+        with self.__lock:
+            self.__close_ended(sensor_uuid, now)
+            accumulators = self.__accumulators.get(sensor_uuid, {})
+            last_summaries = self.__last_summaries.get(sensor_uuid, {})
+            stats = []
+            for window in self.__windows:
+                accumulator = accumulators.get(window) or [self.__get_start(window, now), {}]
+                stats.append({
+                    "window": window,
+                    "current": self.__get_summary(sensor_uuid, window, accumulator),
+                    "last": last_summaries.get(window),
+                })
+
+            return stats
+
+    def roll(self, now=None):
+        """
+        Close ended windows of all sensors and return their summaries
+
+        Args:
+            now (float): current timestamp. Current time if None
+
+        Returns:
+            list: summaries of windows ended since last call::
+
+                [
+                    {
+                        uuid (str): sensor uuid
+                        window (int): window duration (seconds)
+                        start (float): window start timestamp
+                        end (float): window end timestamp
+                        stats (dict): statistics by field
+                    },
+                    ...
+                ]
+
+        """
+        now = time.time() if now is None else now
+        with self.__lock:
+            for sensor_uuid in list(self.__accumulators.keys()):
+                self.__close_ended(sensor_uuid, now)
+            summaries = self.__pending
+            self.__pending = []
+
+            return summaries
+
+    def forget(self, sensor_uuid):
+        """
+        Forget sensor statistics
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        with self.__lock:
+            self.__accumulators.pop(sensor_uuid, None)
+            self.__last_summaries.pop(sensor_uuid, None)
+            self.__pending = [summary for summary in self.__pending if summary["uuid"] != sensor_uuid]
+
+    def __close_ended(self, sensor_uuid, now):
+        """
+        Close ended windows of sensor (lock must be acquired). Windows without value are dropped
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            now (float): current timestamp
+        """
+        accumulators = self.__accumulators.get(sensor_uuid)
+        if not accumulators:
+            return
+
+        for window, accumulator in list(accumulators.items()):
+            if now < accumulator[0] + window:
+                continue
+            del accumulators[window]
+            if not accumulator[1]:
+                continue
+            summary = self.__get_summary(sensor_uuid, window, accumulator)
+            self.__last_summaries.setdefault(sensor_uuid, {})[window] = summary
+            self.__pending.append(summary)
+
+    def __get_summary(self, sensor_uuid, window, accumulator):
+        """
+        Build window summary
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            window (int): window duration (seconds)
+            accumulator (list): window accumulator [start, fields accumulators]
+
+        Returns:
+            dict: window summary
+        """
+        (start, fields) = accumulator
+        return {
+            "uuid": sensor_uuid,
+            "window": window,
+            "start": start,
+            "end": start + window,
+            "stats": {
+                field: {
+                    "count": count,
+                    "min": min_value,
+                    "max": max_value,
+                    "mean": mean,
+                    "variance": m2 / count,
+                }
+                for field, (count, mean, m2, min_value, max_value) in fields.items()
+            },
+        }
+
+    def __get_start(self, window, timestamp):
+        """
+        Return start of window containing specified timestamp
+
+        Args:
+            window (int): window duration (seconds)
+            timestamp (float): timestamp
+
+        Returns:
+            float: window start timestamp
+        """
+        return math.floor(timestamp / window) * window
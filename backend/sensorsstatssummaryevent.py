@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from cleep.libs.internals.event import Event
+
+
+class SensorsStatsSummaryEvent(Event):
+    """
+    Sensors.stats.summary event
+    """
+
+    EVENT_NAME = "sensors.stats.summary"
+    EVENT_PARAMS = ["window", "start", "end", "stats"]
+
+    def __init__(self, params):
+        """
+        Constructor
+
+        Args:
+            params (dict): event parameters
+        """
+        Event.__init__(self, params)
@@ -9,6 +9,9 @@ class SensorsUtils:
     TEMP_CELSIUS = "celsius"
     TEMP_FAHRENHEIT = "fahrenheit"
 
+    # sensor fields updated by sensor readings
+    READING_FIELDS = ("celsius", "fahrenheit", "humidity", "on", "lastupdate", "lastduration")
+
     @staticmethod
     def convert_temperatures_from_celsius(celsius, offset, offset_unit):
         """
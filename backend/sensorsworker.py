@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import multiprocessing
+import os
+import signal
+import threading
+
+
+class SensorsWorker:
+    """
+    Sensors hardware reader worker
+
+    Runs addon hardware reader functions in a separate supervised process, so a hung read or a crash
+    cannot stall or kill the main process, and heavy reads don't compete for its GIL.
+
+    Requests and responses are exchanged over a pipe as small json arrays::
+
+        request: [request id, reader name, [args]]
+        response: [request id, 1, result] or [request id, 0, error message]
+
+    Worker process is killed when a request times out or when it dies, and it is restarted on next call.
+    It is spawned (not forked from multithreaded main process) and runs in its own session, so killing
+    its process group also kills commands started by readers.
+    """
+
+    def __init__(self, name, readers, logger, timeout=15.0):
+        """
+        Constructor
+
+        Args:
+            name (str): worker name
+            readers (dict): reader functions by name. Functions must be picklable (module level or static
+                functions) and must return json serializable values
+            logger (Logger): logger instance
+            timeout (float): default request timeout (seconds)
+        """
+        self.name = name
+        self.readers = readers
+        self.logger = logger
+        self.timeout = timeout
+        self.__context = multiprocessing.get_context("spawn")
+        self.__process = None
+        self.__conn = None
+        self.__request_id = 0
+        self.__lock = threading.Lock()
+
+    def is_running(self):
+        """
+        Return worker process status
+
+        Returns:
+            bool: True if worker process is alive
+        """
+        return self.__process is not None and self.__process.is_alive()
+
+    def start(self):
+        """
+        Start worker process
+        """
+        with self.__lock:
+            self.__start()
+
+    def stop(self, timeout=1.0):
+        """
+        Stop worker process. In-flight request is cancelled
+
+        Args:
+            timeout (float): maximum time to wait for process end before killing it (seconds)
+        """
+        if not self.__lock.acquire(timeout=timeout):
+            # request in flight: kill worker to make it fail, then wait for caller to release lock
+            process = self.__process
+            if process is not None:
+                SensorsWorker._kill_process_group(process)
+            self.__lock.acquire()
+
+        try:
+            if self.__process is None:
+                return
+
+            # closing pipe ends worker loop
+            self.__conn.close()
+            self.__process.join(timeout)
+            self.__kill()
+        finally:
+            self.__lock.release()
+
+    def call(self, reader_name, *args, timeout=None):
+        """
+        Execute reader function in worker process
+
+        Args:
+            reader_name (str): reader function name
+            *args: reader function arguments
+            timeout (float): request timeout (seconds). Worker default timeout if None
+
+        Returns:
+            any: reader function result
+
+        Raises:
+            RuntimeError: if reader failed, timed out or worker process died
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self.__lock:
+            if not self.is_running():
+                self.__start()
+            conn = self.__conn
+
+            self.__request_id += 1
+            request_id = self.__request_id
+            try:
+                conn.send_bytes(json.dumps([request_id, reader_name, list(args)]).encode("utf-8"))
+                while True:
+                    if not conn.poll(timeout):
+                        self.logger.error('Worker "%s" request "%s" timed out, kill worker', self.name, reader_name)
+                        self.__kill()
+                        raise RuntimeError(f'Reader "{reader_name}" timed out')
+
+                    (response_id, success, result) = json.loads(conn.recv_bytes().decode("utf-8"))
+                    if response_id == request_id:
+                        break
+            except (EOFError, OSError) as error:
+                self.logger.error('Worker "%s" died during request "%s"', self.name, reader_name)
+                self.__kill()
+                raise RuntimeError(f'Worker "{self.name}" died') from error
+
+        if not success:
+            raise RuntimeError(result)
+        return result
+
+    def __start(self):
+        """
+        Start worker process (lock must be acquired)
+        """
+        if self.is_running():
+            return
+
+        (parent_conn, child_conn) = self.__context.Pipe()
+        process = self.__context.Process(
+            target=SensorsWorker._serve,
+            args=(child_conn, self.readers),
+            name=f"sensors-worker-{self.name}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.__process = process
+        self.__conn = parent_conn
+        self.logger.debug('Worker "%s" started (pid=%s)', self.name, process.pid)
+
+    def __kill(self):
+        """
+        Kill worker process (lock must be acquired)
+        """
+        if self.__process is not None:
+            SensorsWorker._kill_process_group(self.__process)
+            self.__process.join()
+        if self.__conn is not None:
+            self.__conn.close()
+        self.__process = None
+        self.__conn = None
+
+    @staticmethod
+    def _kill_process_group(process):
+        """
+        Kill worker process and commands started by its readers
+
+        Args:
+            process (Process): worker process
+        """
+        if process.is_alive():
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                # worker has not created its session yet
+                pass
+        process.kill()
+
+    @staticmethod
+    def _serve(conn, readers):  # pragma: no cover
+        """
+        Worker process loop
+
+        Args:
+            conn (Connection): pipe connection
+            readers (dict): reader functions by name
+        """
+        # own session: worker and its children can be killed at once
+        os.setsid()
+
+        while True:
+            try:
+                (request_id, reader_name, args) = json.loads(conn.recv_bytes().decode("utf-8"))
+            except (EOFError, OSError):
+                break
+
+            try:
+                response = [request_id, 1, readers[reader_name](*args)]
+            except Exception as error:
+                response = [request_id, 0, f"{error.__class__.__name__}: {error}"]
+            conn.send_bytes(json.dumps(response).encode("utf-8"))
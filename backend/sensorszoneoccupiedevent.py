@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from cleep.libs.internals.event import Event
+
+
+class SensorsZoneOccupiedEvent(Event):
+    """
+    Sensors.zone.occupied event
+    """
+
+    EVENT_NAME = "sensors.zone.occupied"
+    EVENT_PARAMS = ["zone", "lastupdate"]
+
+    def __init__(self, params):
+        """
+        Constructor
+
+        Args:
+            params (dict): event parameters
+        """
+        Event.__init__(self, params)
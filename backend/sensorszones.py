@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+
+class SensorsZones:
+    """
+    Sensors occupancy zones
+
+    A zone groups motion sensors. Zone is occupied as soon as one of its sensors is on, and becomes
+    vacant when all its sensors stayed off during zone vacancy timeout (immediately if timeout is 0).
+    Only zone transitions are reported, so sensors chatter inside a zone produces no zone change.
+
+    Zones settings are::
+
+        {
+            zone uuid (str): {
+                name (str): zone name
+                sensors (list): motion sensors uuids
+                vacancytimeout (int): vacancy timeout (seconds)
+            },
+            ...
+        }
+
+    """
+
+    def __init__(self, on_change, logger):
+        """
+        Constructor
+
+        Args:
+            on_change (callable): zone change callback. It is called with zone uuid, occupied flag,
+                change timestamp and occupancy duration (seconds, only for vacant zone)
+            logger (Logger): logger instance
+        """
+        self.on_change = on_change
+        self.logger = logger
+        self.__lock = threading.Lock()
+        self.__zones = {}
+        self.__zones_by_sensor = {}
+        self.__active_sensors = set()
+        # zone state by zone uuid: {occupied, since, timer}
+        self.__states = {}
+
+    def set_zones(self, zones):
+        """
+        Set zones settings. New zones state is initialized from current sensors states without
+        change report, existing zones are reevaluated
+
+        Args:
+            zones (dict): zones settings by zone uuid
+        """
+        now = time.time()
+        changes = []
+        with self.__lock:
+            for zone_uuid in self.__states.keys() - zones.keys():
+                self.__cancel_timer(self.__states.pop(zone_uuid))
+
+            self.__zones = {zone_uuid: dict(zone) for zone_uuid, zone in zones.items()}
+            self.__zones_by_sensor = {}
+            for zone_uuid, zone in self.__zones.items():
+                for sensor_uuid in zone["sensors"]:
+                    self.__zones_by_sensor.setdefault(sensor_uuid, []).append(zone_uuid)
+
+                if zone_uuid not in self.__states:
+                    self.__states[zone_uuid] = {
+                        "occupied": self.__is_active(zone_uuid),
+                        "since": now,
+                        "timer": None,
+                    }
+                else:
+                    changes.extend(self.__evaluate(zone_uuid, now))
+
+        self.__report(changes)
+
+    def set_active_sensors(self, sensors_uuids):
+        """
+        Set sensors that are currently on, without change report. Used to restore zones state
+
+        Args:
+            sensors_uuids (list): uuids of sensors that are on
+        """
+        with self.__lock:
+            self.__active_sensors = set(sensors_uuids)
+            for zone_uuid, state in self.__states.items():
+                self.__cancel_timer(state)
+                state["occupied"] = self.__is_active(zone_uuid)
+
+    def update(self, sensor_uuid, on, now=None):
+        """
+        Update sensor state and reevaluate its zones
+
+        Args:
+            sensor_uuid (str): sensor uuid
+            on (bool): True if sensor is on
+            now (float): update timestamp. Current time if None
+        """
+        now = time.time() if now is None else now
+        changes = []
+        with self.__lock:
+            if on:
+                self.__active_sensors.add(sensor_uuid)
+            else:
+                self.__active_sensors.discard(sensor_uuid)
+            for zone_uuid in self.__zones_by_sensor.get(sensor_uuid, []):
+                changes.extend(self.__evaluate(zone_uuid, now))
+
+        self.__report(changes)
+
+    def forget(self, sensor_uuid):
+        """
+        Forget sensor state. Sensor zones are reevaluated as if sensor turned off
+
+        Args:
+            sensor_uuid (str): sensor uuid
+        """
+        self.update(sensor_uuid, False)
+
+    def get_state(self, zone_uuid):
+        """
+        Return zone state
+
+        Args:
+            zone_uuid (str): zone uuid
+
+        Returns:
+            dict: zone state or None if zone doesn't exist::
+
+                {
+                    occupied (bool): True if zone is occupied
+                    since (float): last zone change timestamp
+                    active (list): uuids of zone sensors that are on
+                }
+
+        """
+        with self.__lock:
+            state = self.__states.get(zone_uuid)
+            if state is None:
+                return None
+
+            return {
+                "occupied": state["occupied"],
+                "since": state["since"],
+                "active": [
+                    sensor_uuid for sensor_uuid in self.__zones[zone_uuid]["sensors"]
+                    if sensor_uuid in self.__active_sensors
+                ],
+            }
+
+    def stop(self):
+        """
+        Cancel pending vacancy timers
+        """
+        with self.__lock:
+            for state in self.__states.values():
+                self.__cancel_timer(state)
+
+    def __is_active(self, zone_uuid):
+        """
+        Check if one of zone sensors is on (lock must be acquired)
+
+        Args:
+            zone_uuid (str): zone uuid
+
+        Returns:
+            bool: True if a zone sensor is on
+        """
+        return any(sensor_uuid in self.__active_sensors for sensor_uuid in self.__zones[zone_uuid]["sensors"])
+
+    def __evaluate(self, zone_uuid, now):
+        """
+        Apply zone state machine (lock must be acquired)
+
+        Args:
+            zone_uuid (str): zone uuid
+            now (float): current timestamp
+
+        Returns:
+            list: zone changes to report
+        """
+        state = self.__states[zone_uuid]
+        if self.__is_active(zone_uuid):
+            # motion in zone cancels pending vacancy
+            self.__cancel_timer(state)
+            if state["occupied"]:
+                return []
+            return [self.__set_occupied(zone_uuid, state, True, now)]
+
+        if not state["occupied"] or state["timer"]:
+            return []
+        timeout = self.__zones[zone_uuid]["vacancytimeout"]
+        if timeout <= 0:
+            return [self.__set_occupied(zone_uuid, state, False, now)]
+
+        timer = threading.Timer(timeout, self._on_vacancy_timeout, args=(zone_uuid,))
+        timer.daemon = True
+        state["timer"] = timer
+        timer.start()
+        return []
+
+    def _on_vacancy_timeout(self, zone_uuid):
+        """
+        Vacancy timeout elapsed: zone becomes vacant if none of its sensors turned on meanwhile
+
+        Args:
+            zone_uuid (str): zone uuid
+        """
+        with self.__lock:
+            state = self.__states.get(zone_uuid)
+            if state is None or state["timer"] is not threading.current_thread():
+                # zone deleted or vacancy cancelled meanwhile
+                return
+            state["timer"] = None
+            if self.__is_active(zone_uuid) or not state["occupied"]:
+                return
+            change = self.__set_occupied(zone_uuid, state, False, time.time())
+
+        self.__report([change])
+
+    def __set_occupied(self, zone_uuid, state, occupied, now):
+        """
+        Change zone occupancy (lock must be acquired)
+
+        Args:
+            zone_uuid (str): zone uuid
+            state (dict): zone state
+            occupied (bool): new occupancy
+            now (float): change timestamp
+
+        Returns:
+            tuple: zone change (zone uuid, occupied, timestamp, occupancy duration)
+        """
+        duration = None if occupied else round(now - state["since"], 2)
+        state["occupied"] = occupied
+        state["since"] = now
+
+        return (zone_uuid, occupied, now, duration)
+
+    def __cancel_timer(self, state):
+        """
+        Cancel zone vacancy timer (lock must be acquired)
+
+        Args:
+            state (dict): zone state
+        """
+        if state["timer"]:
+            state["timer"].cancel()
+        state["timer"] = None
+
+    def __report(self, changes):
+        """
+        Report zone changes (outside lock)
+
+        Args:
+            changes (list): zone changes
+        """
+        for (zone_uuid, occupied, timestamp, duration) in changes:
+            self.logger.debug('Zone "%s" is %s', zone_uuid, "occupied" if occupied else "vacant")
+            try:
+                self.on_change(zone_uuid, occupied, timestamp, duration)
+            except Exception:
+                self.logger.exception('Unable to report zone "%s" change', zone_uuid)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from cleep.libs.internals.event import Event
+
+
+class SensorsZoneVacantEvent(Event):
+    """
+    Sensors.zone.vacant event
+    """
+
+    EVENT_NAME = "sensors.zone.vacant"
+    EVENT_PARAMS = ["zone", "lastupdate", "duration"]
+
+    def __init__(self, params):
+        """
+        Constructor
+
+        Args:
+            params (dict): event parameters
+        """
+        Event.__init__(self, params)
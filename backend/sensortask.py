@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import math
+import threading
+import time
+
+
+class _AsyncWakeup:
+    """
+    Wakeup of a task coroutine, that can be set from any thread
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.__loop = None
+        self.__event = None
+
+    def bind(self):
+        """
+        Bind wakeup to running event loop. Must be called from task coroutine
+        """
+        self.__event = asyncio.Event()
+        self.__loop = asyncio.get_running_loop()
+
+    def set(self):
+        """
+        Wake task coroutine up
+        """
+        loop = self.__loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.__event.set)
+
+    async def wait(self, timeout):
+        """
+        Wait for wakeup or timeout
+
+        Args:
+            timeout (float): maximum time to wait (seconds)
+        """
+        try:
+            await asyncio.wait_for(self.__event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.__event.clear()
+
+
+class SensorTask:
+    """
+    Sensor acquisition task
+
+    Periodically calls task function with sensors as arguments. Contrary to core Task, task configuration
+    (interval, sensors) can be updated while task is running: next run deadline is recomputed without
+    restarting task thread nor triggering extra sensor read.
+
+    Aligned task runs on wall-clock boundaries (every multiple of interval since epoch) instead of
+    running immediately and then every interval.
+
+    When an async engine is set before task is started, task is scheduled by a coroutine on engine event
+    loop instead of its own thread, so many tasks don't need many threads.
+    """
+
+    def __init__(self, interval, task, sensors, logger=None, aligned=False, async_task=None):
+        """
+        Constructor
+
+        Args:
+            interval (float): interval between two runs (seconds)
+            task (callable): task function. It is called with sensors as positional arguments
+            sensors (list): list of sensors data (dict). List can contains None value
+            logger (Logger): logger instance
+            aligned (bool): run task on wall-clock boundaries (default False)
+            async_task (coroutine function): coroutine equivalent of task function, used when an
+                async engine is set
+        """
+        self.__interval = float(interval)
+        self.__aligned = aligned
+        # optional lane to run task on (SensorsLane)
+        self.lane = None
+        # optional async engine to run async task on (SensorsAsyncEngine)
+        self.engine = None
+        self.__task = task
+        self.__async_task = async_task
+        self.__sensors = list(sensors)
+        self.logger = logger
+        self.__lock = threading.Lock()
+        self.__wakeup = threading.Event()
+        self.__thread = None
+        # set when task coroutine scheduled on async engine is done
+        self.__done = None
+        # incremented at each start, so thread of a previous start exits instead of running task twice
+        self.__generation = 0
+        self.__running = False
+        # set when task is stopped, queued runs are skipped
+        self.__stopped = False
+        self.__last_run = None
+        self.__next_run = None
+
+    @property
+    def interval(self):
+        """
+        Return task interval
+
+        Returns:
+            float: interval in seconds
+        """
+        return self.__interval
+
+    @property
+    def aligned(self):
+        """
+        Return task alignment
+
+        Returns:
+            bool: True if task runs on wall-clock boundaries
+        """
+        return self.__aligned
+
+    @property
+    def task_args(self):
+        """
+        Return task arguments
+
+        Returns:
+            list: list of sensors data as passed to task function (can contain None values)
+        """
+        return self.__sensors
+
+    @property
+    def sensors(self):
+        """
+        Return sensors handled by task
+
+        Returns:
+            list: list of sensors data (dict)
+        """
+        return [sensor for sensor in self.__sensors if sensor]
+
+    @property
+    def next_run(self):
+        """
+        Return next run timestamp
+
+        Returns:
+            float: next run timestamp or None if task is not running
+        """
+        return self.__next_run if self.__running else None
+
+    def start(self, first_run=None):
+        """
+        Start task. First run is immediate, or on next wall-clock boundary for aligned task.
+        Task is scheduled on async engine event loop if engine is running and task has an async task
+
+        Args:
+            first_run (float): first run timestamp. Default first run if None
+        """
+        with self.__lock:
+            if self.__running:
+                return
+            self.__running = True
+            self.__stopped = False
+            now = time.time()
+            if first_run is not None:
+                self.__next_run = first_run
+            else:
+                self.__next_run = self.__get_boundary(now) if self.__aligned else now
+            self.__generation += 1
+            generation = self.__generation
+            # previous scheduler keeps its own (set) wakeup and ends on its next check
+            use_engine = self.__async_task is not None and self.engine is not None and self.engine.is_running()
+            self.__wakeup = _AsyncWakeup() if use_engine else threading.Event()
+            wakeup = self.__wakeup
+
+        if use_engine:
+            self.__thread = None
+            self.__done = self.engine.submit(self.__run_async, generation, wakeup)
+            return
+
+        self.__done = None
+        self.__thread = threading.Thread(target=self.__run, args=(generation, wakeup), daemon=True)
+        self.__thread.start()
+
+    def stop(self, wait=True):
+        """
+        Stop task
+
+        Args:
+            wait (bool): wait for end of current run (default True)
+        """
+        with self.__lock:
+            self.__running = False
+            self.__stopped = True
+            wakeup = self.__wakeup
+        wakeup.set()
+
+        if wait:
+            self.join()
+
+    def join(self, timeout=None):
+        """
+        Wait for task thread (or task coroutine) end
+
+        Args:
+            timeout (float): maximum time to wait (seconds). None to wait indefinitely
+
+        Returns:
+            bool: True if task thread is ended
+        """
+        if self.__done is not None:
+            return self.__done.wait(timeout)
+
+        thread = self.__thread
+        if thread is None or thread is threading.current_thread():
+            return True
+        thread.join(timeout)
+
+        return not thread.is_alive()
+
+    def is_running(self):
+        """
+        Return task running status
+
+        Returns:
+            bool: True if task is running
+        """
+        return self.__running
+
+    def reconfigure(self, interval=None, sensors=None):
+        """
+        Update task configuration in place. Next run deadline is computed from last run
+        and new interval.
+
+        Args:
+            interval (float): new interval. None to keep current one
+            sensors (list): new list of sensors data. None to keep current one
+        """
+        with self.__lock:
+            if interval is not None:
+                self.__interval = float(interval)
+            if sensors is not None:
+                self.__sensors = list(sensors)
+            if self.__last_run is not None:
+                self.__next_run = self.__compute_next_run()
+            elif self.__aligned and self.__running:
+                self.__next_run = self.__get_boundary(time.time())
+            wakeup = self.__wakeup
+        wakeup.set()
+
+    def run(self):
+        """
+        Run task once and wait for its end. Async task is executed on async engine if any, otherwise
+        task is executed on task lane if any, in current thread otherwise. Run is skipped if task
+        is stopped before its execution starts
+        """
+        sensors = self.__sensors
+        if self.engine and self.__async_task:
+            self.engine.submit(self.__execute_async, sensors).wait()
+        elif self.lane:
+            self.lane.submit(self.__execute, sensors).wait()
+        else:
+            self.__execute(sensors)
+
+    def __execute(self, sensors):
+        """
+        Execute task function
+
+        Args:
+            sensors (list): task arguments
+        """
+        if self.__stopped:
+            return
+        try:
+            self.__task(*sensors)
+        except Exception:
+            if self.logger:
+                self.logger.exception("Exception occured during sensor task execution")
+
+    async def __execute_async(self, sensors):
+        """
+        Execute async task coroutine
+
+        Args:
+            sensors (list): task arguments
+        """
+        if self.__stopped:
+            return
+        try:
+            await self.__async_task(*sensors)
+        except Exception:
+            if self.logger:
+                self.logger.exception("Exception occured during sensor async task execution")
+
+    def __get_boundary(self, timestamp):
+        """
+        Return first wall-clock boundary after specified timestamp
+
+        Args:
+            timestamp (float): timestamp
+
+        Returns:
+            float: boundary timestamp
+        """
+        return (math.floor(timestamp / self.__interval) + 1) * self.__interval
+
+    def __compute_next_run(self):
+        """
+        Compute next run timestamp from last run
+
+        Returns:
+            float: next run timestamp
+        """
+        if self.__aligned:
+            return self.__get_boundary(self.__last_run)
+        return self.__last_run + self.__interval
+
+    def __run(self, generation, wakeup):
+        """
+        Task thread
+
+        Args:
+            generation (int): task start generation
+            wakeup (threading.Event): thread wakeup event
+        """
+        while True:
+            with self.__lock:
+                if not self.__running or generation != self.__generation:
+                    break
+                timeout = self.__next_run - time.time()
+
+            if timeout > 0:
+                # wait for deadline. Wakeup is triggered by reconfigure or stop
+                wakeup.wait(timeout)
+                wakeup.clear()
+                continue
+
+            self.__last_run = time.time()
+            self.run()
+
+            with self.__lock:
+                if generation != self.__generation:
+                    break
+                self.__next_run = self.__compute_next_run()
+
+    async def __run_async(self, generation, wakeup):
+        """
+        Task coroutine, scheduled on async engine event loop
+
+        Args:
+            generation (int): task start generation
+            wakeup (_AsyncWakeup): coroutine wakeup
+        """
+        wakeup.bind()
+        while True:
+            with self.__lock:
+                if not self.__running or generation != self.__generation:
+                    break
+                timeout = self.__next_run - time.time()
+
+            if timeout > 0:
+                # wait for deadline. Wakeup is triggered by reconfigure or stop
+                await wakeup.wait(timeout)
+                continue
+
+            self.__last_run = time.time()
+            await self.__execute_async(self.__sensors)
+
+            with self.__lock:
+                if generation != self.__generation:
+                    break
+                self.__next_run = self.__compute_next_run()
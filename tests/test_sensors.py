@@ -5,19 +5,40 @@ import time
 import sys, os
 import shutil
 import copy
+import asyncio
+import json
+import tempfile
+import threading
 from threading import Event
 sys.path.append('../')
 from backend.sensors import Sensors
 from backend.sensor import Sensor
 from backend.onewiredriver import OnewireDriver
 from backend.sensorsutils import SensorsUtils
+from backend.sensortask import SensorTask
+from backend.sensorssampler import SensorsSampler
+from backend.sensorslane import SensorsLane
+from backend.sensorsdispatcher import SensorsDispatcher
+from backend.sensorsdemand import SensorsDemand
+from backend.sensorsdeadband import SensorsDeadband
+from backend.sensorsbatcher import SensorsBatcher
+from backend.sensorsstats import SensorsStats
+from backend.sensorszones import SensorsZones
+from backend.sensorsasyncengine import SensorsAsyncEngine
+from backend.sensorsworker import SensorsWorker
+from backend.sensorsstatestore import SensorsStateStore
+from backend.sensorreadings import SensorReadings, TemperatureReadings, HumidityReadings, MotionReadings, GenericReadings
+from backend.sensorssnapshotupdateevent import SensorsSnapshotUpdateEvent
+from backend.sensorsreadingsbatchevent import SensorsReadingsBatchEvent
+from backend.sensorsstatssummaryevent import SensorsStatsSummaryEvent
+from backend.sensorszoneoccupiedevent import SensorsZoneOccupiedEvent
+from backend.sensorszonevacantevent import SensorsZoneVacantEvent
 from backend.sensorshumidityupdateevent import SensorsHumidityUpdateEvent
 from backend.sensorstemperatureupdateevent import SensorsTemperatureUpdateEvent
 from backend.sensorsmotiononevent import SensorsMotionOnEvent
 from backend.sensorsmotionoffevent import SensorsMotionOffEvent
 from cleep.exception import InvalidParameter, MissingParameter, CommandError
 from cleep.libs.tests.common import get_log_level
-from cleep.libs.internals.task import Task
 from unittest.mock import Mock, patch, mock_open
 
 LOG_LEVEL = get_log_level()
@@ -25,6 +46,7 @@ LOG_LEVEL = get_log_level()
 class FakeSensor(Sensor):
     TYPES = ['test']
     SUBTYPE = 'fake'
+    EVENTS = ['system.driver.install', 'system.driver.uninstall', 'gpios.gpio.on', 'gpios.gpio.off']
     def __init__(self, sensors):
         Sensor.__init__(self, sensors)
         self.update_call = 0
@@ -65,12 +87,57 @@ class FakeSensor(Sensor):
     def task(self):
         pass
     
-    def get_task(self, sensors):
+    def get_task(self, sensor):
         self.task = Mock()
+        self.task.sensors = [sensor]
         return self.task
 
 
 
+def fake_reader(value):
+    return {'value': value, 'pid': os.getpid()}
+
+def fake_failing_reader():
+    raise ValueError('Test exception')
+
+def fake_hanging_reader():
+    time.sleep(10)
+
+def fake_crashing_reader():
+    os._exit(1)
+
+def fake_command_reader(pid_path):
+    import subprocess
+    proc = subprocess.Popen(['sleep', '10'])
+    with open(pid_path, 'w') as fd:
+        fd.write(f'{os.getpid()} {proc.pid}')
+    proc.wait()
+
+
+
+class FakeTimer(threading.Thread):
+    # timer callback is run when test fires timer, not after timer interval
+    timers = []
+
+    def __init__(self, interval, function, args=None, kwargs=None):
+        threading.Thread.__init__(self, target=function, args=args or [], kwargs=kwargs or {}, daemon=True)
+        self.interval = interval
+        self.cancelled = False
+        FakeTimer.timers.append(self)
+
+    def start(self):
+        pass
+
+    def cancel(self):
+        self.cancelled = True
+
+    def fire(self):
+        if not self.cancelled:
+            threading.Thread.start(self)
+            self.join()
+
+
+
 class FakeDriver():
     def __init__(self):
         self.name = 'fakedriver'
@@ -135,10 +202,14 @@ class SensorsTests(unittest.TestCase):
         # overwrite sensors by fake one
         self.module.addons_by_name = {}
         self.module.addons_by_type = {}
+        self.module._dispatcher = SensorsDispatcher(self.module.logger)
         self.module._tasks_by_device_uuid = {}
         self.addon = FakeSensor(self.module)
         self.module._register_addon(self.addon)
 
+        # process gpio events synchronously
+        self.module._event_lane.submit = lambda func, *args: func(*args)
+
         if start_module:
             self.session.start_module(self.module)
 
@@ -165,6 +236,18 @@ class SensorsTests(unittest.TestCase):
         self.assertIsNotNone(self.addon.raspi_gpios)
         self.module._start_sensor_task.assert_called_with(session.AnyArg(), [sensor])
 
+    def test_on_start_applies_settings_before_tasks(self):
+        self.init_session(False, mock_on_start=False)
+        calls = []
+        self.module._deadband.set_settings = Mock(side_effect=lambda *args: calls.append('deadband'))
+        self.module._stats.set_windows = Mock(side_effect=lambda *args: calls.append('stats'))
+        self.module._zones.set_zones = Mock(side_effect=lambda *args: calls.append('zones'))
+        self.module._start_sensors_tasks = Mock(side_effect=lambda *args: calls.append('tasks'))
+
+        self.session.start_module(self.module)
+
+        self.assertListEqual(calls, ['deadband', 'stats', 'zones', 'tasks'])
+
     def test_on_start_with_unsupported_sensor_type(self):
         self.init_session(False, mock_on_start=False)
         sensor = {
@@ -183,6 +266,27 @@ class SensorsTests(unittest.TestCase):
 
         self.assertFalse(self.module._start_sensor_task.call_count)
 
+    def test_on_stop(self):
+        self.init_session(True, mock_on_stop=False)
+        task1 = Mock()
+        task1.join.return_value = True
+        task2 = Mock()
+        task2.join.return_value = False
+        self.module._tasks_by_device_uuid = {
+            '123-456-789': task1,
+            '456-789-123': task1,
+            '789-123-456': task2,
+        }
+        self.addon.cancel_reads = Mock()
+
+        self.module._on_stop()
+
+        task1.stop.assert_called_once_with(wait=False)
+        task2.stop.assert_called_once_with(wait=False)
+        self.assertTrue(self.addon.cancel_reads.called)
+        self.assertEqual(task1.join.call_count, 1)
+        self.assertLessEqual(task2.join.call_args.args[0], self.module.STOP_TIMEOUT)
+
     def test_register_addon_duplicate(self):
         self.init_session(True)
         with self.assertRaises(Exception) as cm:
@@ -317,6 +421,7 @@ class SensorsTests(unittest.TestCase):
         # check task
         self.assertEqual(mock_start.call_count, 1, '_start_sensor_task should be called')
         self.assertEqual(mock_stop.call_count, 0, '_stop_sensor_task should not be called')
+        self.assertEqual(self.module._reconfigure_sensor_task.call_count, 1, '_reconfigure_sensor_task should be called')
 
     def test_add_sensor_with_invalid_sensor_type(self):
         self.init_session(True)
@@ -354,6 +459,7 @@ class SensorsTests(unittest.TestCase):
         # check task
         self.assertEqual(mock_start.call_count, 0, '_start_sensor_task should not be called')
         self.assertEqual(mock_stop.call_count, 0, '_stop_sensor_task should not be called')
+        self.assertEqual(self.module._reconfigure_sensor_task.call_count, 1, '_reconfigure_sensor_task should be called')
 
     def test_add_sensor_with_add_device_failed(self):
         self.init_session(True)
@@ -432,6 +538,7 @@ class SensorsTests(unittest.TestCase):
         self.session.add_mock_command(self.session.make_mock_command('update_gpio', self.UPDATE_GPIO_DATA))
         self.module._start_sensor_task = mock_start
         self.module._stop_sensor_task = mock_stop
+        self.module._reconfigure_sensor_task = Mock()
 
         data = {
             'name': 'aname',
@@ -462,8 +569,33 @@ class SensorsTests(unittest.TestCase):
         self.assertEqual(updated_sensor['gpios'][0]['uuid'], added_sensor['gpios'][0]['uuid'], 'Pin field shouldn\'t be updated')
 
         # check task
-        self.assertEqual(mock_start.call_count, 2, '_start_sensor_task should be called twice (add + update)')
-        self.assertEqual(mock_stop.call_count, 1, '_stop_sensor_task should be called')
+        self.assertEqual(mock_start.call_count, 1, '_start_sensor_task should be called once (add)')
+        self.assertEqual(mock_stop.call_count, 0, '_stop_sensor_task should not be called')
+        self.assertEqual(self.module._reconfigure_sensor_task.call_count, 1, '_reconfigure_sensor_task should be called')
+
+    def test_update_sensor_keeps_readings(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', data=self.UPDATE_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('update_gpio', self.UPDATE_GPIO_DATA))
+        self.module._start_sensor_task = Mock()
+        self.module._reconfigure_sensor_task = Mock()
+        sensor = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'gpio18'})[0]
+        self.module._update_sensor_fields(sensor['uuid'], {'on': False, 'lastupdate': 100})
+        update = self.addon.update
+        def update_with_event(sensor_, params):
+            # gpio event processed during sensor update
+            self.module._update_sensor_fields(sensor['uuid'], {'on': True, 'lastupdate': 200})
+            return update(sensor_, params)
+        self.addon.update = update_with_event
+        self.module._state_store.update = Mock(side_effect=self.module._state_store.update)
+
+        sensors = self.module.update_sensor(sensor['uuid'], {'name': 'newname'})
+
+        self.assertEqual(self.module._state_store.update.call_count, 1, 'Readings should not be written back')
+        self.assertTrue(self.module._get_device_data(sensor['uuid'])['on'])
+        self.assertEqual(self.module._get_device_data(sensor['uuid'])['lastupdate'], 200)
+        self.assertTrue(sensors[0]['on'])
+        self.assertEqual(sensors[0]['name'], 'newname')
 
     def test_update_sensor_no_addon_found(self):
         self.init_session()
@@ -697,10 +829,215 @@ class SensorsTests(unittest.TestCase):
         }
         self.module._add_device(sensor1)
         self.module._add_device(sensor2)
+        self.module._build_sensors_indexes()
 
         res = self.module.delete_sensor(sensor1['uuid'])
         self.assertTrue(res, 'Sensor should be deleted')
         self.assertEqual(self.session.command_call_count('delete_gpio'), 0, 'Gpio should not be deleted')
+        self.assertEqual(self.module._get_gpio_uses('GPIO18'), 1)
+
+    def test_delete_sensor_with_gpio_used_by_deleted_sensors_only(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        self.session.add_mock_command(self.session.make_mock_command('is_reserved_gpio', data=False))
+        gpio = {'gpio':'GPIO18', 'uuid':'666-666-666', 'pin':18}
+        sensor1 = {'uuid': '123-456-789', 'type': 'test', 'subtype': 'fake', 'gpios': [gpio], 'name': 'sensor1'}
+        sensor2 = {'uuid': '321-654-987', 'type': 'test', 'subtype': 'fake', 'gpios': [gpio], 'name': 'sensor1'}
+        self.module._add_device(sensor1)
+        self.module._add_device(sensor2)
+        self.module._build_sensors_indexes()
+        self.addon.delete = Mock(return_value={'gpios': [gpio], 'sensors': [sensor1, sensor2]})
+
+        res = self.module.delete_sensor(sensor1['uuid'])
+
+        self.assertTrue(res)
+        self.assertEqual(self.session.command_call_count('delete_gpio'), 1, 'Gpio should be deleted')
+        self.assertEqual(self.module._get_gpio_uses('GPIO18'), 0)
+
+    def test_add_sensors(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('get_assigned_gpios', data=[]))
+        self.module._start_sensor_task = Mock()
+        self.module._update_config = Mock(return_value=True)
+
+        sensors = self.module.add_sensors([
+            {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor1', 'gpio': 'GPIO18'}},
+            {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor2', 'gpio': 'GPIO19'}},
+        ])
+
+        self.assertEqual(len(sensors), 2)
+        self.assertEqual(self.module._update_config.call_count, 1, 'Sensors should be saved at once')
+        devices = self.module._update_config.call_args[0][0]['devices']
+        self.assertCountEqual(list(devices.keys()), [sensor['uuid'] for sensor in sensors])
+        self.assertEqual(self.session.command_call_count('add_gpio'), 2)
+        self.assertEqual(self.module._start_sensor_task.call_count, 2)
+        self.assertEqual(self.module._get_gpio_uses('GPIO18'), 2)
+
+    def test_add_sensors_requests_assigned_gpios_once(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('get_assigned_gpios', data=['GPIO4']))
+        assigned_gpios = []
+        def add(params):
+            assigned_gpios.append(list(self.module._get_assigned_gpios()))
+            return {'gpios': [{'name': params['name'], 'gpio': params['gpio']}], 'sensors': [{'name': params['name'], 'type': 'test', 'subtype': 'fake'}]}
+        self.addon.add = add
+
+        self.module.add_sensors([
+            {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor1', 'gpio': 'GPIO18'}},
+            {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor2', 'gpio': 'GPIO19'}},
+        ])
+
+        self.assertEqual(self.session.command_call_count('get_assigned_gpios'), 1)
+        self.assertListEqual(assigned_gpios, [['GPIO4'], ['GPIO4', 'GPIO18']])
+        self.assertIsNone(self.module._batch_assigned_gpios)
+
+    def test_add_sensors_duplicated_names(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('get_assigned_gpios', data=[]))
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.add_sensors([
+                {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor1', 'gpio': 'GPIO18'}},
+                {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor1', 'gpio': 'GPIO19'}},
+            ])
+        self.assertEqual(cm.exception.message, 'Name "sensor1" is used several times')
+        self.assertFalse(self.session.command_called('add_gpio'), 'Nothing should be added')
+
+    def test_add_sensors_unknown_subtype(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('get_assigned_gpios', data=[]))
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.add_sensors([
+                {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor1', 'gpio': 'GPIO18'}},
+                {'type': 'test', 'subtype': 'dummy', 'data': {'name': 'sensor2', 'gpio': 'GPIO19'}},
+            ])
+        self.assertEqual(cm.exception.message, 'Sensor subtype "dummy" doesn\'t exist')
+        self.assertFalse(self.session.command_called('add_gpio'), 'Nothing should be added')
+
+    def test_add_sensors_invalid_params(self):
+        self.init_session(True)
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.add_sensors([])
+        self.assertEqual(cm.exception.message, 'Sensors must be a non empty list of sensors')
+
+    def test_add_sensors_rollback(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        self.session.add_mock_command(self.session.make_mock_command('get_assigned_gpios', data=[]))
+        self.module._start_sensor_task = Mock()
+        self.module._update_config = Mock(return_value=False)
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.add_sensors([
+                {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor1', 'gpio': 'GPIO18'}},
+                {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor2', 'gpio': 'GPIO19'}},
+            ])
+        self.assertEqual(cm.exception.message, 'Error occured adding sensors')
+
+        self.assertEqual(self.session.command_call_count('delete_gpio'), 2, 'Added gpios should be deleted')
+        self.assertFalse(self.module._start_sensor_task.called)
+        self.assertDictEqual(self.module._gpios_by_sensor, {})
+
+    def test_add_sensors_start_failed_rollback(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        self.session.add_mock_command(self.session.make_mock_command('get_assigned_gpios', data=[]))
+        self.module._start_sensor_task = Mock(side_effect=[None, Exception('Test exception')])
+        update_config = self.module._update_config
+        self.module._update_config = Mock(side_effect=update_config)
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.add_sensors([
+                {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor1', 'gpio': 'GPIO18'}},
+                {'type': 'test', 'subtype': 'fake', 'data': {'name': 'sensor2', 'gpio': 'GPIO19'}},
+            ])
+        self.assertEqual(cm.exception.message, 'Error occured adding sensors')
+
+        self.assertEqual(self.module._update_config.call_count, 2, 'Saved sensors should be removed')
+        self.assertEqual(len(self.module.get_module_devices()), 0)
+        self.assertEqual(self.session.command_call_count('delete_gpio'), 2, 'Added gpios should be deleted')
+        self.assertDictEqual(self.module._gpios_by_sensor, {})
+        self.assertDictEqual(self.module._gpio_uses, {})
+
+    def test_get_batch_value(self):
+        self.init_session(True)
+        loader = Mock(return_value='value')
+
+        self.assertEqual(self.module._get_batch_value('key', loader), 'value')
+        self.assertEqual(self.module._get_batch_value('key', loader), 'value')
+        self.assertEqual(loader.call_count, 2, 'Value should be loaded at each call outside bulk add')
+
+        loader.reset_mock()
+        self.module._batch_cache = {}
+        self.module._get_batch_value('key', loader)
+        self.module._get_batch_value('key', loader)
+        self.assertEqual(loader.call_count, 1, 'Value should be loaded once during bulk add')
+
+    def test_delete_sensors(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('is_reserved_gpio', data=False))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensor1 = self.module.add_sensor('test', 'fake', {'name': 'sensor1', 'gpio': 'GPIO18'})[0]
+        sensor2 = self.module.add_sensor('test', 'fake', {'name': 'sensor2', 'gpio': 'GPIO18'})[0]
+        self.module._stop_sensor_task = Mock()
+        update_config = self.module._update_config
+        self.module._update_config = Mock(side_effect=update_config)
+
+        self.assertTrue(self.module.delete_sensors([sensor1['uuid'], sensor2['uuid']]))
+
+        self.assertEqual(self.module._update_config.call_count, 1, 'Sensors should be deleted at once')
+        self.assertEqual(len(self.module.get_module_devices()), 0)
+        self.assertEqual(self.module._stop_sensor_task.call_count, 2)
+        self.assertEqual(self.session.command_call_count('is_reserved_gpio'), 1, 'Shared gpio should be checked once')
+        self.assertEqual(self.session.command_call_count('delete_gpio'), 1, 'Shared gpio should be deleted once')
+        self.assertDictEqual(self.module._gpio_uses, {})
+
+    def test_delete_sensors_unknown_sensor(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('is_reserved_gpio', data=False))
+        sensor1 = self.module.add_sensor('test', 'fake', {'name': 'sensor1', 'gpio': 'GPIO18'})[0]
+        self.module._stop_sensor_task = Mock()
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.delete_sensors([sensor1['uuid'], '666-666'])
+        self.assertEqual(cm.exception.message, 'Sensor with uuid "666-666" doesn\'t exist')
+
+        self.assertFalse(self.module._stop_sensor_task.called)
+        self.assertEqual(len(self.module.get_module_devices()), 1)
+
+    def test_delete_sensors_rollback(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('is_reserved_gpio', data=False))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensor1 = self.module.add_sensor('test', 'fake', {'name': 'sensor1', 'gpio': 'GPIO18'})[0]
+        self.module._start_sensors_tasks = Mock()
+        self.module._update_config = Mock(return_value=False)
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.delete_sensors([sensor1['uuid']])
+        self.assertEqual(cm.exception.message, 'Error deleting sensors')
+
+        self.module._start_sensors_tasks.assert_called_with([sensor1])
+        self.assertFalse(self.session.command_called('delete_gpio'))
+        self.assertEqual(self.module._get_gpio_uses('GPIO18'), 1)
+
+    def test_delete_sensors_invalid_params(self):
+        self.init_session(True)
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.delete_sensors([])
+        self.assertEqual(cm.exception.message, 'Sensor uuids list is empty')
 
     def test_search_by_gpio(self):
         self.init_session(True)
@@ -733,355 +1070,2911 @@ class SensorsTests(unittest.TestCase):
         sensor = self.module._search_by_gpio('666-666-666-666')
         self.assertIsNone(sensor)
 
-    """
-    Event
-    """
-    def test_receive_startup_event_rejected(self):
+    def test_search_by_gpio_after_delete(self):
         self.init_session(True)
-        mock = Mock()
-        self.addon.process_event = mock
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('is_reserved_gpio', data=False))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        added_sensor = sensors[0]
 
-        event = {
-            'startup': True,
-            'event': 'system.startup.fake'
-        }
-        self.module.on_event(event)
-        self.assertEqual(mock.call_count, 0, 'Addon process_event should not be called')
+        self.module.delete_sensor(added_sensor['uuid'])
 
-    def test_receive_install_driver_event(self):
+        self.assertIsNone(self.module._search_by_gpio(added_sensor['gpios'][0]['uuid']))
+        self.assertEqual(self.module._sensors_by_gpio_uuid, {})
+
+    def test_update_sensor_fields(self):
         self.init_session(True)
-        self.addon.process_event = Mock()
-        self.addon.has_drivers = Mock(return_value=True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.module._update_config = Mock(return_value=True)
+        sensor_uuid = sensors[0]['uuid']
 
-        install_event = {
-            'startup': False,
-            'event': 'system.driver.install'
-        }
-        self.module.on_event(install_event)
-        self.assertEqual(self.addon.process_event.call_count, 1, 'Addon process_event should be called')
-        self.assertEqual(self.addon.process_event.call_args.args[0], install_event, 'Process_event first param should be event')
-        self.assertIsNone(self.addon.process_event.call_args.args[1], 'Process_event sensors value should be None for driver event')
+        changed = self.module._update_sensor_fields(sensor_uuid, {'celsius': 21.5, 'lastupdate': 123})
 
-    def test_receive_uninstall_driver_event(self):
+        self.assertDictEqual(changed, {'celsius': 21.5, 'lastupdate': 123})
+        self.assertFalse(self.module._update_config.called, 'Readings should not be written to configuration')
+        self.assertEqual(self.module._get_device_data(sensor_uuid)['celsius'], 21.5)
+        self.assertEqual(self.module.get_module_devices()[sensor_uuid]['lastupdate'], 123)
+
+    def test_update_sensor_fields_unchanged(self):
         self.init_session(True)
-        self.addon.process_event = Mock()
-        self.addon.has_drivers = Mock(return_value=True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        sensor_uuid = sensors[0]['uuid']
+        self.module._update_sensor_fields(sensor_uuid, {'celsius': 21.5, 'lastupdate': 123})
 
-        uninstall_event = {
-            'startup': False,
-            'event': 'system.driver.uninstall'
-        }
-        self.module.on_event(uninstall_event)
-        self.assertEqual(self.addon.process_event.call_count, 1, 'Addon process_event should be called')
-        self.assertEqual(self.addon.process_event.call_args.args[0], uninstall_event, 'Process_event first param should be event')
-        self.assertIsNone(self.addon.process_event.call_args.args[1], 'Process_event sensors value should be None for driver event')
+        changed = self.module._update_sensor_fields(sensor_uuid, {'celsius': 21.5, 'lastupdate': 124})
 
-    def test_receive_drop_init_gpio_event(self):
+        self.assertDictEqual(changed, {'lastupdate': 124})
+
+    def test_update_sensor_fields_unknown_sensor(self):
         self.init_session(True)
-        self.addon.process_event = Mock()
 
-        event = {
-            'event': 'gpios.gpio.on',
-            'startup': False,
-            'params': {
-                'init': True
-            }
-        }
-        self.module.on_event(event)
-        self.assertEqual(self.addon.process_event.call_count, 0, 'Init gpio event should be dropped')
+        self.assertIsNone(self.module._update_sensor_fields('123-456', {'celsius': 21.5}))
+        self.assertDictEqual(self.module._state_store.get_all(), {})
 
-    def test_receive_gpio_event(self):
+    def test_update_sensor_fields_invalid_field(self):
         self.init_session(True)
-        mock = Mock()
-        self.addon.process_event = mock
-        self.module._search_by_gpio = Mock(return_value={
-            'uuid': '123-456-789',
-            'type': 'test',
-            'subtype': 'fake',
-            'name': 'aname',
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module._update_sensor_fields('123-456', {'name': 'newname'})
+        self.assertEqual(cm.exception.message, 'Field "name" is not a sensor reading')
+
+    def test_add_sensor_stores_readings_apart(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.addon.add = Mock(return_value={
+            'gpios': [],
+            'sensors': [{'name': 'aname', 'type': 'test', 'subtype': 'fake', 'gpios': [], 'celsius': None, 'lastupdate': None}],
         })
+        self.module._add_device = Mock(side_effect=lambda data: dict(data, uuid='123-456'))
 
-        event = {
-            'event': 'gpios.gpio.on',
-            'startup': False,
-            'device_id': '123-456-789',
-            'params': {
-                'init': False,
-            }
-        }
-        self.module.on_event(event)
-        self.assertEqual(mock.call_count, 1, 'Addon process_event should be called')
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
 
-    def test_receive_gpio_event_with_no_sensor_found(self):
+        self.assertNotIn('celsius', self.module._add_device.call_args[0][0])
+        self.assertNotIn('lastupdate', self.module._add_device.call_args[0][0])
+        self.assertDictEqual(self.module._state_store.get('123-456'), {'celsius': None, 'lastupdate': None})
+        self.assertIn('celsius', sensors[0])
+
+    def test_delete_sensor_removes_readings(self):
         self.init_session(True)
-        mock = Mock()
-        self.addon.process_event = mock
-        self.module._search_by_gpio = Mock(return_value=None)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('is_reserved_gpio', data=False))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.module._update_sensor_fields(sensors[0]['uuid'], {'celsius': 21.5})
 
-        event = {
-            'event': 'gpios.gpio.on',
-            'startup': False,
-            'device_id': '123-456-789',
-            'params': {
-                'init': False,
-            }
-        }
-        self.module.on_event(event)
-        self.assertEqual(mock.call_count, 0, 'Addon process_event should not be called')
+        self.module.delete_sensor(sensors[0]['uuid'])
 
-    def test_receive_gpio_event_with_no_addon_found(self):
+        self.assertDictEqual(self.module._state_store.get(sensors[0]['uuid']), {})
+
+    def test_migrate_sensors_readings(self):
         self.init_session(True)
-        mock = Mock()
-        self.addon.process_event = mock
-        self.module._search_by_gpio = Mock(return_value={
-            'uuid': '123-456-789',
-            'type': 'invalidtype',
-            'subtype': 'fake',
-            'name': 'aname',
-        })
+        self.module._add_device({'uuid': '123', 'type': 'test', 'subtype': 'fake', 'name': 'sensor1', 'gpios': [], 'celsius': 20.0})
+        self.module._update_config = Mock(return_value=True)
 
-        event = {
-            'event': 'gpios.gpio.on',
-            'startup': False,
-            'device_id': '123-456-789',
-            'params': {
-                'init': False,
-            }
-        }
-        self.module.on_event(event)
-        self.assertEqual(mock.call_count, 0, 'Addon process_event should not be called')
+        self.module._migrate_sensors_readings()
 
-    """
-    Task
-    """
-    def test_start_sensor_task(self):
+        devices = self.module._update_config.call_args[0][0]['devices']
+        self.assertTrue(all('celsius' not in device for device in devices.values()))
+        self.assertEqual(self.module._state_store.get(list(devices.keys())[0])['celsius'], 20.0)
+
+    def test_migrate_sensors_readings_nothing_to_migrate(self):
         self.init_session(True)
-        sensor = {
-            'name': 'aname',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO18',
-                'pin': 18
-            }],
-            'uuid': '123-456-789'
-        }
-        mock_task = Mock()
-        self.module._start_sensor_task(mock_task, [sensor,])
-        
-        self.assertEqual(len(self.module._tasks_by_device_uuid), 1, 'Start_sensor_task should save task')
-        self.assertEqual(list(self.module._tasks_by_device_uuid.keys())[0], sensor['uuid'], 'Task should be saved with sensor uuid')
-        mock_task.start.assert_called()
+        self.module._add_device({'uuid': '123', 'type': 'test', 'subtype': 'fake', 'name': 'sensor1', 'gpios': []})
+        self.module._update_config = Mock(return_value=True)
 
-    def test_start_sensor_task_with_two_sensors(self):
+        self.module._migrate_sensors_readings()
+
+        self.assertFalse(self.module._update_config.called)
+
+    def test_flush_readings(self):
         self.init_session(True)
-        sensor1 = {
-            'name': 'aname',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO18',
-                'pin': 18
-            }],
-            'uuid': '123-456-789'
-        }
-        sensor2 = {
-            'name': 'aname2',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO19',
-                'pin': 19
-            }],
-            'uuid': '321-654-987'
-        }
-        mock_task = Mock()
-        self.module._start_sensor_task(mock_task, [sensor1, sensor2])
-        
-        self.assertEqual(len(self.module._tasks_by_device_uuid), 2, 'Start_sensor_task should save task for each sensor')
-        self.assertTrue(all(key in [sensor1['uuid'], sensor2['uuid']] for key in self.module._tasks_by_device_uuid.keys()), 'Task should be saved with sensors uuid')
-        self.assertEqual(self.module._tasks_by_device_uuid[sensor1['uuid']], self.module._tasks_by_device_uuid[sensor2['uuid']], 'Same task should be save for all sensors')
-        mock_task.start.assert_called()
+        self.module._state_store = Mock()
+        self.module._update_config = Mock(return_value=True)
 
-    def test_start_sensor_task_with_no_task(self):
+        self.assertTrue(self.module._flush_readings())
+
+        self.module._state_store.snapshot.assert_called_with(Sensors.STATE_SNAPSHOT_PATH)
+        self.assertTrue(self.module._state_store.append.called)
+        self.assertFalse(self.module._state_store.save.called)
+        self.assertFalse(self.module._update_config.called)
+
+    def test_flush_readings_append_failed(self):
         self.init_session(True)
-        sensor = {
-            'name': 'aname',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO18',
-                'pin': 18
-            }],
-            'uuid': '123-456-789'
-        }
-        self.module._start_sensor_task(None, [sensor,])
-        
-        self.assertEqual(len(self.module._tasks_by_device_uuid), 0, 'Start_sensor_task should not save task if no task specified')
+        self.module._state_store = Mock()
+        self.module._state_store.append.return_value = False
 
-    def test_stop_sensor_task(self):
+        self.assertFalse(self.module._flush_readings())
+
+    def test_flush_readings_without_snapshot(self):
         self.init_session(True)
-        sensor = {
-            'name': 'aname',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO18',
-                'pin': 18
-            }],
-            'uuid': '123-456-789'
+        self.module.set_state_snapshot(False)
+        self.module._state_store = Mock()
+
+        self.module._flush_readings()
+
+        self.assertFalse(self.module._state_store.snapshot.called)
+
+    def test_on_stop_saves_state(self):
+        self.init_session(True, mock_on_stop=False)
+        self.module._state_store = Mock()
+
+        self.module._on_stop()
+
+        self.assertTrue(self.module._state_store.snapshot.called)
+        self.assertTrue(self.module._state_store.save.called)
+
+    def test_set_flush_interval(self):
+        self.init_session(True)
+        self.module._flush_task = Mock()
+
+        self.assertTrue(self.module.set_flush_interval(60))
+
+        self.assertEqual(self.module._get_config_field('flushinterval'), 60)
+        self.module._flush_task.reconfigure.assert_called_with(interval=60)
+
+    def test_set_flush_interval_invalid_params(self):
+        self.init_session(True)
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_flush_interval(5)
+        self.assertEqual(cm.exception.message, 'Flush interval must be greater or equal than 10')
+
+    def test_set_flush_interval_save_failed(self):
+        self.init_session(True)
+        self.module._update_config = Mock(return_value=False)
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.set_flush_interval(60)
+        self.assertEqual(cm.exception.message, 'Unable to save configuration')
+
+    def test_build_sensors_indexes(self):
+        self.init_session(True)
+        sensor1 = {'uuid': '123', 'name': 'sensor1', 'gpios': [{'uuid': '666-666', 'gpio': 'GPIO18', 'pin': 12}]}
+        sensor2 = {'uuid': '456', 'name': 'sensor2', 'gpios': [{'uuid': '666-666', 'gpio': 'GPIO18', 'pin': 12}]}
+        sensor3 = {'uuid': '789', 'name': 'sensor3', 'gpios': [{'uuid': '999-999', 'gpio': 'GPIO4', 'pin': 7}]}
+        self.module._get_devices_snapshot = Mock(return_value={'123': sensor1, '456': sensor2, '789': sensor3})
+
+        self.module._build_sensors_indexes()
+
+        self.assertDictEqual(self.module._sensors_by_gpio_uuid, {
+            '666-666': ['123', '456'],
+            '999-999': ['789'],
+        })
+        self.assertDictEqual(self.module._gpio_uses, {'GPIO18': 2, 'GPIO4': 1})
+
+    def test_build_sensors_indexes_names(self):
+        self.init_session(True)
+        sensor1 = {'uuid': '123', 'name': 'sensor1', 'gpios': []}
+        sensor2 = {'uuid': '456', 'name': 'sensor1', 'gpios': []}
+        sensor3 = {'uuid': '789', 'name': 'Sensor1', 'gpios': []}
+        self.module._get_devices_snapshot = Mock(return_value={'123': sensor1, '456': sensor2, '789': sensor3})
+
+        self.module._build_sensors_indexes()
+
+        self.assertDictEqual(self.module._sensors_by_name, {'sensor1': ['123', '456'], 'Sensor1': ['789']})
+
+    def test_sensor_channels_index(self):
+        self.init_session(True)
+        temp = {'uuid': '123', 'name': 'dht', 'type': 'temperature', 'physicaluuid': '666', 'gpios': []}
+        hum = {'uuid': '456', 'name': 'dht', 'type': 'humidity', 'physicaluuid': '666', 'gpios': []}
+        other = {'uuid': '789', 'name': 'other', 'type': 'temperature', 'gpios': []}
+
+        self.module._index_sensor(temp)
+        self.module._index_sensor(hum)
+        self.module._index_sensor(other)
+        self.assertDictEqual(self.module._channels_by_physical, {'666': {'temperature': '123', 'humidity': '456'}})
+
+        self.module._unindex_sensor('123')
+        self.assertDictEqual(self.module._channels_by_physical, {'666': {'humidity': '456'}})
+        self.module._unindex_sensor('456')
+        self.assertDictEqual(self.module._channels_by_physical, {})
+        self.assertDictEqual(self.module._physical_by_sensor, {})
+
+    def test_get_sensor_channels(self):
+        self.init_session(True)
+        temp = {'uuid': '123', 'name': 'dht', 'type': 'temperature', 'physicaluuid': '666', 'gpios': []}
+        hum = {'uuid': '456', 'name': 'dht', 'type': 'humidity', 'physicaluuid': '666', 'gpios': []}
+        other = {'uuid': '789', 'name': 'other', 'type': 'temperature', 'gpios': []}
+        devices = {'123': temp, '456': hum, '789': other}
+        self.module._get_devices_snapshot = Mock(return_value=devices)
+        self.module._build_sensors_indexes()
+        self.module._get_device = lambda uuid: devices.get(uuid)
+
+        self.assertDictEqual(self.module._get_sensor_channels('456'), {'temperature': temp, 'humidity': hum})
+        self.assertDictEqual(self.module._get_sensor_channels('789'), {'temperature': other})
+        self.assertDictEqual(self.module._get_sensor_channels('000'), {})
+
+    def test_update_sensors_fields(self):
+        self.init_session(True)
+        self.module._gpios_by_sensor = {'123': [], '456': []}
+
+        changed = self.module._update_sensors_fields({
+            '123': {'celsius': 20.0, 'lastupdate': 10},
+            '456': {'humidity': 50.0, 'lastupdate': 10},
+        })
+
+        self.assertDictEqual(changed, {
+            '123': {'celsius': 20.0, 'lastupdate': 10},
+            '456': {'humidity': 50.0, 'lastupdate': 10},
+        })
+        self.assertEqual(self.module._state_store.get('456'), {'humidity': 50.0, 'lastupdate': 10})
+
+    def test_update_sensors_fields_unknown_sensor(self):
+        self.init_session(True)
+        self.module._gpios_by_sensor = {'123': []}
+
+        changed = self.module._update_sensors_fields({
+            '123': {'celsius': 20.0},
+            '456': {'humidity': 50.0},
+        })
+
+        self.assertIsNone(changed)
+        self.assertEqual(self.module._state_store.get('123'), {})
+
+    def test_update_sensors_fields_invalid_field(self):
+        self.init_session(True)
+        self.module._gpios_by_sensor = {'123': []}
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module._update_sensors_fields({'123': {'name': 'dummy'}})
+        self.assertEqual(cm.exception.message, 'Field "name" is not a sensor reading')
+
+    def test_migrate_sensors_channels(self):
+        self.init_session(True)
+        gpio1 = {'uuid': '666', 'gpio': 'GPIO18', 'pin': 12}
+        gpio2 = {'uuid': '999', 'gpio': 'GPIO4', 'pin': 7}
+        devices = {
+            '1': {'uuid': '1', 'name': 'dht1', 'type': 'temperature', 'subtype': 'dht22', 'gpios': [gpio1]},
+            '2': {'uuid': '2', 'name': 'dht1', 'type': 'humidity', 'subtype': 'dht22', 'gpios': [gpio1]},
+            '3': {'uuid': '3', 'name': 'dht2', 'type': 'temperature', 'subtype': 'dht22', 'gpios': [gpio2]},
+            '4': {'uuid': '4', 'name': 'motion', 'type': 'motion', 'subtype': 'generic', 'gpios': [gpio2]},
         }
-        mock_task = Mock()
-        mock_task.is_running.return_value = False
-        self.module._start_sensor_task(mock_task, [sensor,])
-        
-        self.module._stop_sensor_task(sensor)
-        
-        self.assertEqual(len(self.module._tasks_by_device_uuid), 0, 'Task should be deleted when stopped')
-        mock_task.stop.assert_called()
+        self.module._get_devices_snapshot = Mock(return_value=devices)
+        self.module._update_config = Mock(return_value=True)
 
-    def test_stop_sensor_task_with_unknow_sensor(self):
+        self.module._migrate_sensors_channels()
+
+        configs = self.module._update_config.call_args.args[0]['devices']
+        self.assertIsNotNone(configs['1']['physicaluuid'])
+        self.assertEqual(configs['1']['physicaluuid'], configs['2']['physicaluuid'])
+        self.assertNotEqual(configs['1']['physicaluuid'], configs['3']['physicaluuid'])
+        self.assertNotIn('physicaluuid', configs['4'])
+
+    def test_migrate_sensors_channels_already_migrated(self):
         self.init_session(True)
-        sensor = {
-            'name': 'aname',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO18',
-                'pin': 18
-            }],
-            'uuid': '123-456-789'
+        devices = {
+            '1': {'uuid': '1', 'name': 'dht1', 'type': 'temperature', 'subtype': 'dht22', 'physicaluuid': '666', 'gpios': []},
         }
-        mock_task = Mock()
-        self.module._start_sensor_task(mock_task, [sensor,])
-        
-        self.module._stop_sensor_task({
-            'name': 'othersensor',
-            'uuid': '666-666-999'
+        self.module._get_devices_snapshot = Mock(return_value=devices)
+        self.module._update_config = Mock(return_value=True)
+
+        self.module._migrate_sensors_channels()
+
+        self.assertFalse(self.module._update_config.called)
+
+    def test_set_sensor_deadband(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123-456-789'})
+        self.module._update_config = Mock(return_value=True)
+
+        self.assertTrue(self.module.set_sensor_deadband('123-456-789', 0.5, 0.0, 600))
+
+        self.module._update_config.assert_called_with({
+            'deadbands': {'123-456-789': {'absolute': 0.5, 'relative': 0.0, 'heartbeat': 600}},
         })
-        
-        self.assertEqual(len(self.module._tasks_by_device_uuid), 1, 'Task should not be deleted')
-        mock_task.stop.assert_not_called()
- 
-    def test_configure_start_sensor_task(self):
+        self.assertDictEqual(self.module._deadband.get_settings('123-456-789'), {'absolute': 0.5, 'relative': 0.0, 'heartbeat': 600})
+
+    def test_set_sensor_deadband_integral_values(self):
         self.init_session(True)
-        self.session.add_mock_command(self.session.make_mock_command('add_gpio', data=self.ADD_GPIO_DATA))
+        self.module._get_device = Mock(return_value={'uuid': '123-456-789'})
+        self.module._update_config = Mock(return_value=True)
 
-        data = {
-            'name': 'aname',
-            'gpio': 'GPIO18',
-        }
-        sensors = self.module.add_sensor('test', 'fake', data)
-        added_sensor = sensors[0]
+        self.assertTrue(self.module.set_sensor_deadband('123-456-789', 1, 0, 600))
 
-        self.session.respawn_module()
-        # we can't check if task is started because addon cannot be loaded during respawn :(
+        settings = self.module._deadband.get_settings('123-456-789')
+        self.assertDictEqual(settings, {'absolute': 1.0, 'relative': 0.0, 'heartbeat': 600})
+        self.assertIsInstance(settings['absolute'], float)
+        self.assertIsInstance(settings['relative'], float)
+
+    def test_set_sensor_deadband_invalid_params(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value=None)
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_sensor_deadband('123-456-789', 0.5, 0.0, 600)
+        self.assertEqual(cm.exception.message, 'Sensor with uuid "123-456-789" doesn\'t exist')
+
+        self.module._get_device = Mock(return_value={'uuid': '123-456-789'})
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_sensor_deadband('123-456-789', -1.0, 0.0, 600)
+        self.assertEqual(cm.exception.message, 'Absolute deadband must be positive')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_sensor_deadband('123-456-789', 0.0, 2.0, 600)
+        self.assertEqual(cm.exception.message, 'Relative deadband must be between 0 and 1')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_sensor_deadband('123-456-789', 0.0, 0.0, -1)
+        self.assertEqual(cm.exception.message, 'Heartbeat must be positive')
 
+    def test_set_sensor_deadband_save_failed(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123-456-789'})
+        self.module._update_config = Mock(return_value=False)
 
+        with self.assertRaises(CommandError) as cm:
+            self.module.set_sensor_deadband('123-456-789', 0.5, 0.0, 600)
+        self.assertEqual(cm.exception.message, 'Unable to save configuration')
 
+    def test_delete_sensor_cleans_deadband(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.module.set_sensor_deadband(sensors[0]['uuid'], 0.5, 0.0, 600)
 
-class SensorTests(unittest.TestCase):
+        self.module.delete_sensor(sensors[0]['uuid'])
 
-    def setUp(self):
-        self.sensors = Mock()
-        self.sensor = Sensor(self.sensors)
+        self.assertDictEqual(self.module._get_config_field('deadbands'), {})
+        self.assertEqual(self.module._deadband.get_settings(sensors[0]['uuid'])['absolute'], 0.0)
 
-    def test_register_driver(self):
-        driver = FakeDriver()
-        self.sensor._register_driver(driver)
+    def test_set_readings_batch(self):
+        self.init_session(True)
+        self.module._update_config = Mock(return_value=True)
 
-        self.sensors._register_driver.assert_called_with(driver)
-        self.assertEqual(len(self.sensor.drivers), 1)
+        self.assertTrue(self.module.set_readings_batch(True))
 
-    def test_has_drivers(self):
-        driver = FakeDriver()
-        self.sensor._register_driver(driver)
+        self.module._update_config.assert_called_with({'readingsbatch': True})
+        self.assertTrue(self.module._readings_batch)
 
-        self.assertTrue(self.sensor.has_drivers())
+    def test_set_readings_batch_save_failed(self):
+        self.init_session(True)
+        self.module._update_config = Mock(return_value=False)
 
-    def test_get_event(self):
-        self.sensor._get_event('dummy.event.test')
+        with self.assertRaises(CommandError) as cm:
+            self.module.set_readings_batch(True)
+        self.assertEqual(cm.exception.message, 'Unable to save configuration')
+        self.assertFalse(self.module._readings_batch)
 
-        self.sensors._get_event.assert_called_with('dummy.event.test')
+    def test_readings_batch(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.module._readings_batch = True
 
-    def test_send_command(self):
-        self.sensor.send_command('test', 'dummy', {'param': 123}, 5.0)
+        self.module._update_sensor_fields(sensors[0]['uuid'], {'celsius': 20.0, 'lastupdate': 10})
+        self.module._update_sensor_fields(sensors[0]['uuid'], {'celsius': 20.0, 'lastupdate': 10})
+        self.module._batcher.flush()
 
-        self.sensors.send_command.Assert_called_with('test', 'dummy', {'param': 123}, 5.0)
+        self.assertEqual(self.session.event_call_count('sensors.readings.batch'), 1)
+        self.session.assert_event_called_with('sensors.readings.batch', {
+            'timestamp': session.AnyArg(),
+            'readings': [[sensors[0]['uuid'], 'test', {'celsius': 20.0}, 10]],
+        })
 
-    def test_update_value(self):
-        sensor = {
-            'name': 'aname',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO18',
-                'pin': 18
-            }],
-            'uuid': '123-456-789'
-        }
+    def test_readings_batch_disabled(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
 
-        self.sensor.update_value(sensor)
+        self.module._update_sensor_fields(sensors[0]['uuid'], {'celsius': 20.0, 'lastupdate': 10})
+        self.module._batcher.flush()
 
-        self.sensors._update_device.assert_called_with(sensor['uuid'], sensor)
+        self.assertEqual(self.session.event_call_count('sensors.readings.batch'), 0)
 
-    def test_search_device(self):
-        self.sensor._search_device('key', 'value')
+    def test_check_sensor_deadband_does_not_add_stats(self):
+        self.init_session(True)
 
-        self.sensors._search_device.assert_called_with('key', 'value')
+        self.module._check_sensor_deadband('123', {'celsius': 20.0})
 
-    def test_search_devices(self):
-        self.sensor._search_devices('key', 'value')
+        stats = self.module._stats.get('123')
+        self.assertEqual(stats[0]['current']['stats'], {})
 
-        self.sensors._search_devices.assert_called_with('key', 'value')
+    def test_add_sensor_stats(self):
+        self.init_session(True)
 
-    def test_search_by_gpio(self):
-        self.sensor._search_by_gpio('GPIO18')
+        self.module._add_sensor_stats('123', {'celsius': 20.0})
+        self.module._add_sensor_stats('123', {'celsius': 22.0})
 
-        self.sensors._search_by_gpio.assert_called_with('GPIO18')
+        stats = self.module._stats.get('123')
+        self.assertEqual(stats[0]['current']['stats']['celsius']['count'], 2)
+        self.assertEqual(stats[0]['current']['stats']['celsius']['mean'], 21.0)
 
-    def test_get_device(self):
-        self.sensor._get_device('123-456')
+    def test_get_sensor_stats(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123'})
+        self.module._stats.add('123', {'celsius': 20.0})
 
-        self.sensors._get_device.assert_called_with('123-456')
+        stats = self.module.get_sensor_stats('123')
 
-    def test_get_assigned_gpios(self):
-        self.sensor._get_assigned_gpios()
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]['window'], 3600)
+        self.assertEqual(stats[0]['current']['stats']['celsius']['count'], 1)
+        self.assertIsNone(stats[0]['last'])
 
-        self.assertTrue(self.sensors._get_assigned_gpios.called)
+    def test_get_sensor_stats_invalid_params(self):
+        self.init_session(True)
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.get_sensor_stats(None)
+        self.assertEqual(cm.exception.message, 'Uuid parameter is missing')
 
-    def test_delete(self):
-        sensor = {
-            'name': 'aname',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO18',
-                'pin': 18
-            }],
-            'uuid': '123-456-789'
-        }
-        data = self.sensor.delete(sensor)
+        self.module._get_device = Mock(return_value=None)
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.get_sensor_stats('123')
+        self.assertEqual(cm.exception.message, 'Sensor with uuid "123" doesn\'t exist')
 
-        self.assertDictEqual(data, {
-            'gpios': sensor['gpios'],
-            'sensors': [sensor],
+    def test_set_stats_windows(self):
+        self.init_session(True)
+        self.module._update_config = Mock(return_value=True)
+        self.module._stats.add('123', {'celsius': 20.0})
+
+        self.assertTrue(self.module.set_stats_windows([3600, 86400]))
+
+        self.module._update_config.assert_called_with({'statswindows': [3600, 86400]})
+        self.assertEqual(self.module._stats.windows, (3600, 86400))
+        self.assertDictEqual(self.module._stats.get('123')[0]['current']['stats'], {})
+
+    def test_set_stats_windows_invalid_params(self):
+        self.init_session(True)
+        for windows in ([], [30], [3600, 'dummy']):
+            with self.assertRaises(InvalidParameter) as cm:
+                self.module.set_stats_windows(windows)
+            self.assertEqual(cm.exception.message, 'Windows must be a list of durations greater or equal than 60')
+
+    def test_set_stats_windows_save_failed(self):
+        self.init_session(True)
+        self.module._update_config = Mock(return_value=False)
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.set_stats_windows([3600])
+        self.assertEqual(cm.exception.message, 'Unable to save configuration')
+
+    def test_set_stats_summary(self):
+        self.init_session(True)
+        self.module._update_config = Mock(return_value=True)
+
+        self.assertTrue(self.module.set_stats_summary(True))
+
+        self.module._update_config.assert_called_with({'statssummary': True})
+
+    def test_set_stats_summary_save_failed(self):
+        self.init_session(True)
+        self.module._update_config = Mock(return_value=False)
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.set_stats_summary(True)
+        self.assertEqual(cm.exception.message, 'Unable to save configuration')
+
+    def test_roll_sensors_stats(self):
+        self.init_session(True)
+        self.module.set_stats_summary(True)
+        self.module._stats.add('123', {'celsius': 20.0}, now=0)
+
+        self.module._roll_sensors_stats()
+
+        self.assertEqual(self.session.event_call_count('sensors.stats.summary'), 1)
+        self.session.assert_event_called_with('sensors.stats.summary', {
+            'window': 3600,
+            'start': 0,
+            'end': 3600,
+            'stats': {'celsius': {'count': 1, 'min': 20.0, 'max': 20.0, 'mean': 20.0, 'variance': 0.0}},
         })
 
-    def test_get_task(self):
-        sensor = {
-            'name': 'aname',
-            'gpios': [{
-                'uuid': '987-654-321',
-                'gpio': 'GPIO18',
-                'pin': 18
-            }],
-            'uuid': '123-456-789'
-        }
-        mock_task = Mock()
-        self.sensor._get_task = mock_task
+    def test_roll_sensors_stats_summary_disabled(self):
+        self.init_session(True)
+        self.module._stats.add('123', {'celsius': 20.0}, now=0)
 
-        # first call should create task singleton
-        task = self.sensor.get_task([sensor])
-        self.assertEqual(task, mock_task.return_value)
-        mock_task.assert_called_with([sensor])
+        self.module._roll_sensors_stats()
+
+        self.assertEqual(self.session.event_call_count('sensors.stats.summary'), 0)
+        self.assertIsNotNone(self.module._stats.get('123')[0]['last'])
+
+    def test_delete_sensor_cleans_stats(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.module._stats.add(sensors[0]['uuid'], {'celsius': 20.0})
+
+        self.module.delete_sensor(sensors[0]['uuid'])
+
+        self.assertDictEqual(self.module._stats.get(sensors[0]['uuid'])[0]['current']['stats'], {})
+
+    def test_add_zone(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123', 'type': 'motion'})
+
+        zone = self.module.add_zone('living', ['123', '456'], 60)
+
+        self.assertIsNotNone(zone['uuid'])
+        self.assertDictEqual(self.module._get_config_field('zones'), {
+            zone['uuid']: {'name': 'living', 'sensors': ['123', '456'], 'vacancytimeout': 60},
+        })
+        self.assertFalse(self.module._zones.get_state(zone['uuid'])['occupied'])
 
-        # next call should return same singleton
-        self.assertEqual(self.sensor.get_task([sensor]), mock_task.return_value)
+    def test_add_zone_invalid_params(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123', 'type': 'motion'})
+        self.module.add_zone('living', ['123'], 60)
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.add_zone('living', ['123'], 60)
+        self.assertEqual(cm.exception.message, 'Name "living" is already used')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.add_zone('kitchen', [], 60)
+        self.assertEqual(cm.exception.message, 'Sensors must be a non empty list of motion sensors')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.add_zone('kitchen', ['123'], -1)
+        self.assertEqual(cm.exception.message, 'Vacancy timeout must be positive')
+
+        self.module._get_device = Mock(return_value={'uuid': '123', 'type': 'temperature'})
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.add_zone('kitchen', ['123'], 60)
+        self.assertEqual(cm.exception.message, 'Sensors must be a non empty list of motion sensors')
+
+    def test_add_zone_save_failed(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123', 'type': 'motion'})
+        self.module._update_config = Mock(return_value=False)
+
+        with self.assertRaises(CommandError) as cm:
+            self.module.add_zone('living', ['123'], 60)
+        self.assertEqual(cm.exception.message, 'Unable to save configuration')
+
+    def test_update_zone(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123', 'type': 'motion'})
+        zone = self.module.add_zone('living', ['123'], 60)
+
+        updated = self.module.update_zone(zone['uuid'], 'living', ['123', '456'], 0)
+
+        self.assertDictEqual(updated, {'uuid': zone['uuid'], 'name': 'living', 'sensors': ['123', '456'], 'vacancytimeout': 0})
+        self.assertDictEqual(self.module._get_config_field('zones')[zone['uuid']], {
+            'name': 'living', 'sensors': ['123', '456'], 'vacancytimeout': 0,
+        })
+
+    def test_update_zone_invalid_params(self):
+        self.init_session(True)
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.update_zone('123', 'living', ['123'], 60)
+        self.assertEqual(cm.exception.message, 'Zone with uuid "123" doesn\'t exist')
+
+    def test_delete_zone(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123', 'type': 'motion'})
+        zone = self.module.add_zone('living', ['123'], 60)
+
+        self.assertTrue(self.module.delete_zone(zone['uuid']))
+
+        self.assertDictEqual(self.module._get_config_field('zones'), {})
+        self.assertIsNone(self.module._zones.get_state(zone['uuid']))
+
+    def test_delete_zone_invalid_params(self):
+        self.init_session(True)
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.delete_zone('123')
+        self.assertEqual(cm.exception.message, 'Zone with uuid "123" doesn\'t exist')
+
+    def test_get_zones(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123', 'type': 'motion'})
+        zone = self.module.add_zone('living', ['123', '456'], 60)
+        self.module._zones.update('123', True)
+
+        zones = self.module.get_zones()
+
+        self.assertEqual(len(zones), 1)
+        self.assertEqual(zones[0]['uuid'], zone['uuid'])
+        self.assertEqual(zones[0]['name'], 'living')
+        self.assertTrue(zones[0]['occupied'])
+        self.assertEqual(zones[0]['active'], ['123'])
+
+    def test_zone_events(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123', 'type': 'motion'})
+        zone = self.module.add_zone('living', ['123', '456'], 0)
+        self.module._gpios_by_sensor = {'123': [], '456': []}
+
+        self.module._update_sensor_fields('123', {'on': True, 'lastupdate': 10})
+        self.module._update_sensor_fields('456', {'on': True, 'lastupdate': 11})
+        self.module._update_sensor_fields('123', {'on': False, 'lastupdate': 12})
+        self.assertEqual(self.session.event_call_count('sensors.zone.occupied'), 1)
+        self.assertEqual(self.session.event_call_count('sensors.zone.vacant'), 0)
+        self.session.assert_event_called_with('sensors.zone.occupied', {
+            'zone': 'living',
+            'lastupdate': session.AnyArg(),
+        })
+
+        self.module._update_sensor_fields('456', {'on': False, 'lastupdate': 13})
+        self.assertEqual(self.session.event_call_count('sensors.zone.vacant'), 1)
+        self.session.assert_event_called_with('sensors.zone.vacant', {
+            'zone': 'living',
+            'lastupdate': session.AnyArg(),
+            'duration': session.AnyArg(),
+        })
+
+    def test_delete_sensor_cleans_zones(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.module._update_config({'zones': {'666': {'name': 'living', 'sensors': [sensors[0]['uuid'], '456'], 'vacancytimeout': 0}}})
+        self.module._zones.set_zones(self.module._get_config_field('zones'))
+        self.module._update_sensor_fields(sensors[0]['uuid'], {'on': True})
+
+        self.module.delete_sensor(sensors[0]['uuid'])
+
+        self.assertEqual(self.module._get_config_field('zones')['666']['sensors'], ['456'])
+        self.assertFalse(self.module._zones.get_state('666')['occupied'])
+        self.assertEqual(self.session.event_call_count('sensors.zone.vacant'), 1)
+
+    def test_devices_snapshot_is_read_only(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+
+        snapshot = self.module._get_devices_snapshot()
+        device = snapshot[sensors[0]['uuid']]
+        with self.assertRaises(TypeError):
+            device['name'] = 'othername'
+        with self.assertRaises(TypeError):
+            device['gpios'][0]['gpio'] = 'GPIO4'
+        with self.assertRaises(TypeError):
+            snapshot['dummy'] = {}
+
+    def test_devices_snapshot_is_not_rebuilt_on_reads(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        snapshot = self.module._get_devices_snapshot()
+
+        self.module._get_device(sensors[0]['uuid'])
+        self.module._get_devices()
+        self.module._search_by_gpio(sensors[0]['gpios'][0]['uuid'])
+        self.module._search_device('name', 'aname')
+
+        self.assertIs(self.module._get_devices_snapshot(), snapshot)
+
+    def test_devices_snapshot_is_replaced_on_changes(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        snapshot = self.module._get_devices_snapshot()
+
+        self.module.delete_sensor(sensors[0]['uuid'])
+
+        self.assertIsNot(self.module._devices_snapshot, snapshot, 'Snapshot should be replaced by writer')
+        self.assertNotIn(sensors[0]['uuid'], self.module._get_devices_snapshot())
+        self.assertIn(sensors[0]['uuid'], snapshot)
+
+    def test_devices_snapshot_is_built_by_writers(self):
+        self.init_session(True)
+        self.module._get_devices_snapshot()
+
+        self.module._add_device({'name': 'sensor1', 'type': 'temperature', 'subtype': 'fake'})
+        snapshot = self.module._devices_snapshot
+        self.module._add_device({'name': 'sensor2', 'type': 'humidity', 'subtype': 'fake'})
+
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(len(snapshot), 1)
+        self.assertEqual(len(self.module._devices_snapshot), 2)
+
+    def test_get_device_returns_snapshot_device(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+
+        self.assertIs(self.module._get_device(sensors[0]['uuid']), self.module._get_devices_snapshot()[sensors[0]['uuid']])
+        self.assertIs(
+            self.module._search_by_gpio(sensors[0]['gpios'][0]['uuid']),
+            self.module._get_devices_snapshot()[sensors[0]['uuid']],
+        )
+        self.assertIsNone(self.module._get_device('666'))
+
+    def test_get_device_data_returns_mutable_copy(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.module._update_sensor_fields(sensors[0]['uuid'], {'on': True})
+
+        sensor = self.module._get_device_data(sensors[0]['uuid'])
+        sensor['name'] = 'othername'
+        sensor['gpios'][0]['gpio'] = 'GPIO4'
+
+        self.assertTrue(sensor['on'])
+        self.assertIsInstance(sensor['gpios'], list)
+        device = self.module._get_devices_snapshot()[sensors[0]['uuid']]
+        self.assertEqual(device['name'], 'aname')
+        self.assertEqual(device['gpios'][0]['gpio'], 'GPIO18')
+        self.assertNotIn('on', device)
+
+    def test_search_device_by_reading_field(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.module._update_sensor_fields(sensors[0]['uuid'], {'on': True})
+
+        self.assertEqual(self.module._search_device('on', True)['uuid'], sensors[0]['uuid'])
+        self.assertEqual(len(self.module._search_devices('on', True)), 1)
+        self.assertIsNone(self.module._search_device('on', False))
+
+    def test_search_device_by_name(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+
+        self.assertEqual(self.module._search_device('name', 'aname')['uuid'], sensors[0]['uuid'])
+        self.assertIsNone(self.module._search_device('name', 'Aname'))
+        self.assertEqual(len(self.module._search_devices('name', 'aname')), 1)
+        self.assertListEqual(self.module._search_devices('name', 'other'), [])
+
+    def test_search_device_by_uuid(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+
+        self.assertEqual(self.module._search_device('uuid', sensors[0]['uuid'])['name'], 'aname')
+
+    def test_names_index_after_rename(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('update_gpio', self.UPDATE_GPIO_DATA))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+
+        self.module.update_sensor(sensors[0]['uuid'], {'name': 'newname'})
+
+        self.assertIsNone(self.module._search_device('name', 'aname'))
+        self.assertEqual(self.module._search_device('name', 'newname')['uuid'], sensors[0]['uuid'])
+        self.assertDictEqual(self.module._sensors_by_name, {'newname': [sensors[0]['uuid']]})
+
+    def test_names_index_after_delete(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('is_reserved_gpio', data=False))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+
+        self.module.delete_sensor(sensors[0]['uuid'])
+
+        self.assertDictEqual(self.module._sensors_by_name, {})
+        self.assertIsNone(self.module._search_device('name', 'aname'))
+
+    def test_unindex_sensor(self):
+        self.init_session(True)
+        self.module._index_sensor({'uuid': '123', 'gpios': [{'uuid': '666-666', 'gpio': 'GPIO18', 'pin': 12}]})
+        self.module._index_sensor({'uuid': '456', 'gpios': [{'uuid': '666-666', 'gpio': 'GPIO18', 'pin': 12}]})
+
+        self.module._unindex_sensor('123')
+        self.assertDictEqual(self.module._sensors_by_gpio_uuid, {'666-666': ['456']})
+        self.assertEqual(self.module._get_gpio_uses('GPIO18'), 1)
+        self.module._unindex_sensor('456')
+        self.assertDictEqual(self.module._sensors_by_gpio_uuid, {})
+        self.assertEqual(self.module._get_gpio_uses('GPIO18'), 0)
+
+    def test_index_sensor_reindex(self):
+        self.init_session(True)
+        self.module._index_sensor({'uuid': '123', 'gpios': [{'uuid': '666-666', 'gpio': 'GPIO18', 'pin': 12}]})
+        self.module._index_sensor({'uuid': '123', 'gpios': [{'uuid': '999-999', 'gpio': 'GPIO4', 'pin': 7}]})
+
+        self.assertDictEqual(self.module._sensors_by_gpio_uuid, {'999-999': ['123']})
+        self.assertDictEqual(self.module._gpio_uses, {'GPIO4': 1})
+
+    def test_gpio_uses_after_add_and_delete(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', self.ADD_GPIO_DATA))
+        self.session.add_mock_command(self.session.make_mock_command('is_reserved_gpio', data=False))
+        self.session.add_mock_command(self.session.make_mock_command('delete_gpio', data=True))
+
+        sensors = self.module.add_sensor('test', 'fake', {'name': 'aname', 'gpio': 'GPIO18'})
+        self.assertEqual(self.module._get_gpio_uses(sensors[0]['gpios'][0]['gpio']), 1)
+
+        self.module.delete_sensor(sensors[0]['uuid'])
+        self.assertDictEqual(self.module._gpio_uses, {})
+
+    """
+    Event
+    """
+    def test_receive_startup_event_rejected(self):
+        self.init_session(True)
+        mock = Mock()
+        self.addon.process_event = mock
+
+        event = {
+            'startup': True,
+            'event': 'system.startup.fake'
+        }
+        self.module.on_event(event)
+        self.assertEqual(mock.call_count, 0, 'Addon process_event should not be called')
+
+    def test_receive_install_driver_event(self):
+        self.init_session(True)
+        self.addon.process_event = Mock()
+
+        install_event = {
+            'startup': False,
+            'event': 'system.driver.install'
+        }
+        self.module.on_event(install_event)
+        self.assertEqual(self.addon.process_event.call_count, 1, 'Addon process_event should be called')
+        self.assertEqual(self.addon.process_event.call_args.args[0], install_event, 'Process_event first param should be event')
+        self.assertIsNone(self.addon.process_event.call_args.args[1], 'Process_event sensors value should be None for driver event')
+
+    def test_receive_uninstall_driver_event(self):
+        self.init_session(True)
+        self.addon.process_event = Mock()
+
+        uninstall_event = {
+            'startup': False,
+            'event': 'system.driver.uninstall'
+        }
+        self.module.on_event(uninstall_event)
+        self.assertEqual(self.addon.process_event.call_count, 1, 'Addon process_event should be called')
+        self.assertEqual(self.addon.process_event.call_args.args[0], uninstall_event, 'Process_event first param should be event')
+        self.assertIsNone(self.addon.process_event.call_args.args[1], 'Process_event sensors value should be None for driver event')
+
+    def test_receive_unhandled_event_rejected(self):
+        self.init_session(True)
+        self.addon.process_event = Mock()
+
+        event = {
+            'startup': False,
+            'event': 'system.fake.event'
+        }
+        self.module.on_event(event)
+
+        self.addon.process_event.assert_not_called()
+        self.assertEqual(self.module.get_events_stats()['unhandled'], 1)
+
+    def test_register_addon_compiles_events(self):
+        self.init_session(True)
+
+        self.assertCountEqual(
+            self.module._dispatcher.get_events(),
+            ['system.driver.install', 'system.driver.uninstall', 'gpios.gpio.on', 'gpios.gpio.off'],
+        )
+        stats = self.module.get_events_stats()
+        self.assertCountEqual(list(stats['handlers'].keys()), ['FakeSensor', 'gpios'])
+
+    def test_receive_event_updates_handler_stats(self):
+        self.init_session(True)
+        self.addon.process_event = Mock()
+
+        self.module.on_event({'startup': False, 'event': 'system.driver.install'})
+        self.module.on_event({'startup': False, 'event': 'system.driver.uninstall'})
+
+        stats = self.module.get_events_stats()
+        self.assertEqual(stats['handlers']['FakeSensor']['calls'], 2)
+        self.assertEqual(stats['handlers']['FakeSensor']['errors'], 0)
+        self.assertEqual(stats['handlers']['gpios']['calls'], 0)
+
+    def test_receive_drop_init_gpio_event(self):
+        self.init_session(True)
+        self.addon.process_event = Mock()
+
+        event = {
+            'event': 'gpios.gpio.on',
+            'startup': False,
+            'params': {
+                'init': True
+            }
+        }
+        self.module.on_event(event)
+        self.assertEqual(self.addon.process_event.call_count, 0, 'Init gpio event should be dropped')
+
+    def test_receive_gpio_event(self):
+        self.init_session(True)
+        mock = Mock()
+        self.addon.process_event = mock
+        self.module._search_by_gpio = Mock(return_value={
+            'uuid': '123-456-789',
+            'type': 'test',
+            'subtype': 'fake',
+            'name': 'aname',
+        })
+
+        event = {
+            'event': 'gpios.gpio.on',
+            'startup': False,
+            'device_id': '123-456-789',
+            'params': {
+                'init': False,
+            }
+        }
+        self.module.on_event(event)
+        self.assertEqual(mock.call_count, 1, 'Addon process_event should be called')
+
+    def test_receive_gpio_event_processed_in_event_lane(self):
+        self.init_session(True)
+        self.module._event_lane = Mock()
+
+        event = {
+            'event': 'gpios.gpio.on',
+            'startup': False,
+            'device_id': '123-456-789',
+            'params': {
+                'init': False,
+            }
+        }
+        self.module.on_event(event)
+
+        self.module._event_lane.submit.assert_called_with(self.module._process_gpio_event, event)
+
+    def test_get_lanes_stats(self):
+        self.init_session(True)
+
+        stats = self.module.get_lanes_stats()
+
+        self.assertCountEqual(list(stats.keys()), ['events', 'polling'])
+        self.assertEqual(stats['events']['workers'], 1)
+        self.assertEqual(stats['polling']['workers'], self.module.POLLING_WORKERS)
+
+    def test_receive_gpio_event_with_no_sensor_found(self):
+        self.init_session(True)
+        mock = Mock()
+        self.addon.process_event = mock
+        self.module._search_by_gpio = Mock(return_value=None)
+
+        event = {
+            'event': 'gpios.gpio.on',
+            'startup': False,
+            'device_id': '123-456-789',
+            'params': {
+                'init': False,
+            }
+        }
+        self.module.on_event(event)
+        self.assertEqual(mock.call_count, 0, 'Addon process_event should not be called')
+
+    def test_receive_gpio_event_with_no_addon_found(self):
+        self.init_session(True)
+        mock = Mock()
+        self.addon.process_event = mock
+        self.module._search_by_gpio = Mock(return_value={
+            'uuid': '123-456-789',
+            'type': 'invalidtype',
+            'subtype': 'fake',
+            'name': 'aname',
+        })
+
+        event = {
+            'event': 'gpios.gpio.on',
+            'startup': False,
+            'device_id': '123-456-789',
+            'params': {
+                'init': False,
+            }
+        }
+        self.module.on_event(event)
+        self.assertEqual(mock.call_count, 0, 'Addon process_event should not be called')
+
+    """
+    Task
+    """
+    def test_start_sensor_task(self):
+        self.init_session(True)
+        sensor = {
+            'name': 'aname',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO18',
+                'pin': 18
+            }],
+            'uuid': '123-456-789'
+        }
+        mock_task = Mock()
+        self.module._start_sensor_task(mock_task, [sensor,])
+        
+        self.assertEqual(len(self.module._tasks_by_device_uuid), 1, 'Start_sensor_task should save task')
+        self.assertEqual(list(self.module._tasks_by_device_uuid.keys())[0], sensor['uuid'], 'Task should be saved with sensor uuid')
+        mock_task.start.assert_called()
+
+    def test_start_sensor_task_warm_start(self):
+        self.init_session(True)
+        sensor = {'name': 'aname', 'uuid': '123-456-789', 'gpios': []}
+        self.module._gpios_by_sensor[sensor['uuid']] = []
+        self.module._update_sensor_fields(sensor['uuid'], {'lastupdate': int(time.time()) - 20})
+        mock_task = Mock(interval=60.0)
+
+        self.module._start_sensor_task(mock_task, [sensor])
+
+        first_run = mock_task.start.call_args.kwargs['first_run']
+        self.assertAlmostEqual(first_run, time.time() + 40, delta=2)
+
+    def test_start_sensor_task_warm_start_clamped(self):
+        self.init_session(True)
+        sensor = {'name': 'aname', 'uuid': '123-456-789', 'gpios': []}
+        self.module._gpios_by_sensor[sensor['uuid']] = []
+        mock_task = Mock(interval=60.0)
+
+        # read long ago
+        self.module._update_sensor_fields(sensor['uuid'], {'lastupdate': int(time.time()) - 3600})
+        self.module._start_sensor_task(mock_task, [sensor])
+        first_run = mock_task.start.call_args.kwargs['first_run']
+        self.assertAlmostEqual(first_run, time.time() + Sensors.WARM_START_MIN_DELAY, delta=1)
+
+        # read in the future (clock changed)
+        self.module._tasks_by_device_uuid.clear()
+        self.module._update_sensor_fields(sensor['uuid'], {'lastupdate': int(time.time()) + 3600})
+        self.module._start_sensor_task(mock_task, [sensor])
+        first_run = mock_task.start.call_args.kwargs['first_run']
+        self.assertAlmostEqual(first_run, time.time() + 60, delta=1)
+
+    def test_start_sensor_task_warm_start_sensor_never_read(self):
+        self.init_session(True)
+        sensor1 = {'name': 'aname', 'uuid': '123-456-789', 'gpios': []}
+        sensor2 = {'name': 'anothername', 'uuid': '987-654-321', 'gpios': []}
+        self.module._gpios_by_sensor[sensor1['uuid']] = []
+        self.module._update_sensor_fields(sensor1['uuid'], {'lastupdate': int(time.time())})
+        mock_task = Mock(interval=60.0)
+
+        self.module._start_sensor_task(mock_task, [sensor1, sensor2])
+
+        mock_task.start.assert_called_with(first_run=None)
+
+    def test_start_sensor_task_without_warm_start(self):
+        self.init_session(True)
+        sensor = {'name': 'aname', 'uuid': '123-456-789', 'gpios': []}
+        self.module._gpios_by_sensor[sensor['uuid']] = []
+        self.module._update_sensor_fields(sensor['uuid'], {'lastupdate': int(time.time())})
+        mock_task = Mock(interval=60.0)
+
+        self.module._start_sensor_task(mock_task, [sensor], warm_start=False)
+
+        mock_task.start.assert_called_with(first_run=None)
+
+    def test_start_sensor_task_with_two_sensors(self):
+        self.init_session(True)
+        sensor1 = {
+            'name': 'aname',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO18',
+                'pin': 18
+            }],
+            'uuid': '123-456-789'
+        }
+        sensor2 = {
+            'name': 'aname2',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO19',
+                'pin': 19
+            }],
+            'uuid': '321-654-987'
+        }
+        mock_task = Mock()
+        self.module._start_sensor_task(mock_task, [sensor1, sensor2])
+        
+        self.assertEqual(len(self.module._tasks_by_device_uuid), 2, 'Start_sensor_task should save task for each sensor')
+        self.assertTrue(all(key in [sensor1['uuid'], sensor2['uuid']] for key in self.module._tasks_by_device_uuid.keys()), 'Task should be saved with sensors uuid')
+        self.assertEqual(self.module._tasks_by_device_uuid[sensor1['uuid']], self.module._tasks_by_device_uuid[sensor2['uuid']], 'Same task should be save for all sensors')
+        mock_task.start.assert_called()
+
+    def test_start_sensor_task_with_no_task(self):
+        self.init_session(True)
+        sensor = {
+            'name': 'aname',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO18',
+                'pin': 18
+            }],
+            'uuid': '123-456-789'
+        }
+        self.module._start_sensor_task(None, [sensor,])
+        
+        self.assertEqual(len(self.module._tasks_by_device_uuid), 0, 'Start_sensor_task should not save task if no task specified')
+
+    def test_stop_sensor_task(self):
+        self.init_session(True)
+        sensor = {
+            'name': 'aname',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO18',
+                'pin': 18
+            }],
+            'uuid': '123-456-789'
+        }
+        mock_task = Mock()
+        mock_task.is_running.return_value = False
+        self.module._start_sensor_task(mock_task, [sensor,])
+        
+        self.module._stop_sensor_task(sensor)
+        
+        self.assertEqual(len(self.module._tasks_by_device_uuid), 0, 'Task should be deleted when stopped')
+        mock_task.stop.assert_called()
+
+    def test_stop_sensor_task_with_unknow_sensor(self):
+        self.init_session(True)
+        sensor = {
+            'name': 'aname',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO18',
+                'pin': 18
+            }],
+            'uuid': '123-456-789'
+        }
+        mock_task = Mock()
+        self.module._start_sensor_task(mock_task, [sensor,])
+        
+        self.module._stop_sensor_task({
+            'name': 'othersensor',
+            'uuid': '666-666-999'
+        })
+        
+        self.assertEqual(len(self.module._tasks_by_device_uuid), 1, 'Task should not be deleted')
+        mock_task.stop.assert_not_called()
+
+    def test_start_sensor_task_aligned_sampling(self):
+        self.init_session(True)
+        self.module._update_config({'alignedsampling': True})
+        self.module._sampler = Mock()
+        sensor = {
+            'name': 'aname',
+            'uuid': '123-456-789'
+        }
+        mock_task = Mock()
+
+        self.module._start_sensor_task(mock_task, [sensor])
+
+        self.module._sampler.add.assert_called_with(mock_task)
+        mock_task.start.assert_not_called()
+        self.assertEqual(self.module._tasks_by_device_uuid[sensor['uuid']], mock_task)
+
+    def test_stop_sensor_task_aligned_sampling(self):
+        self.init_session(True)
+        self.module._update_config({'alignedsampling': True})
+        self.module._sampler = Mock()
+        sensor = {
+            'name': 'aname',
+            'uuid': '123-456-789'
+        }
+        mock_task = Mock()
+        self.module._start_sensor_task(mock_task, [sensor])
+
+        self.module._stop_sensor_task(sensor)
+
+        self.module._sampler.remove.assert_called_with(mock_task)
+        self.assertEqual(len(self.module._tasks_by_device_uuid), 0)
+
+    def test_set_aligned_sampling(self):
+        self.init_session(True)
+        self.module._stop_sensors_tasks = Mock()
+        self.module._start_sensors_tasks = Mock()
+
+        self.assertTrue(self.module.set_aligned_sampling(True))
+
+        self.assertTrue(self.module._get_config_field('alignedsampling'))
+        self.assertTrue(self.module.get_module_config()['alignedsampling'])
+        self.assertTrue(self.module._stop_sensors_tasks.called)
+        self.assertTrue(self.module._start_sensors_tasks.called)
+
+    def test_set_aligned_sampling_invalid_params(self):
+        self.init_session(True)
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.set_aligned_sampling(None)
+        self.assertEqual(cm.exception.message, 'Parameter "enabled" is missing')
+
+    def test_on_snapshot(self):
+        self.init_session(True)
+        snapshot = {
+            'timestamp': 1700000040,
+            'interval': 60,
+            'sensors': {
+                '123-456-789': {'name': 'aname', 'type': 'temperature', 'subtype': 'onewire', 'celsius': 20},
+            },
+        }
+
+        self.module._on_snapshot(snapshot)
+
+        self.assertEqual(self.module.get_sensors_snapshots(), {60: snapshot})
+        self.session.assert_event_called_with('sensors.snapshot.update', snapshot)
+
+    def test_start_sensor_task_set_polling_lane(self):
+        self.init_session(True)
+        sensor = {
+            'name': 'aname',
+            'uuid': '123-456-789'
+        }
+        mock_task = Mock()
+
+        self.module._start_sensor_task(mock_task, [sensor])
+
+        self.assertEqual(mock_task.lane, self.module._polling_lane)
+
+    def test_read_sensor(self):
+        self.init_session(True)
+        sensor = {'uuid': '123-456-789', 'name': 'aname', 'type': 'test', 'subtype': 'fake', 'interval': 60}
+        self.module._get_device = Mock(return_value=sensor)
+        self.module._apply_sensor_demand = Mock()
+
+        result = self.module.read_sensor(sensor['uuid'])
+
+        self.assertEqual(result, sensor)
+        self.assertTrue(self.module._demand.has_demand(sensor['uuid']))
+        self.module._apply_sensor_demand.assert_called_with(sensor['uuid'])
+
+    def test_read_sensor_invalid_params(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value=None)
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.read_sensor(None)
+        self.assertEqual(cm.exception.message, 'Uuid parameter is missing')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.read_sensor('123-456-789')
+        self.assertEqual(cm.exception.message, 'Sensor with uuid "123-456-789" doesn\'t exist')
+
+    def test_subscribe_unsubscribe_sensor(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123-456-789'})
+        self.module._apply_sensor_demand = Mock()
+
+        self.assertTrue(self.module.subscribe_sensor('123-456-789'))
+        self.assertTrue(self.module._demand.has_demand('123-456-789'))
+        self.module._apply_sensor_demand.assert_called_with('123-456-789')
+
+        self.module._apply_sensor_demand.reset_mock()
+        self.assertTrue(self.module.unsubscribe_sensor('123-456-789'))
+        self.assertFalse(self.module._demand.has_demand('123-456-789'))
+        self.module._apply_sensor_demand.assert_called_with('123-456-789')
+
+    def test_subscribe_unsubscribe_sensor_invalid_params(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value=None)
+
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.subscribe_sensor(None)
+        self.assertEqual(cm.exception.message, 'Uuid parameter is missing')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.subscribe_sensor('123-456-789')
+        self.assertEqual(cm.exception.message, 'Sensor with uuid "123-456-789" doesn\'t exist')
+        with self.assertRaises(MissingParameter) as cm:
+            self.module.unsubscribe_sensor(None)
+        self.assertEqual(cm.exception.message, 'Uuid parameter is missing')
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.unsubscribe_sensor('123-456-789')
+        self.assertEqual(cm.exception.message, 'Sensor with uuid "123-456-789" doesn\'t exist')
+
+    def test_set_sensor_always_on(self):
+        self.init_session(True)
+        self.module._get_device = Mock(return_value={'uuid': '123-456-789'})
+
+        self.assertTrue(self.module.set_sensor_always_on('123-456-789', True))
+        self.assertEqual(self.module._get_config_field('alwayson'), ['123-456-789'])
+        self.assertTrue(self.module._demand.has_demand('123-456-789'))
+
+        self.assertTrue(self.module.set_sensor_always_on('123-456-789', False))
+        self.assertEqual(self.module._get_config_field('alwayson'), [])
+        self.assertFalse(self.module._demand.has_demand('123-456-789'))
+
+    def test_set_idle_polling(self):
+        self.init_session(True)
+        self.module._check_sensors_demand = Mock()
+
+        self.assertTrue(self.module.set_idle_polling(True, 1800))
+
+        self.assertTrue(self.module._get_config_field('idlepolling'))
+        self.assertEqual(self.module._get_config_field('idleinterval'), 1800)
+        self.assertTrue(self.module._check_sensors_demand.called)
+
+    def test_set_idle_polling_invalid_params(self):
+        self.init_session(True)
+
+        with self.assertRaises(InvalidParameter) as cm:
+            self.module.set_idle_polling(True, 10)
+        self.assertEqual(cm.exception.message, 'Idle interval must be greater or equal than 60')
+
+    def test_apply_task_demand_without_demand(self):
+        self.init_session(True)
+        self.module._update_config({'idlepolling': True, 'idleinterval': 1800})
+        task = Mock()
+        task.is_running.return_value = True
+        task.interval = 60.0
+        task.sensors = [{'uuid': '123-456-789', 'name': 'aname', 'interval': 60}]
+
+        self.module._apply_task_demand(task)
+
+        task.reconfigure.assert_called_with(interval=1800)
+
+    def test_apply_task_demand_with_demand(self):
+        self.init_session(True)
+        self.module._update_config({'idlepolling': True, 'idleinterval': 1800})
+        task = Mock()
+        task.is_running.return_value = True
+        task.interval = 1800.0
+        task.sensors = [{'uuid': '123-456-789', 'name': 'aname', 'interval': 60}]
+        self.module._demand.touch('123-456-789')
+
+        self.module._apply_task_demand(task)
+
+        task.reconfigure.assert_called_with(interval=60)
+
+    def test_apply_task_demand_idle_polling_disabled(self):
+        self.init_session(True)
+        task = Mock()
+        task.is_running.return_value = True
+        task.interval = 60.0
+        task.sensors = [{'uuid': '123-456-789', 'name': 'aname', 'interval': 60}]
+
+        self.module._apply_task_demand(task)
+
+        task.reconfigure.assert_not_called()
+
+    def test_stop_sensors_tasks_waits_for_tasks(self):
+        self.init_session(True)
+        task = Mock()
+        task.sensors = [{'uuid': '123-456-789', 'type': 'temperature', 'subtype': 'onewire'}]
+        self.module._tasks_by_device_uuid = {'123-456-789': task}
+        onewire = self.module.addons_by_name['SensorOnewire']
+        onewire.cancel_reads = Mock()
+        motion = self.module.addons_by_name['SensorMotionGeneric']
+        motion.cancel_reads = Mock()
+
+        self.module._stop_sensors_tasks()
+
+        task.stop.assert_called_with(wait=False)
+        onewire.cancel_reads.assert_called()
+        motion.cancel_reads.assert_not_called()
+        task.join.assert_called()
+        self.assertLessEqual(task.join.call_args[0][0], self.module.STOP_TIMEOUT)
+        self.assertDictEqual(self.module._tasks_by_device_uuid, {})
+
+    def test_stop_sensors_tasks_logs_overrunning_tasks(self):
+        self.init_session(True)
+        task = Mock()
+        task.sensors = [{'uuid': '123-456-789', 'type': 'temperature', 'subtype': 'onewire'}]
+        task.join.return_value = False
+        self.module._tasks_by_device_uuid = {'123-456-789': task}
+        self.module.logger = Mock()
+
+        self.module._stop_sensors_tasks()
+
+        self.module.logger.warning.assert_called_with('Sensor task [%s] did not stop in time', id(task))
+        self.assertDictEqual(self.module._tasks_by_device_uuid, {})
+
+    def test_set_async_engine(self):
+        self.init_session(True)
+        self.module._stop_sensors_tasks = Mock()
+        self.module._start_sensors_tasks = Mock()
+        self.module._async_engine = Mock()
+
+        self.assertTrue(self.module.set_async_engine(True))
+        self.assertTrue(self.module._get_config_field('asyncengine'))
+        self.assertTrue(self.module._async_engine.start.called)
+        self.assertTrue(self.module._start_sensors_tasks.called)
+
+        self.assertTrue(self.module.set_async_engine(False))
+        self.assertFalse(self.module._get_config_field('asyncengine'))
+        self.assertTrue(self.module._async_engine.stop.called)
+
+    def test_start_sensor_task_set_async_engine(self):
+        self.init_session(True)
+        self.module._update_config({'asyncengine': True})
+        mock_task = Mock()
+
+        self.module._start_sensor_task(mock_task, [{'name': 'aname', 'uuid': '123-456-789'}])
+
+        self.assertEqual(mock_task.engine, self.module._async_engine)
+
+    def test_set_process_isolation(self):
+        self.init_session(True)
+        self.module._stop_sensors_tasks = Mock()
+        self.module._start_sensors_tasks = Mock()
+        self.addon.READERS = ['injected_method']
+
+        self.assertTrue(self.module.set_process_isolation(True))
+        self.assertTrue(self.module._get_config_field('processisolation'))
+        self.assertIsInstance(self.addon.worker, SensorsWorker)
+        self.assertTrue(self.addon.worker.is_running())
+        self.assertTrue(self.module._start_sensors_tasks.called)
+
+        worker = self.addon.worker
+        self.assertTrue(self.module.set_process_isolation(False))
+        self.assertFalse(self.module._get_config_field('processisolation'))
+        self.assertIsNone(self.addon.worker)
+        self.assertFalse(worker.is_running())
+
+    def test_reconfigure_sensor_task(self):
+        self.init_session(True)
+        sensor = {
+            'name': 'aname',
+            'uuid': '123-456-789'
+        }
+        running_task = Mock()
+        running_task.is_running.return_value = True
+        self.module._tasks_by_device_uuid[sensor['uuid']] = running_task
+        updated_sensor = {
+            'name': 'newname',
+            'uuid': '123-456-789'
+        }
+        task = SensorTask(300, Mock(), [updated_sensor])
+
+        self.module._reconfigure_sensor_task(task)
+
+        running_task.reconfigure.assert_called_with(interval=300.0, sensors=[updated_sensor])
+        running_task.stop.assert_not_called()
+        self.assertEqual(self.module._tasks_by_device_uuid[sensor['uuid']], running_task)
+
+    def test_reconfigure_sensor_task_with_no_running_task(self):
+        self.init_session(True)
+        self.module._start_sensor_task = Mock()
+        sensor = {
+            'name': 'aname',
+            'uuid': '123-456-789'
+        }
+        task = SensorTask(300, Mock(), [sensor])
+
+        self.module._reconfigure_sensor_task(task)
+
+        self.module._start_sensor_task.assert_called_with(task, [sensor])
+ 
+    def test_configure_start_sensor_task(self):
+        self.init_session(True)
+        self.session.add_mock_command(self.session.make_mock_command('add_gpio', data=self.ADD_GPIO_DATA))
+
+        data = {
+            'name': 'aname',
+            'gpio': 'GPIO18',
+        }
+        sensors = self.module.add_sensor('test', 'fake', data)
+        added_sensor = sensors[0]
+
+        self.session.respawn_module()
+        # we can't check if task is started because addon cannot be loaded during respawn :(
+
+
+
+
+class SensorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.sensors = Mock()
+        self.sensor = Sensor(self.sensors)
+
+    def test_run_reader(self):
+        self.sensor.fake_reader = Mock(return_value=12)
+
+        self.assertEqual(self.sensor._run_reader('fake_reader', 'arg'), 12)
+        self.sensor.fake_reader.assert_called_with('arg')
+
+    def test_run_reader_with_worker(self):
+        self.sensor.fake_reader = Mock()
+        self.sensor.worker = Mock()
+        self.sensor.worker.call.return_value = 12
+
+        self.assertEqual(self.sensor._run_reader('fake_reader', 'arg'), 12)
+        self.sensor.worker.call.assert_called_with('fake_reader', 'arg')
+        self.sensor.fake_reader.assert_not_called()
+
+    def test_register_driver(self):
+        driver = FakeDriver()
+        self.sensor._register_driver(driver)
+
+        self.sensors._register_driver.assert_called_with(driver)
+        self.assertEqual(len(self.sensor.drivers), 1)
+
+    def test_has_drivers(self):
+        driver = FakeDriver()
+        self.sensor._register_driver(driver)
+
+        self.assertTrue(self.sensor.has_drivers())
+
+    def test_get_event(self):
+        self.sensor._get_event('dummy.event.test')
+
+        self.sensors._get_event.assert_called_with('dummy.event.test')
+
+    def test_send_command(self):
+        self.sensor.send_command('test', 'dummy', {'param': 123}, 5.0)
+
+        self.sensors.send_command.Assert_called_with('test', 'dummy', {'param': 123}, 5.0)
+
+    def test_update_value(self):
+        sensor = {
+            'name': 'aname',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO18',
+                'pin': 18
+            }],
+            'uuid': '123-456-789',
+            'celsius': 20.0,
+            'lastupdate': 123,
+        }
+
+        self.assertTrue(self.sensor.update_value(sensor))
+
+        self.sensors._update_sensor_fields.assert_called_with(sensor['uuid'], {'celsius': 20.0, 'lastupdate': 123})
+
+    def test_update_value_unknown_sensor(self):
+        self.sensors._update_sensor_fields.return_value = None
+
+        self.assertFalse(self.sensor.update_value({'uuid': '123-456-789', 'celsius': 20.0}))
+
+    def test_update_fields(self):
+        self.sensors._update_sensor_fields.return_value = {'celsius': 20.0}
+
+        changed = self.sensor.update_fields('123-456-789', {'celsius': 20.0})
+
+        self.assertDictEqual(changed, {'celsius': 20.0})
+        self.sensors._update_sensor_fields.assert_called_with('123-456-789', {'celsius': 20.0})
+
+    def test_search_device(self):
+        self.sensor._search_device('key', 'value')
+
+        self.sensors._search_device.assert_called_with('key', 'value')
+
+    def test_search_devices(self):
+        self.sensor._search_devices('key', 'value')
+
+        self.sensors._search_devices.assert_called_with('key', 'value')
+
+    def test_search_by_gpio(self):
+        self.sensor._search_by_gpio('GPIO18')
+
+        self.sensors._search_by_gpio.assert_called_with('GPIO18')
+
+    def test_get_device(self):
+        self.sensor._get_device('123-456')
+
+        self.sensors._get_device.assert_called_with('123-456')
+
+    def test_get_device_field(self):
+        self.sensor._get_device_field({'uuid': '123-456'}, 'on')
+
+        self.sensors._get_device_field.assert_called_with({'uuid': '123-456'}, 'on')
+
+    def test_submit_event_job(self):
+        func = Mock()
+        self.sensor._submit_event_job(func, '123-456')
+
+        self.sensors._submit_event_job.assert_called_with(func, '123-456')
+
+    def test_get_assigned_gpios(self):
+        self.sensor._get_assigned_gpios()
+
+        self.assertTrue(self.sensors._get_assigned_gpios.called)
+
+    def test_delete(self):
+        sensor = {
+            'name': 'aname',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO18',
+                'pin': 18
+            }],
+            'uuid': '123-456-789'
+        }
+        data = self.sensor.delete(sensor)
+
+        self.assertDictEqual(data, {
+            'gpios': sensor['gpios'],
+            'sensors': [sensor],
+        })
+
+    def test_get_task(self):
+        sensor = {
+            'name': 'aname',
+            'gpios': [{
+                'uuid': '987-654-321',
+                'gpio': 'GPIO18',
+                'pin': 18
+            }],
+            'uuid': '123-456-789'
+        }
+        mock_task = Mock()
+        self.sensor._get_task = mock_task
+
+        task = self.sensor.get_task(sensor)
+        self.assertEqual(task, mock_task.return_value)
+        mock_task.assert_called_with(sensor)
+
+        # next call should build a new task
+        self.sensor.get_task(sensor)
+        self.assertEqual(mock_task.call_count, 2)
+
+    
+
+
+class SensorTaskTests(unittest.TestCase):
+
+    def setUp(self):
+        self.time_patcher = patch('backend.sensortask.time')
+        self.mock_time = self.time_patcher.start()
+        self.now = 1000.0
+        self.mock_time.time.side_effect = lambda: self.now
+        self.called = Event()
+        self.task_fn = Mock(side_effect=lambda *args: self.called.set())
+        self.sensor = {'uuid': '123-456-789', 'name': 'aname'}
+        self.task = SensorTask(60, self.task_fn, [self.sensor, None])
+
+    def tearDown(self):
+        self.task.stop()
+        self.time_patcher.stop()
+
+    def test_sensors(self):
+        self.assertEqual(self.task.sensors, [self.sensor])
+        self.assertEqual(self.task.task_args, [self.sensor, None])
+
+    def test_start_run_immediately(self):
+        self.task.start()
+
+        self.assertTrue(self.called.wait(1.0))
+        self.assertTrue(self.task.is_running())
+        self.task_fn.assert_called_once_with(self.sensor, None)
+
+    def test_start_with_first_run(self):
+        self.task.start(first_run=1030.0)
+
+        self.assertFalse(self.task_fn.called)
+        self.assertEqual(self.task.next_run, 1030.0)
+
+    def test_stop(self):
+        self.task.start()
+        self.task.stop()
+
+        self.assertFalse(self.task.is_running())
+        self.assertIsNone(self.task.next_run)
+
+    def test_reconfigure(self):
+        self.task.start()
+        self.assertTrue(self.called.wait(1.0))
+        new_sensor = {'uuid': '123-456-789', 'name': 'newname'}
+
+        self.task.reconfigure(interval=120, sensors=[new_sensor])
+
+        self.assertEqual(self.task_fn.call_count, 1, 'Reconfigure should not trigger sensor read')
+        self.assertEqual(self.task.interval, 120.0)
+        self.assertEqual(self.task.sensors, [new_sensor])
+        self.assertEqual(self.task.next_run, 1120.0)
+
+    def test_stop_without_wait(self):
+        event = Event()
+        def task_fn(*args):
+            self.called.set()
+            event.wait(1.0)
+        self.task_fn.side_effect = task_fn
+        self.task.start()
+        self.assertTrue(self.called.wait(1.0))
+
+        self.task.stop(wait=False)
+
+        self.assertFalse(self.task.join(0), 'Stop should not wait for current run')
+        event.set()
+        self.assertTrue(self.task.join(1.0), 'Task should be ended')
+
+    def test_restart_after_stop_without_wait(self):
+        threads = []
+        release = Event()
+        restarted = Event()
+        def task_fn(*args):
+            threads.append(threading.current_thread())
+            if len(threads) == 1:
+                self.called.set()
+                release.wait(1.0)
+            else:
+                restarted.set()
+        self.task_fn.side_effect = task_fn
+        self.task.start()
+        self.assertTrue(self.called.wait(1.0))
+
+        self.task.stop(wait=False)
+        self.task.start()
+        self.assertTrue(restarted.wait(1.0))
+        release.set()
+        threads[0].join(1.0)
+
+        self.assertFalse(threads[0].is_alive(), 'Previous task thread should be ended')
+        self.assertEqual(len(threads), 2, 'Previous task thread should not run task again')
+        self.assertIsNot(threads[0], threads[1])
+
+    def test_start_aligned(self):
+        self.now = 1000.5
+        task = SensorTask(60, self.task_fn, [self.sensor], aligned=True)
+
+        task.start()
+
+        self.task_fn.assert_not_called()
+        self.assertEqual(task.next_run, 1020.0, 'Next run should be on wall-clock boundary')
+        task.stop()
+
+    def test_run_on_lane(self):
+        lane = Mock()
+        self.task.lane = lane
+
+        self.task.run()
+
+        self.assertEqual(lane.submit.call_count, 1)
+        lane.submit.return_value.wait.assert_called()
+
+    def test_run_skipped_when_stopped(self):
+        lane = SensorsLane('test', 1, logging.getLogger('test'))
+        self.task.lane = lane
+        self.task.start(first_run=1060.0)
+        thread = threading.Thread(target=self.task.run)
+        thread.start()
+
+        self.task.stop(wait=False)
+        lane.start()
+        thread.join(1.0)
+        lane.stop()
+
+        self.task_fn.assert_not_called()
+
+    def test_run_on_async_engine(self):
+        engine = SensorsAsyncEngine(logging.getLogger('test'))
+        engine.start()
+        results = []
+        async def async_task(sensor, _):
+            results.append(sensor)
+        task = SensorTask(60, self.task_fn, [self.sensor, None], async_task=async_task)
+        task.engine = engine
+
+        task.run()
+        engine.stop()
+
+        self.assertEqual(results, [self.sensor])
+        self.task_fn.assert_not_called()
+
+    def test_start_on_async_engine(self):
+        engine = SensorsAsyncEngine(logging.getLogger('test'))
+        engine.start()
+        threads = []
+        runs = [Event(), Event()]
+        async def async_task(sensor, _):
+            threads.append(threading.current_thread())
+            runs[len(threads) - 1].set()
+        task = SensorTask(60, self.task_fn, [self.sensor, None], async_task=async_task)
+        task.engine = engine
+        threads_count = threading.active_count()
+
+        task.start()
+        self.assertTrue(runs[0].wait(1.0))
+        self.now = 1060.0
+        task.reconfigure()
+        self.assertTrue(runs[1].wait(1.0), 'Task should run at next deadline')
+        task.reconfigure(interval=120)
+        self.assertEqual(threading.active_count(), threads_count, 'No thread should be started')
+        self.assertEqual(task.next_run, 1180.0, 'Reconfigured interval should be applied')
+        task.stop()
+        engine.stop()
+
+        self.assertEqual(len(threads), 2)
+        self.assertEqual(set(thread.name for thread in threads), {'sensors-asyncengine'})
+        self.assertTrue(task.join(0.1))
+        self.task_fn.assert_not_called()
+
+    def test_stop_on_async_engine(self):
+        engine = SensorsAsyncEngine(logging.getLogger('test'))
+        engine.start()
+        async def async_task(sensor, _):
+            pass
+        task = SensorTask(60, self.task_fn, [self.sensor, None], async_task=async_task)
+        task.engine = engine
+        task.start(first_run=1060.0)
+
+        task.stop()
+
+        self.assertTrue(task.join(0.1), 'Task coroutine should be ended')
+        self.assertIsNone(task.next_run)
+        engine.stop()
+
+    def test_task_exception(self):
+        def task_fn(*args):
+            self.called.set()
+            raise Exception('Test exception')
+        self.task_fn.side_effect = task_fn
+        self.task.start()
+
+        self.assertTrue(self.called.wait(1.0))
+        self.assertTrue(self.task.is_running())
+
+
+
+class SensorsAsyncEngineTests(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = SensorsAsyncEngine(logging.getLogger('test'))
+        self.engine.start()
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def test_blocking_calls_share_bounded_executor(self):
+        threads = set()
+        release = Event()
+        def blocking():
+            release.wait(1.0)
+            threads.add(threading.current_thread().name)
+        async def coroutine():
+            await asyncio.get_running_loop().run_in_executor(None, blocking)
+
+        dones = [self.engine.submit(coroutine) for _ in range(6)]
+        release.set()
+        for done in dones:
+            done.wait(1.0)
+
+        self.assertLessEqual(len(threads), SensorsAsyncEngine.BLOCKING_WORKERS)
+
+    def test_submit(self):
+        results = []
+        async def coroutine(value):
+            await asyncio.sleep(0.05)
+            results.append(value)
+
+        done1 = self.engine.submit(coroutine, 1)
+        done2 = self.engine.submit(coroutine, 2)
+
+        self.assertTrue(done1.wait(1.0))
+        self.assertTrue(done2.wait(1.0))
+        self.assertCountEqual(results, [1, 2])
+
+    def test_submit_exception(self):
+        async def coroutine():
+            raise Exception('Test exception')
+
+        self.assertTrue(self.engine.submit(coroutine).wait(1.0))
+
+    def test_submit_engine_not_running(self):
+        self.engine.stop()
+        coroutine = Mock()
+
+        self.assertTrue(self.engine.submit(coroutine).is_set())
+        coroutine.assert_not_called()
+
+    def test_stop_cancel_coroutines(self):
+        cancelled = Event()
+        async def coroutine():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        started = Event()
+        async def started_coroutine():
+            started.set()
+            await coroutine()
+
+        done = self.engine.submit(started_coroutine)
+        self.assertTrue(started.wait(1.0))
+
+        self.assertTrue(self.engine.stop(1.0))
+        self.assertTrue(done.is_set())
+        self.assertTrue(cancelled.is_set())
+        self.assertFalse(self.engine.is_running())
+
+
+
+class SensorsWorkerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.worker = SensorsWorker('test', {
+            'reader': fake_reader,
+            'failing': fake_failing_reader,
+            'hanging': fake_hanging_reader,
+            'crashing': fake_crashing_reader,
+            'command': fake_command_reader,
+        }, logging.getLogger('test'))
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_call(self):
+        result = self.worker.call('reader', 'test')
+
+        self.assertEqual(result['value'], 'test')
+        self.assertNotEqual(result['pid'], os.getpid(), 'Reader should be run in worker process')
+
+    def test_call_reader_exception(self):
+        with self.assertRaises(RuntimeError) as cm:
+            self.worker.call('failing')
+        self.assertEqual(str(cm.exception), 'ValueError: Test exception')
+        self.assertTrue(self.worker.is_running(), 'Worker should still be running')
+
+    def test_call_timeout(self):
+        with self.assertRaises(RuntimeError) as cm:
+            self.worker.call('hanging', timeout=0.2)
+        self.assertEqual(str(cm.exception), 'Reader "hanging" timed out')
+        self.assertFalse(self.worker.is_running(), 'Hung worker should be killed')
+
+        # worker is restarted on next call
+        self.assertEqual(self.worker.call('reader', 'test')['value'], 'test')
+
+    def test_call_timeout_kills_reader_command(self):
+        pid_path = os.path.join(tempfile.mkdtemp(), 'pid')
+
+        with self.assertRaises(RuntimeError):
+            self.worker.call('command', pid_path, timeout=1.0)
+
+        with open(pid_path) as fd:
+            (worker_pid, command_pid) = [int(pid) for pid in fd.read().split()]
+        try:
+            with open(f'/proc/{command_pid}/stat') as fd:
+                fields = fd.read().rsplit(')', 1)[1].split()
+            # command may still be exiting: it must belong to killed worker process group
+            self.assertEqual(int(fields[2]), worker_pid, 'Reader command should be in worker process group')
+        except FileNotFoundError:
+            pass
+        with self.assertRaises(ProcessLookupError):
+            os.kill(worker_pid, 0)
+
+    def test_call_worker_crashed(self):
+        with self.assertRaises(RuntimeError) as cm:
+            self.worker.call('crashing')
+        self.assertEqual(str(cm.exception), 'Worker "test" died')
+
+        # worker is restarted on next call
+        self.assertEqual(self.worker.call('reader', 'test')['value'], 'test')
+
+    def test_stop(self):
+        self.worker.start()
+        self.assertTrue(self.worker.is_running())
+
+        self.worker.stop()
+
+        self.assertFalse(self.worker.is_running())
+
+    def test_stop_cancels_call(self):
+        errors = []
+        def call():
+            try:
+                self.worker.call('hanging', timeout=10.0)
+            except RuntimeError as error:
+                errors.append(str(error))
+        self.worker.start()
+        thread = threading.Thread(target=call)
+        thread.start()
+        while not self.worker._SensorsWorker__lock.locked():
+            pass
+
+        self.worker.stop(timeout=0.5)
+        thread.join(5.0)
+
+        self.assertEqual(errors, ['Worker "test" died'])
+        self.assertFalse(self.worker.is_running())
+
+
+
+class SensorsDemandTests(unittest.TestCase):
+
+    def setUp(self):
+        self.demand = SensorsDemand(0.2)
+
+    def test_no_demand(self):
+        self.assertFalse(self.demand.has_demand('123'))
+
+    def test_subscribe(self):
+        self.demand.subscribe('123')
+        self.demand.subscribe('123')
+        self.assertTrue(self.demand.has_demand('123'))
+
+        self.demand.unsubscribe('123')
+        self.assertTrue(self.demand.has_demand('123'), 'Sensor should still have a subscriber')
+        self.demand.unsubscribe('123')
+        self.assertFalse(self.demand.has_demand('123'))
+
+    @patch('backend.sensorsdemand.time')
+    def test_touch(self, mock_time):
+        mock_time.time.return_value = 1000.0
+        self.demand.touch('123')
+        self.assertTrue(self.demand.has_demand('123'))
+
+        mock_time.time.return_value = 1000.3
+        self.assertFalse(self.demand.has_demand('123'), 'Read demand should expire')
+
+    def test_always_on(self):
+        self.demand.set_always_on(['123'])
+        self.assertTrue(self.demand.has_demand('123'))
+
+        self.demand.set_always_on([])
+        self.assertFalse(self.demand.has_demand('123'))
+
+    def test_forget(self):
+        self.demand.subscribe('123')
+        self.demand.touch('123')
+        self.demand.set_always_on(['123'])
+
+        self.demand.forget('123')
+
+        self.assertFalse(self.demand.has_demand('123'))
+
+
+
+class SensorsDeadbandTests(unittest.TestCase):
+
+    def setUp(self):
+        self.deadband = SensorsDeadband(3600)
+
+    def test_accept_first_values(self):
+        self.assertTrue(self.deadband.accept('123', {'celsius': 20.0}, now=0))
+
+    def test_accept_invalid_values(self):
+        self.assertFalse(self.deadband.accept('123', {'celsius': None}, now=0))
+
+    def test_accept_default_settings(self):
+        self.deadband.accept('123', {'celsius': 20.0}, now=0)
+
+        self.assertFalse(self.deadband.accept('123', {'celsius': 20.0}, now=10), 'Unchanged value should be filtered')
+        self.assertTrue(self.deadband.accept('123', {'celsius': 20.1}, now=20), 'Changed value should be accepted')
+
+    def test_accept_absolute_deadband(self):
+        self.deadband.set_settings({'123': {'absolute': 0.5}})
+        self.deadband.accept('123', {'celsius': 20.0}, now=0)
+
+        self.assertFalse(self.deadband.accept('123', {'celsius': 20.4}, now=10))
+        self.assertTrue(self.deadband.accept('123', {'celsius': 19.5}, now=20))
+        self.assertFalse(self.deadband.accept('123', {'celsius': 19.9}, now=30), 'Deadband should apply from last reported value')
+
+    def test_accept_relative_deadband(self):
+        self.deadband.set_settings({'123': {'relative': 0.1}})
+        self.deadband.accept('123', {'humidity': 50.0}, now=0)
+
+        self.assertFalse(self.deadband.accept('123', {'humidity': 54.0}, now=10))
+        self.assertTrue(self.deadband.accept('123', {'humidity': 55.0}, now=20))
+
+    def test_accept_heartbeat(self):
+        self.deadband.set_settings({'123': {'absolute': 5.0, 'heartbeat': 600}})
+        self.deadband.accept('123', {'celsius': 20.0}, now=0)
+
+        self.assertFalse(self.deadband.accept('123', {'celsius': 20.0}, now=599))
+        self.assertTrue(self.deadband.accept('123', {'celsius': 20.0}, now=600))
+        self.assertFalse(self.deadband.accept('123', {'celsius': 20.0}, now=700), 'Heartbeat should restart after report')
+
+    def test_accept_null_heartbeat_disables_heartbeat(self):
+        self.deadband.set_settings({'123': {'absolute': 5.0, 'heartbeat': 0}})
+        self.deadband.accept('123', {'celsius': 20.0}, now=0)
+
+        self.assertFalse(self.deadband.accept('123', {'celsius': 20.0}, now=1))
+        self.assertFalse(self.deadband.accept('123', {'celsius': 24.0}, now=100000), 'Deadband should still apply')
+        self.assertTrue(self.deadband.accept('123', {'celsius': 25.0}, now=100001))
+
+    def test_get_settings(self):
+        self.deadband.set_settings({'123': {'absolute': 0.5}})
+
+        self.assertDictEqual(self.deadband.get_settings('123'), {'absolute': 0.5, 'relative': 0.0, 'heartbeat': 3600})
+        self.assertDictEqual(self.deadband.get_settings('456'), {'absolute': 0.0, 'relative': 0.0, 'heartbeat': 3600})
+
+    def test_forget(self):
+        self.deadband.set_settings({'123': {'absolute': 5.0}})
+        self.deadband.accept('123', {'celsius': 20.0}, now=0)
+
+        self.deadband.forget('123')
+
+        self.assertTrue(self.deadband.accept('123', {'celsius': 20.0}, now=10))
+        self.assertEqual(self.deadband.get_settings('123')['absolute'], 0.0)
+
+
+class SensorsBatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        FakeTimer.timers.clear()
+        self.timer_patcher = patch('backend.sensorsbatcher.threading.Timer', FakeTimer)
+        self.timer_patcher.start()
+        self.on_batch = Mock()
+        self.batcher = SensorsBatcher(0.2, self.on_batch, logging.getLogger('batcher'))
+
+    def tearDown(self):
+        self.batcher.flush()
+        self.timer_patcher.stop()
+
+    def test_batch_closed_after_window(self):
+        self.batcher.add('123', 'temperature', {'celsius': 20.0}, 10)
+        self.batcher.add('456', 'humidity', {'humidity': 50.0}, 11)
+        self.assertFalse(self.on_batch.called)
+        self.assertEqual(len(FakeTimer.timers), 1, 'Single window timer should be started')
+        self.assertEqual(FakeTimer.timers[0].interval, 0.2)
+
+        FakeTimer.timers[0].fire()
+
+        self.on_batch.assert_called_once_with(session.AnyArg(), [
+            ['123', 'temperature', {'celsius': 20.0}, 10],
+            ['456', 'humidity', {'humidity': 50.0}, 11],
+        ])
+
+    def test_flush(self):
+        self.batcher.add('123', 'temperature', {'celsius': 20.0}, 10)
+
+        readings = self.batcher.flush()
+        FakeTimer.timers[0].fire()
+
+        self.assertEqual(readings, [['123', 'temperature', {'celsius': 20.0}, 10]])
+        self.assertTrue(FakeTimer.timers[0].cancelled)
+        self.assertEqual(self.on_batch.call_count, 1, 'Flushed batch should not be sent again')
+
+    def test_flush_empty_batch(self):
+        self.assertEqual(self.batcher.flush(), [])
+        self.assertFalse(self.on_batch.called)
+
+    def test_new_batch_after_flush(self):
+        self.batcher.add('123', 'temperature', {'celsius': 20.0}, 10)
+        self.batcher.flush()
+        self.batcher.add('123', 'temperature', {'celsius': 21.0}, 20)
+        FakeTimer.timers[1].fire()
+
+        self.assertEqual(self.on_batch.call_count, 2)
+
+    def test_callback_exception(self):
+        self.on_batch.side_effect = Exception('Test exception')
+        self.batcher.add('123', 'temperature', {'celsius': 20.0}, 10)
+
+        try:
+            self.batcher.flush()
+        except Exception:
+            self.fail('Flush should not fail')
+
+
+class SensorsStatsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = SensorsStats([60])
+
+    def test_add(self):
+        for value in (2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0):
+            self.stats.add('123', {'celsius': value}, now=10)
+
+        stats = self.stats.get('123', now=20)
+
+        self.assertDictEqual(stats[0], {
+            'window': 60,
+            'current': {
+                'uuid': '123',
+                'window': 60,
+                'start': 0,
+                'end': 60,
+                'stats': {'celsius': {'count': 8, 'min': 2.0, 'max': 9.0, 'mean': 5.0, 'variance': 4.0}},
+            },
+            'last': None,
+        })
+
+    def test_add_several_fields(self):
+        self.stats.add('123', {'celsius': 20.0, 'humidity': 50.0}, now=10)
+
+        stats = self.stats.get('123', now=10)[0]['current']['stats']
+
+        self.assertCountEqual(list(stats.keys()), ['celsius', 'humidity'])
+
+    def test_add_ignores_none_values(self):
+        self.stats.add('123', {'celsius': None}, now=10)
+
+        self.assertDictEqual(self.stats.get('123', now=10)[0]['current']['stats'], {})
+
+    def test_several_windows(self):
+        self.stats.set_windows([3600, 60])
+        self.stats.add('123', {'celsius': 20.0}, now=10)
+        self.stats.add('123', {'celsius': 30.0}, now=70)
+
+        stats = self.stats.get('123', now=70)
+
+        self.assertEqual([window_stats['window'] for window_stats in stats], [60, 3600])
+        self.assertEqual(stats[0]['current']['stats']['celsius']['count'], 1)
+        self.assertEqual(stats[0]['last']['stats']['celsius']['mean'], 20.0)
+        self.assertEqual(stats[1]['current']['stats']['celsius']['count'], 2)
+        self.assertEqual(stats[1]['current']['stats']['celsius']['mean'], 25.0)
+
+    def test_window_end(self):
+        self.stats.add('123', {'celsius': 20.0}, now=10)
+
+        stats = self.stats.get('123', now=125)
+
+        self.assertEqual(stats[0]['current']['start'], 120)
+        self.assertDictEqual(stats[0]['current']['stats'], {})
+        self.assertEqual(stats[0]['last']['start'], 0)
+        self.assertEqual(stats[0]['last']['stats']['celsius']['count'], 1)
+
+    def test_roll(self):
+        self.stats.add('123', {'celsius': 20.0}, now=10)
+        self.stats.add('456', {'humidity': 50.0}, now=10)
+
+        self.assertEqual(self.stats.roll(now=30), [])
+        summaries = self.stats.roll(now=60)
+
+        self.assertCountEqual([summary['uuid'] for summary in summaries], ['123', '456'])
+        self.assertEqual(self.stats.roll(now=61), [], 'Summaries should be returned once')
+
+    def test_roll_returns_windows_closed_by_add(self):
+        self.stats.add('123', {'celsius': 20.0}, now=10)
+        self.stats.add('123', {'celsius': 30.0}, now=70)
+
+        summaries = self.stats.roll(now=80)
+
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0]['stats']['celsius']['mean'], 20.0)
+
+    def test_roll_drops_empty_windows(self):
+        self.stats.add('123', {'celsius': None}, now=10)
+
+        self.assertEqual(self.stats.roll(now=60), [])
+
+    def test_forget(self):
+        self.stats.add('123', {'celsius': 20.0}, now=10)
+        self.stats.add('123', {'celsius': 20.0}, now=70)
+
+        self.stats.forget('123')
+
+        stats = self.stats.get('123', now=70)
+        self.assertDictEqual(stats[0]['current']['stats'], {})
+        self.assertIsNone(stats[0]['last'])
+        self.assertEqual(self.stats.roll(now=80), [])
+
+
+
+class SensorsZonesTests(unittest.TestCase):
+
+    def setUp(self):
+        FakeTimer.timers.clear()
+        self.timer_patcher = patch('backend.sensorszones.threading.Timer', FakeTimer)
+        self.timer_patcher.start()
+        self.on_change = Mock()
+        self.zones = SensorsZones(self.on_change, logging.getLogger('zones'))
+        self.zones.set_zones({
+            'living': {'name': 'living', 'sensors': ['123', '456'], 'vacancytimeout': 0},
+        })
+
+    def tearDown(self):
+        self.zones.stop()
+        self.timer_patcher.stop()
+
+    def test_occupied(self):
+        self.zones.update('123', True, now=10)
+
+        self.on_change.assert_called_once_with('living', True, 10, None)
+        self.assertDictEqual(self.zones.get_state('living'), {'occupied': True, 'since': 10, 'active': ['123']})
+
+    def test_sensors_chatter_is_not_reported(self):
+        self.zones.update('123', True, now=10)
+        self.zones.update('456', True, now=11)
+        self.zones.update('123', False, now=12)
+        self.zones.update('123', True, now=13)
+
+        self.assertEqual(self.on_change.call_count, 1)
+
+    def test_vacant(self):
+        self.zones.update('123', True, now=10)
+        self.zones.update('456', True, now=11)
+        self.zones.update('123', False, now=12)
+        self.zones.update('456', False, now=15)
+
+        self.on_change.assert_called_with('living', False, 15, 5)
+        self.assertFalse(self.zones.get_state('living')['occupied'])
+
+    def test_vacancy_timeout(self):
+        self.zones.set_zones({'living': {'name': 'living', 'sensors': ['123'], 'vacancytimeout': 0.2}})
+        self.zones.update('123', True)
+        self.zones.update('123', False)
+        self.assertTrue(self.zones.get_state('living')['occupied'])
+        self.assertEqual(FakeTimer.timers[0].interval, 0.2)
+
+        FakeTimer.timers[0].fire()
+
+        self.assertFalse(self.zones.get_state('living')['occupied'])
+        self.assertEqual(self.on_change.call_count, 2)
+        self.assertFalse(self.on_change.call_args.args[1])
+
+    def test_vacancy_cancelled_by_motion(self):
+        self.zones.set_zones({'living': {'name': 'living', 'sensors': ['123', '456'], 'vacancytimeout': 0.2}})
+        self.zones.update('123', True)
+        self.zones.update('123', False)
+        self.zones.update('456', True)
+
+        FakeTimer.timers[0].fire()
+
+        self.assertTrue(FakeTimer.timers[0].cancelled)
+        self.assertTrue(self.zones.get_state('living')['occupied'])
+        self.assertEqual(self.on_change.call_count, 1)
+
+    def test_sensor_in_several_zones(self):
+        self.zones.set_zones({
+            'living': {'name': 'living', 'sensors': ['123'], 'vacancytimeout': 0},
+            'house': {'name': 'house', 'sensors': ['123', '456'], 'vacancytimeout': 0},
+        })
+
+        self.zones.update('123', True, now=10)
+
+        self.assertEqual(self.on_change.call_count, 2)
+        self.assertTrue(self.zones.get_state('living')['occupied'])
+        self.assertTrue(self.zones.get_state('house')['occupied'])
+
+    def test_unknown_sensor(self):
+        self.zones.update('789', True, now=10)
+
+        self.assertFalse(self.on_change.called)
+
+    def test_set_active_sensors(self):
+        self.zones.set_active_sensors(['456'])
+
+        self.assertTrue(self.zones.get_state('living')['occupied'])
+        self.assertFalse(self.on_change.called)
+
+    def test_set_zones_initializes_new_zone_silently(self):
+        self.zones.update('123', True, now=10)
+        self.on_change.reset_mock()
+
+        self.zones.set_zones({
+            'living': {'name': 'living', 'sensors': ['123', '456'], 'vacancytimeout': 0},
+            'kitchen': {'name': 'kitchen', 'sensors': ['123'], 'vacancytimeout': 0},
+        })
+
+        self.assertTrue(self.zones.get_state('kitchen')['occupied'])
+        self.assertFalse(self.on_change.called)
+
+    def test_set_zones_reevaluates_existing_zone(self):
+        self.zones.update('123', True, now=10)
+
+        self.zones.set_zones({'living': {'name': 'living', 'sensors': ['456'], 'vacancytimeout': 0}})
+
+        self.assertFalse(self.zones.get_state('living')['occupied'])
+        self.assertEqual(self.on_change.call_count, 2)
+
+    def test_set_zones_removes_zone(self):
+        self.zones.set_zones({})
+
+        self.assertIsNone(self.zones.get_state('living'))
+
+    def test_forget(self):
+        self.zones.update('123', True, now=10)
+
+        self.zones.forget('123')
+
+        self.assertFalse(self.zones.get_state('living')['occupied'])
+
+    def test_change_callback_exception(self):
+        self.on_change.side_effect = Exception('Test exception')
+
+        self.zones.update('123', True, now=10)
+
+        self.assertTrue(self.zones.get_state('living')['occupied'])
+
+
+
+class SensorReadingsTests(unittest.TestCase):
+
+    def test_create_smallest_record(self):
+        self.assertIs(type(SensorReadings.create([])), SensorReadings)
+        self.assertIs(type(SensorReadings.create(['celsius', 'lastupdate'])), TemperatureReadings)
+        self.assertIs(type(SensorReadings.create(['humidity'])), HumidityReadings)
+        self.assertIs(type(SensorReadings.create(['on', 'lastduration'])), MotionReadings)
+        self.assertIs(type(SensorReadings.create(['celsius', 'humidity'])), GenericReadings)
+
+    def test_create_invalid_field(self):
+        with self.assertRaises(ValueError):
+            SensorReadings.create(['name'])
+
+    def test_record_is_slotted(self):
+        record = SensorReadings.create(['celsius'])
+
+        self.assertFalse(hasattr(record, '__dict__'))
+        with self.assertRaises(AttributeError):
+            record.name = 'name'
+
+    def test_update_converts_values(self):
+        record = SensorReadings.create(['celsius', 'fahrenheit', 'lastupdate'])
+
+        changed = record.update({'celsius': 20, 'fahrenheit': None, 'lastupdate': 12.7})
+
+        self.assertDictEqual(changed, {'celsius': 20.0, 'fahrenheit': None, 'lastupdate': 12})
+        self.assertIsInstance(record.celsius, float)
+        self.assertIsInstance(record.lastupdate, int)
+
+    def test_update_returns_changed_fields(self):
+        record = SensorReadings.create(['on'], {'on': False, 'lastupdate': 10})
+
+        self.assertDictEqual(record.update({'on': False, 'lastupdate': 11}), {'lastupdate': 11})
+        self.assertDictEqual(record.update({'on': False}), {})
+
+    def test_to_dict(self):
+        record = SensorReadings.create(['humidity'], {'humidity': 55})
+
+        self.assertDictEqual(record.to_dict(), {'humidity': 55.0})
+
+
+class SensorsStateStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=LOG_LEVEL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.path = tempfile.mkdtemp()
+        self.cleep_filesystem = Mock()
+        self.cleep_filesystem.read_json.side_effect = self._read_json
+        self.cleep_filesystem.write_json.side_effect = self._write_json
+        self.cleep_filesystem.open.side_effect = lambda path, mode, encoding=None: open(path, mode, encoding=encoding)
+        self.cleep_filesystem.close.side_effect = lambda fd: fd.close()
+        self.restore_path = os.path.join(self.path, 'restore.json')
+        self.journal_path = os.path.join(self.path, 'journal')
+        self.snapshot_path = os.path.join(self.path, 'shm', 'snapshot.json')
+        self.store = self._create_store()
+
+    def _create_store(self, journal_max_size=SensorsStateStore.JOURNAL_MAX_SIZE):
+        return SensorsStateStore(
+            logging.getLogger('statestore'), self.cleep_filesystem, self.restore_path, self.journal_path, journal_max_size
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _read_json(self, path):
+        with open(path, 'r') as fd:
+            return json.load(fd)
+
+    def _write_json(self, path, data):
+        with open(path, 'w') as fd:
+            json.dump(data, fd)
+        return True
+
+    def test_update_and_get(self):
+        self.store.update('123', {'celsius': 20.0})
+        self.store.update('123', {'lastupdate': 10})
+
+        readings = self.store.get('123')
+        self.assertDictEqual(readings, {'celsius': 20.0, 'lastupdate': 10})
+        readings['celsius'] = 0
+        self.assertEqual(self.store.get('123')['celsius'], 20.0, 'Store should return a copy')
+        self.assertDictEqual(self.store.get('456'), {})
+
+    def test_update_returns_changed_fields(self):
+        self.assertDictEqual(self.store.update('123', {'celsius': 20.0, 'lastupdate': 10}), {'celsius': 20.0, 'lastupdate': 10})
+        self.assertDictEqual(self.store.update('123', {'celsius': 20.0, 'lastupdate': 11}), {'lastupdate': 11})
+        self.assertDictEqual(self.store.update('123', {'celsius': 20.0}), {})
+
+    def test_update_many(self):
+        self.store.update('123', {'celsius': 20.0})
+
+        changed = self.store.update_many({'123': {'celsius': 20.0, 'lastupdate': 10}, '456': {'humidity': 50.0}})
+
+        self.assertDictEqual(changed, {'123': {'lastupdate': 10}, '456': {'humidity': 50.0}})
+        self.assertDictEqual(self.store.get_all(), {
+            '123': {'celsius': 20.0, 'lastupdate': 10},
+            '456': {'humidity': 50.0},
+        })
+
+    def test_update_many_invalid_field(self):
+        with self.assertRaises(ValueError):
+            self.store.update_many({'123': {'celsius': 20.0}, '456': {'dummy': 1}})
+
+        self.assertDictEqual(self.store.get_all(), {}, 'Nothing should be updated')
+
+    def test_dirty_masks(self):
+        self.store.update('123', {'celsius': 20.0})
+        self.store.update('456', {'on': True})
+        self.store.update('123', {'lastupdate': 10})
+
+        self.assertDictEqual(self.store.get_dirty_masks(), {'123': {'celsius', 'lastupdate'}, '456': {'on'}})
+        self.store.snapshot(self.snapshot_path)
+        self.assertDictEqual(self.store.get_dirty_masks(), {})
+
+    def test_unchanged_update_is_noop(self):
+        self.store.update('123', {'celsius': 20.0})
+        self.store.snapshot(self.snapshot_path)
+        self.store.save()
+        self.cleep_filesystem.write_json.reset_mock()
+        os.remove(self.snapshot_path)
+
+        self.store.update('123', {'celsius': 20.0})
+        self.store.snapshot(self.snapshot_path)
+        self.store.save()
+
+        self.assertDictEqual(self.store.get_dirty_masks(), {})
+        self.assertFalse(os.path.exists(self.snapshot_path))
+        self.assertFalse(self.cleep_filesystem.write_json.called)
+
+    def test_update_stores_typed_records(self):
+        self.store.update('123', {'celsius': 20, 'lastupdate': 10})
+        self.store.update('123', {'humidity': 50})
+
+        self.assertDictEqual(self.store.get('123'), {'celsius': 20.0, 'lastupdate': 10, 'humidity': 50.0})
+
+    def test_update_invalid_field(self):
+        with self.assertRaises(ValueError):
+            self.store.update('123', {'name': 'name'})
+
+    def test_remove(self):
+        self.store.update('123', {'celsius': 20.0})
+        self.store.snapshot(self.snapshot_path)
+
+        self.store.remove('123')
+
+        self.assertDictEqual(self.store.get_all(), {})
+        self.assertDictEqual(self.store.get_dirty_masks(), {'123': set()})
+
+    def test_snapshot_and_load(self):
+        self.store.update('123', {'celsius': 20.0})
+
+        self.assertTrue(self.store.snapshot(self.snapshot_path))
+
+        store = self._create_store()
+        self.assertTrue(store.load(self.snapshot_path))
+        self.assertDictEqual(store.get_all(), {'123': {'celsius': 20.0}})
+
+    def test_snapshot_only_when_dirty(self):
+        self.store.update('123', {'celsius': 20.0})
+        self.store.snapshot(self.snapshot_path)
+        os.remove(self.snapshot_path)
+
+        self.store.snapshot(self.snapshot_path)
+
+        self.assertFalse(os.path.exists(self.snapshot_path))
+
+    def test_save_and_load(self):
+        self.store.update('123', {'celsius': 20.0})
+
+        self.assertTrue(self.store.save())
+        self.assertTrue(self.store.save())
+
+        self.assertEqual(self.cleep_filesystem.write_json.call_count, 1, 'Unchanged state should not be saved')
+        store = self._create_store()
+        self.assertTrue(store.load())
+        self.assertDictEqual(store.get_all(), {'123': {'celsius': 20.0}})
+
+    def test_save_failed(self):
+        self.cleep_filesystem.write_json.side_effect = None
+        self.cleep_filesystem.write_json.return_value = False
+        self.store.update('123', {'celsius': 20.0})
+
+        self.assertFalse(self.store.save())
+        self.assertFalse(self.store.save())
+
+        self.assertEqual(self.cleep_filesystem.write_json.call_count, 2, 'Failed save should be retried')
+
+    @patch('backend.sensorsstatestore.time')
+    def test_load_most_recent_state(self, mock_time):
+        mock_time.time.side_effect = range(1000, 1100)
+        self.store.update('123', {'celsius': 20.0})
+        self.store.save()
+        self.store.update('123', {'celsius': 21.0})
+        self.store.snapshot(self.snapshot_path)
+
+        store = self._create_store()
+        store.load(self.snapshot_path)
+
+        self.assertEqual(store.get('123')['celsius'], 21.0)
+
+    def test_load_without_state(self):
+        self.assertFalse(self.store.load(self.snapshot_path))
+        self.assertDictEqual(self.store.get_all(), {})
+
+    def test_append(self):
+        self.store.update('123', {'celsius': 20.0, 'lastupdate': 10})
+        self.assertTrue(self.store.append())
+        self.store.update('123', {'celsius': 21.0, 'lastupdate': 10})
+        self.assertTrue(self.store.append())
+        self.assertTrue(self.store.append())
+
+        with open(self.journal_path) as fd:
+            records = [json.loads(line) for line in fd]
+        self.assertEqual(len(records), 2, 'Unchanged state should not be appended')
+        self.assertEqual(records[0][1], '123')
+        self.assertDictEqual(records[0][2], {'celsius': 20.0, 'lastupdate': 10})
+        self.assertDictEqual(records[1][2], {'celsius': 21.0}, 'Only changed fields should be appended')
+        self.assertFalse(self.cleep_filesystem.write_json.called, 'Restore file should not be written')
+
+    def test_append_and_load(self):
+        self.store.update('123', {'celsius': 20.0, 'lastupdate': 10})
+        self.store.update('456', {'on': True})
+        self.store.append()
+        self.store.update('123', {'celsius': 21.0, 'lastupdate': 11})
+        self.store.remove('456')
+        self.store.append()
+
+        store = self._create_store()
+        self.assertTrue(store.load())
+        self.assertDictEqual(store.get_all(), {'123': {'celsius': 21.0, 'lastupdate': 11}})
+
+    def test_lastupdate_only_change_is_only_snapshotted(self):
+        self.store.update('123', {'celsius': 20.0, 'lastupdate': 10})
+        self.store.append()
+        self.store.save()
+        self.store.snapshot(self.snapshot_path)
+        self.cleep_filesystem.write_json.reset_mock()
+
+        self.store.update('123', {'celsius': 20.0, 'lastupdate': 11})
+
+        self.assertDictEqual(self.store.get_dirty_masks(), {'123': {'lastupdate'}})
+        self.assertTrue(self.store.append())
+        self.assertTrue(self.store.save())
+        self.assertEqual(os.path.getsize(self.journal_path), 0, 'Last update should not be journaled')
+        self.assertFalse(self.cleep_filesystem.write_json.called, 'Restore file should not be written')
+        self.assertTrue(self.store.snapshot(self.snapshot_path))
+        with open(self.snapshot_path) as fd:
+            self.assertEqual(json.load(fd)['readings']['123']['lastupdate'], 11)
+
+    @patch('backend.sensorsstatestore.time')
+    def test_load_replays_journal_over_restore_file(self, mock_time):
+        mock_time.time.side_effect = range(1000, 1100)
+        self.store.update('123', {'celsius': 20.0})
+        self.store.save()
+        self.store.update('123', {'celsius': 21.0})
+        self.store.append()
+
+        store = self._create_store()
+        store.load()
+
+        self.assertEqual(store.get('123')['celsius'], 21.0)
+
+    def test_load_ignores_truncated_journal_record(self):
+        self.store.update('123', {'celsius': 20.0})
+        self.store.append()
+        with open(self.journal_path, 'a') as fd:
+            fd.write('[12345.0, "123", {"cels')
+
+        store = self._create_store()
+        self.assertTrue(store.load())
+
+        self.assertDictEqual(store.get_all(), {'123': {'celsius': 20.0}})
+
+    def test_append_compacts_journal(self):
+        store = self._create_store(journal_max_size=100)
+        for value in range(5):
+            store.update('123', {'celsius': float(value), 'lastupdate': value})
+            store.append()
+
+        self.assertTrue(self.cleep_filesystem.write_json.called, 'Journal should be compacted')
+        self.assertLess(os.path.getsize(self.journal_path), 100)
+        store = self._create_store()
+        store.load()
+        self.assertDictEqual(store.get_all(), {'123': {'celsius': 4.0, 'lastupdate': 4}})
+
+    def test_save_truncates_journal(self):
+        self.store.update('123', {'celsius': 20.0})
+        self.store.append()
+
+        self.assertTrue(self.store.save())
+
+        self.assertEqual(os.path.getsize(self.journal_path), 0)
+
+    def test_append_failed(self):
+        self.cleep_filesystem.open.side_effect = Exception('Test exception')
+        self.store.update('123', {'celsius': 20.0})
+
+        self.assertFalse(self.store.append())
+
+        self.cleep_filesystem.open.side_effect = lambda path, mode, encoding=None: open(path, mode, encoding=encoding)
+        self.assertTrue(self.store.append())
+        with open(self.journal_path) as fd:
+            self.assertEqual(len(fd.readlines()), 1, 'Failed append should be retried')
+
+
+class SensorsLaneTests(unittest.TestCase):
+
+    def setUp(self):
+        self.lane = SensorsLane('test', 1, logging.getLogger('test'))
+        self.lane.start()
+
+    def tearDown(self):
+        self.lane.stop()
+
+    def test_submit(self):
+        func = Mock()
+
+        done = self.lane.submit(func, 'arg1', 'arg2')
+
+        self.assertTrue(done.wait(1.0))
+        func.assert_called_once_with('arg1', 'arg2')
+
+    def test_submit_exception(self):
+        func = Mock(side_effect=Exception('Test exception'))
+
+        done = self.lane.submit(func)
+
+        self.assertTrue(done.wait(1.0), 'Done event should be set even if function failed')
+        self.assertTrue(self.lane.submit(Mock()).wait(1.0), 'Lane should still process jobs')
+
+    @patch('backend.sensorslane.time')
+    def test_get_stats(self, mock_time):
+        mock_time.time.side_effect = range(1000, 1100)
+        event = Event()
+        stats = []
+        self.lane.submit(event.wait, 1.0)
+        self.lane.submit(Mock())
+        self.lane.submit(Mock())
+        event.set()
+
+        # read stats from lane worker, once previous jobs are processed
+        self.lane.submit(lambda: stats.append(self.lane.get_stats())).wait(1.0)
+
+        self.assertEqual(stats[0]['workers'], 1)
+        self.assertEqual(stats[0]['queued'], 0)
+        self.assertEqual(stats[0]['processed'], 3)
+        self.assertGreaterEqual(stats[0]['maxqueued'], 2)
+        self.assertGreater(stats[0]['latency']['max'], 0)
+        self.assertGreater(stats[0]['duration']['max'], 0)
+
+    def test_reset_stats(self):
+        stats = []
+        def reset_stats():
+            self.lane.reset_stats()
+            stats.append(self.lane.get_stats())
+        self.lane.submit(Mock())
+
+        self.lane.submit(reset_stats).wait(1.0)
+
+        self.assertEqual(stats[0]['processed'], 0)
+
+    def test_stop_drops_queued_jobs(self):
+        started = Event()
+        event = Event()
+        def job():
+            started.set()
+            event.wait(1.0)
+        self.lane.submit(job)
+        func = Mock()
+        done = self.lane.submit(func)
+        self.assertTrue(started.wait(1.0))
+
+        self.lane.stop()
+        event.set()
+
+        self.assertTrue(done.is_set(), 'Dropped job waiter should be released')
+        func.assert_not_called()
+
+    def test_submit_after_stop(self):
+        self.lane.stop()
+        func = Mock()
+
+        done = self.lane.submit(func)
+
+        self.assertTrue(done.is_set())
+        func.assert_not_called()
+
+
+
+class SensorsDispatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = SensorsDispatcher(logging.getLogger('test'))
+
+    def test_dispatch(self):
+        handler = Mock()
+        self.dispatcher.register('event.test', 'handler', handler)
+        event = {'event': 'event.test'}
+
+        self.assertTrue(self.dispatcher.dispatch(event))
+
+        handler.assert_called_once_with(event)
+
+    def test_dispatch_several_handlers(self):
+        handler1 = Mock()
+        handler2 = Mock()
+        self.dispatcher.register('event.test', 'handler1', handler1)
+        self.dispatcher.register('event.test', 'handler2', handler2)
+
+        self.dispatcher.dispatch({'event': 'event.test'})
+
+        handler1.assert_called_once()
+        handler2.assert_called_once()
+
+    def test_register_same_handler_twice(self):
+        handler = Mock()
+        self.dispatcher.register('event.test', 'handler', handler)
+        self.dispatcher.register('event.test', 'handler', handler)
+
+        self.dispatcher.dispatch({'event': 'event.test'})
+
+        handler.assert_called_once()
+
+    def test_dispatch_unhandled_event(self):
+        handler = Mock()
+        self.dispatcher.register('event.test', 'handler', handler)
+
+        self.assertFalse(self.dispatcher.dispatch({'event': 'event.other'}))
+
+        handler.assert_not_called()
+        self.assertEqual(self.dispatcher.get_stats()['unhandled'], 1)
+
+    def test_dispatch_handler_exception(self):
+        failing_handler = Mock(side_effect=Exception('Test exception'))
+        handler = Mock()
+        self.dispatcher.register('event.test', 'failing', failing_handler)
+        self.dispatcher.register('event.test', 'handler', handler)
+
+        self.dispatcher.dispatch({'event': 'event.test'})
+
+        handler.assert_called_once()
+        stats = self.dispatcher.get_stats()
+        self.assertEqual(stats['handlers']['failing']['calls'], 1)
+        self.assertEqual(stats['handlers']['failing']['errors'], 1)
+        self.assertEqual(stats['handlers']['handler']['errors'], 0)
+
+    @patch('backend.sensorsdispatcher.time')
+    def test_get_stats(self, mock_time):
+        mock_time.time.side_effect = [1000.0, 1000.5, 1001.0, 1001.25]
+        self.dispatcher.register('event.test', 'handler', Mock())
+
+        self.dispatcher.dispatch({'event': 'event.test'})
+        self.dispatcher.dispatch({'event': 'event.test'})
+
+        stats = self.dispatcher.get_stats()['handlers']['handler']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['duration']['last'], 0.25)
+        self.assertEqual(stats['duration']['max'], 0.5)
+        self.assertEqual(stats['duration']['avg'], 0.375)
+
+    def test_get_events(self):
+        self.dispatcher.register('event.test1', 'handler', Mock())
+        self.dispatcher.register('event.test2', 'handler', Mock())
+
+        self.assertCountEqual(self.dispatcher.get_events(), ['event.test1', 'event.test2'])
+
+    def test_reset_stats(self):
+        self.dispatcher.register('event.test', 'handler', Mock())
+        self.dispatcher.dispatch({'event': 'event.test'})
+        self.dispatcher.dispatch({'event': 'event.other'})
+
+        self.dispatcher.reset_stats()
+
+        stats = self.dispatcher.get_stats()
+        self.assertEqual(stats['unhandled'], 0)
+        self.assertEqual(stats['handlers']['handler']['calls'], 0)
+
+
+
+class SensorsSamplerTests(unittest.TestCase):
+
+    def setUp(self):
+        # group tasks wait for a wall-clock boundary that never comes, ticks are run by tests
+        self.time_patcher = patch('backend.sensortask.time')
+        self.time_patcher.start().time.return_value = 1000.5
+        self.on_snapshot = Mock()
+        self.sampler = SensorsSampler(logging.getLogger('test'), lambda task: task.sensors[0]['bus'], self.on_snapshot)
+
+    def tearDown(self):
+        for task in self.sampler.stop():
+            task.join()
+        self.time_patcher.stop()
+
+    def _read(self, sensor):
+        sensor['celsius'] = 20
+        sensor['lastupdate'] = int(time.time())
+
+    def test_add(self):
+        task1 = SensorTask(60, self._read, [{'uuid': '123', 'bus': 'bus1'}])
+        task2 = SensorTask(60, self._read, [{'uuid': '456', 'bus': 'bus1'}])
+        task3 = SensorTask(120, self._read, [{'uuid': '789', 'bus': 'bus1'}])
+
+        self.sampler.add(task1)
+        self.sampler.add(task2)
+        self.sampler.add(task3)
+
+        tasks = self.sampler.get_tasks()
+        self.assertEqual(len(tasks), 2, 'One group task should be created per interval')
+        self.assertTrue(all(task.aligned for task in tasks))
+        self.assertFalse(task1.is_running(), 'Sensor task should not be started')
+
+    def test_remove(self):
+        task1 = SensorTask(60, self._read, [{'uuid': '123', 'bus': 'bus1'}])
+        task2 = SensorTask(60, self._read, [{'uuid': '456', 'bus': 'bus1'}])
+        self.sampler.add(task1)
+        self.sampler.add(task2)
+
+        self.sampler.remove(task1)
+        self.assertEqual(len(self.sampler.get_tasks()), 1, 'Group task should be kept while it has sensor tasks')
+        self.sampler.remove(task2)
+        self.assertEqual(len(self.sampler.get_tasks()), 0, 'Group task should be stopped')
+
+    def test_tick(self):
+        sensor1 = {'uuid': '123', 'name': 'sensor1', 'type': 'temperature', 'subtype': 'onewire', 'bus': 'bus1', 'path': '/path'}
+        sensor2 = {'uuid': '456', 'name': 'sensor2', 'type': 'temperature', 'subtype': 'dht22', 'bus': 'bus2'}
+        self.sampler.add(SensorTask(1, self._read, [sensor1]))
+        self.sampler.add(SensorTask(1, self._read, [sensor2]))
+        self.assertFalse(self.on_snapshot.called)
+
+        self.sampler.get_tasks()[0].run()
+
+        self.assertEqual(self.on_snapshot.call_count, 1, 'Single snapshot should be built per tick')
+        snapshot = self.on_snapshot.call_args.args[0]
+        self.assertEqual(snapshot['interval'], 1)
+        self.assertEqual(sorted(snapshot['sensors'].keys()), ['123', '456'])
+        self.assertDictEqual(snapshot['sensors']['123'], {
+            'name': 'sensor1',
+            'type': 'temperature',
+            'subtype': 'onewire',
+            'celsius': 20,
+            'lastupdate': session.AnyArg(),
+        })
 
-    
 
 
 class OnewireSensorTests(unittest.TestCase):
@@ -1292,6 +4185,23 @@ class OnewireSensorTests(unittest.TestCase):
         self.assertTrue('interval' in sensor, '"interval" field must exist in onewire sensor')
         self.assertEqual(sensor['interval'], 120, 'Interval should be same than param')
 
+    def test_add_in_batch(self):
+        self.session.add_mock_command(self.session.make_mock_command('get_reserved_gpio', data={
+            'gpio': 'GPIO18',
+            'pin': 18,
+            'uuid': '123-456-789'
+        }))
+        addon = self.get_addon()
+        addon._read_onewire_temperature = Mock(return_value=(20, 68))
+        self.module._batch_cache = {}
+
+        addon.add({"name": 'name1', "device": 'device', "path": 'path', "interval": 120, "offset": 0, "offset_unit": SensorsUtils.TEMP_CELSIUS})
+        res = addon.add({"name": 'name2', "device": 'device', "path": 'path', "interval": 120, "offset": 0, "offset_unit": SensorsUtils.TEMP_CELSIUS})
+
+        self.assertEqual(self.session.command_call_count('get_reserved_gpio'), 1, 'Reserved gpio should be requested once')
+        self.assertEqual(addon._read_onewire_temperature.call_count, 1, 'Probe should be read once')
+        self.assertEqual(res['sensors'][0]['celsius'], 20)
+
     def test_add_invalid_params(self):
         addon = self.get_addon()
         default_search_device = addon._search_device
@@ -1490,6 +4400,85 @@ class OnewireSensorTests(unittest.TestCase):
             'lastupdate': session.AnyArg()
         })
 
+    def test_async_task(self):
+        addon = self.get_addon()
+        path = os.path.join(addon.ONEWIRE_PATH, '28-0000054c2ec2', 'w1_slave')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as f:
+            f.write('7c 01 4b 46 7f ff 04 10 09 : crc=09 YES\n7c 01 4b 46 7f ff 04 10 09 t=23750')
+        sensor = {
+            'lastupdate': 12345678,
+            'uuid': '123-456-789',
+            'name': 'name',
+            'interval': 120,
+            'type': 'temperature',
+            'subtype': 'onewire',
+            'offset': 0,
+            'offsetunit': SensorsUtils.TEMP_CELSIUS,
+            'device': 'xxxxxx',
+            'path': path,
+            'celsius': 22,
+            'fahrenheit': 71,
+        }
+        addon.update_value = Mock()
+
+        asyncio.run(addon._async_task(sensor))
+
+        self.assertEqual(addon.update_value.call_count, 1, 'update_value should be called')
+        self.session.assert_event_called_with('sensors.temperature.update', {
+            'celsius': 23.75,
+            'fahrenheit': 74.75,
+            'sensor': 'name',
+            'lastupdate': session.AnyArg()
+        })
+
+    def test_task_read_failed(self):
+        sensor = {
+            'uuid': '123-456-789',
+            'name': 'name',
+            'interval': 120,
+            'type': 'temperature',
+            'subtype': 'onewire',
+            'offset': 0,
+            'offsetunit': SensorsUtils.TEMP_CELSIUS,
+            'path': 'path',
+        }
+        addon = self.get_addon()
+        addon._read_onewire_temperature = Mock(return_value=(None, None))
+        addon.update_value = Mock()
+
+        addon._task(sensor)
+
+        self.assertFalse(addon.update_value.called)
+        self.assertEqual(self.session.event_call_count('sensors.temperature.update'), 0, 'Event should not be sent')
+
+    def test_task_deadband(self):
+        sensor = {
+            'uuid': '123-456-789',
+            'name': 'name',
+            'interval': 120,
+            'type': 'temperature',
+            'subtype': 'onewire',
+            'offset': 0,
+            'offsetunit': SensorsUtils.TEMP_CELSIUS,
+            'path': 'path',
+        }
+        addon = self.get_addon()
+        self.module._deadband.set_settings({sensor['uuid']: {'absolute': 0.5}})
+        addon._read_onewire_temperature = Mock(side_effect=[(20, 68), (20.2, 68.36), (21, 69.8)])
+        addon.update_value = Mock()
+        addon.update_fields = Mock()
+
+        addon._task(sensor)
+        addon._task(sensor)
+        addon._task(sensor)
+
+        self.assertEqual(addon.update_value.call_count, 2, 'Value in deadband should not be updated')
+        self.assertEqual(self.session.event_call_count('sensors.temperature.update'), 2, 'Value in deadband should not be sent')
+        addon.update_fields.assert_called_once_with(sensor['uuid'], {'lastupdate': session.AnyArg()})
+        stats = self.module._stats.get(sensor['uuid'])
+        self.assertEqual(stats[0]['current']['stats']['celsius']['count'], 3, 'All polled values should be added to stats')
+
     def test_task_update_failed(self):
         sensor = {
             'lastupdate': 12345678,
@@ -1544,7 +4533,7 @@ class OnewireSensorTests(unittest.TestCase):
         task = addon.get_task(sensor)
         logging.info('==> %s', task)
         # self.assertEqual(task, sensor.mock_task)
-        self.assertTrue(isinstance(task, Task), 'Get_task should returns a Task instance')
+        self.assertTrue(isinstance(task, SensorTask), 'Get_task should returns a SensorTask instance')
         self.assertFalse(task.is_running(), 'Task should not be launched')
 
     def test_process_event_install_driver(self):
@@ -1657,6 +4646,9 @@ class MotionGenericSensorTests(unittest.TestCase):
         self.session.add_mock_command(self.session.make_mock_command('is_gpio_on', data=False))
         self.session.start_module(self.module)
 
+        # process event lane jobs synchronously
+        self.module._event_lane.submit = Mock(side_effect=lambda func, *args: func(*args))
+
     def tearDown(self):
         self.session.clean()
 
@@ -1934,6 +4926,181 @@ class MotionGenericSensorTests(unittest.TestCase):
             'duration': 666
         })
 
+    def _mock_update_fields(self, addon, sensor):
+        # apply readings updates to test sensor
+        addon.update_fields = Mock(side_effect=lambda uuid, fields: sensor.update(fields) or fields)
+
+    def _make_motion_sensor(self, on=False, debounce=0, holdtime=0):
+        return {
+            'lastupdate': 12345678,
+            'lastduration': 123,
+            'uuid': '123-456-789',
+            'name': 'name',
+            'type': 'motion',
+            'subtype': 'generic',
+            'on': on,
+            'inverted': False,
+            'debounce': debounce,
+            'holdtime': holdtime,
+            'gpios': [{'gpio':'GPIO18', 'pin':18, 'uuid':'123-456-789'}]
+        }
+
+    def test_process_event_without_session_settings(self):
+        addon = self.get_addon()
+        sensor = self._make_motion_sensor()
+        self._mock_update_fields(addon, sensor)
+
+        addon.process_event({'event': 'gpios.gpio.on', 'params': {}}, sensor)
+        addon.process_event({'event': 'gpios.gpio.off', 'params': {'duration': 666}}, sensor)
+
+        self.assertFalse(sensor['on'])
+        self.assertEqual(sensor['lastduration'], 666, 'Gpio duration should be used')
+        self.assertFalse(self.module._event_lane.submit.called, 'No session timer should be started')
+
+    @patch('backend.sensormotiongeneric.threading.Timer', FakeTimer)
+    def test_process_event_debounce_drops_short_motion(self):
+        FakeTimer.timers.clear()
+        addon = self.get_addon()
+        sensor = self._make_motion_sensor(debounce=0.3)
+        self._mock_update_fields(addon, sensor)
+
+        addon.process_event({'event': 'gpios.gpio.on', 'params': {}}, sensor)
+        addon.process_event({'event': 'gpios.gpio.off', 'params': {'duration': 0.1}}, sensor)
+        FakeTimer.timers[0].fire()
+
+        self.assertTrue(FakeTimer.timers[0].cancelled, 'Debounce timer should be cancelled')
+        self.assertFalse(addon.update_fields.called)
+        self.assertEqual(self.session.event_call_count('sensors.motion.on'), 0, 'Short motion should be ignored')
+        self.assertEqual(self.session.event_call_count('sensors.motion.off'), 0, 'Short motion should be ignored')
+
+    @patch('backend.sensormotiongeneric.threading.Timer', FakeTimer)
+    @patch('backend.sensormotiongeneric.time')
+    def test_process_event_debounce_starts_session(self, mock_time):
+        FakeTimer.timers.clear()
+        mock_time.time.return_value = 1000.0
+        addon = self.get_addon()
+        sensor = self._make_motion_sensor(debounce=0.2)
+        self._mock_update_fields(addon, sensor)
+        addon._get_device = Mock(return_value=sensor)
+
+        addon.process_event({'event': 'gpios.gpio.on', 'params': {}}, sensor)
+        self.assertEqual(self.session.event_call_count('sensors.motion.on'), 0, 'Motion on should be debounced')
+        self.assertEqual(FakeTimer.timers[0].interval, 0.2)
+        mock_time.time.return_value = 1000.2
+        FakeTimer.timers[0].fire()
+
+        self.assertTrue(sensor['on'])
+        self.assertEqual(sensor['lastupdate'], 1000, 'Session should start at first motion')
+        self.assertEqual(self.session.event_call_count('sensors.motion.on'), 1, 'Motion on should be sent after debounce')
+
+    @patch('backend.sensormotiongeneric.threading.Timer', FakeTimer)
+    @patch('backend.sensormotiongeneric.time')
+    def test_process_event_session_timers_run_in_event_lane(self, mock_time):
+        FakeTimer.timers.clear()
+        mock_time.time.return_value = 1000.0
+        addon = self.get_addon()
+        sensor = self._make_motion_sensor(debounce=0.1, holdtime=0.1)
+        self._mock_update_fields(addon, sensor)
+        addon._get_device = Mock(return_value=sensor)
+
+        addon.process_event({'event': 'gpios.gpio.on', 'params': {}}, sensor)
+        FakeTimer.timers[0].fire()
+        mock_time.time.return_value = 1000.3
+        addon.process_event({'event': 'gpios.gpio.off', 'params': {'duration': 0.3}}, sensor)
+        FakeTimer.timers[1].fire()
+
+        self.assertEqual(self.session.event_call_count('sensors.motion.off'), 1)
+        self.assertEqual(sensor['lastduration'], 0.3)
+        funcs = [call[0][0] for call in self.module._event_lane.submit.call_args_list]
+        self.assertListEqual(funcs, [addon._start_session, addon._end_session])
+
+    @patch('backend.sensormotiongeneric.threading.Timer', FakeTimer)
+    def test_process_event_hold_time_retrigger(self):
+        FakeTimer.timers.clear()
+        addon = self.get_addon()
+        sensor = self._make_motion_sensor(holdtime=0.3)
+        self._mock_update_fields(addon, sensor)
+        addon._get_device = Mock(return_value=sensor)
+
+        addon.process_event({'event': 'gpios.gpio.on', 'params': {}}, sensor)
+        addon.process_event({'event': 'gpios.gpio.off', 'params': {'duration': 0.1}}, sensor)
+        addon.process_event({'event': 'gpios.gpio.on', 'params': {}}, sensor)
+        addon.process_event({'event': 'gpios.gpio.off', 'params': {'duration': 0.1}}, sensor)
+        self.assertTrue(sensor['on'], 'Session should stay on during hold time')
+        self.assertEqual(self.session.event_call_count('sensors.motion.off'), 0, 'Motion off should be held')
+        self.assertTrue(FakeTimer.timers[0].cancelled, 'Hold timer should be cancelled by retrigger')
+        FakeTimer.timers[1].fire()
+
+        self.assertFalse(sensor['on'])
+        self.assertEqual(self.session.event_call_count('sensors.motion.on'), 1, 'Session should send one on event')
+        self.assertEqual(self.session.event_call_count('sensors.motion.off'), 1, 'Session should send one off event')
+        self.assertEqual(addon.update_fields.call_count, 2, 'Session should be written twice')
+
+    @patch('backend.sensormotiongeneric.threading.Timer', FakeTimer)
+    def test_process_event_hold_time_deleted_sensor(self):
+        FakeTimer.timers.clear()
+        addon = self.get_addon()
+        sensor = self._make_motion_sensor(holdtime=0.2)
+        self._mock_update_fields(addon, sensor)
+        addon._get_device = Mock(return_value=None)
+
+        addon.process_event({'event': 'gpios.gpio.on', 'params': {}}, sensor)
+        addon.process_event({'event': 'gpios.gpio.off', 'params': {'duration': 0.1}}, sensor)
+        FakeTimer.timers[0].fire()
+
+        self.assertEqual(self.session.event_call_count('sensors.motion.off'), 0)
+
+    @patch('backend.sensormotiongeneric.threading.Timer', FakeTimer)
+    def test_cancel_reads_cancels_sessions(self):
+        FakeTimer.timers.clear()
+        addon = self.get_addon()
+        sensor = self._make_motion_sensor(holdtime=0.2)
+        self._mock_update_fields(addon, sensor)
+        addon._get_device = Mock(return_value=sensor)
+        addon.process_event({'event': 'gpios.gpio.on', 'params': {}}, sensor)
+        addon.process_event({'event': 'gpios.gpio.off', 'params': {'duration': 0.1}}, sensor)
+
+        addon.cancel_reads()
+        FakeTimer.timers[0].fire()
+
+        self.assertTrue(FakeTimer.timers[0].cancelled)
+        self.assertEqual(self.session.event_call_count('sensors.motion.off'), 0)
+
+    def test_add_session_settings(self):
+        self.session.add_mock_command(self.session.make_mock_command('get_reserved_gpio', data={
+            'gpio': 'GPIO18',
+            'pin': 18,
+            'uuid': '123-456-789'
+        }))
+        addon = self.get_addon()
+
+        res = addon.add({"name": 'name', "gpio": 'GPIO18', "inverted": False, "debounce": 1, "holdtime": 30})
+        self.assertEqual(res['sensors'][0]['debounce'], 1)
+        self.assertEqual(res['sensors'][0]['holdtime'], 30)
+
+        res = addon.add({"name": 'name', "gpio": 'GPIO18', "inverted": False})
+        self.assertEqual(res['sensors'][0]['debounce'], 0)
+        self.assertEqual(res['sensors'][0]['holdtime'], 0)
+
+        with self.assertRaises(InvalidParameter) as cm:
+            addon.add({"name": 'name', "gpio": 'GPIO18', "inverted": False, "debounce": -1})
+        self.assertEqual(cm.exception.message, 'Debounce must be positive')
+        with self.assertRaises(InvalidParameter) as cm:
+            addon.add({"name": 'name', "gpio": 'GPIO18', "inverted": False, "holdtime": -1})
+        self.assertEqual(cm.exception.message, 'Hold time must be positive')
+
+    def test_update_session_settings(self):
+        addon = self.get_addon()
+        addon._search_device = lambda k, v: {'name': 'name'} if k == 'uuid' else None
+        sensor = self._make_motion_sensor(debounce=1, holdtime=30)
+
+        res = addon.update(copy.deepcopy(sensor), {"name": "name", "inverted": False})
+        self.assertEqual(res['sensors'][0]['debounce'], 1, 'Debounce should be kept')
+        self.assertEqual(res['sensors'][0]['holdtime'], 30, 'Hold time should be kept')
+
+        res = addon.update(copy.deepcopy(sensor), {"name": "name", "inverted": False, "holdtime": 60})
+        self.assertEqual(res['sensors'][0]['holdtime'], 60)
+
     def test_process_event_gpio_off_not_triggered(self):
         event = {
             'startup': False,
@@ -1993,42 +5160,38 @@ class Dht22SensorTests(unittest.TestCase):
 
     def test_get_dht22_devices(self):
         addon = self.get_addon()
-        addon._search_devices = lambda k,v: [
-            {
-                'uuid': '123-456-789',
-                'type': 'temperature',
-                'subtype': 'dht22',
-                'name': 'test'
-            },
-            {
-                'uuid': '456-789-123',
-                'type': 'motion',
-                'subtype': 'invalid',
-                'name': 'test'
-            },
-            {
-                'uuid': '789-456-132',
-                'type': 'humidity',
-                'subtype': 'dht22',
-                'name': 'test'
-            },
-            {
-                'uuid': '789-123-456',
-                'type': 'humidity',
-                'subtype': 'invalid',
-                'name': 'noname'
-            },
-        ]
+        addon._get_channels = Mock(return_value={
+            'temperature': {'uuid': '123-456-789', 'type': 'temperature', 'subtype': 'dht22', 'name': 'test'},
+            'humidity': {'uuid': '789-456-132', 'type': 'humidity', 'subtype': 'dht22', 'name': 'test'},
+        })
+        sensor = {'uuid': '123-456-789'}
 
-        (temp, hum) = addon._get_dht22_devices('name')
+        (temp, hum) = addon._get_dht22_devices(sensor)
+        addon._get_channels.assert_called_with(sensor)
         self.assertIsNotNone(temp, 'Temperature device should be found')
         self.assertIsNotNone(hum, 'Humidity device should be found')
-        self.assertEqual(temp['name'], 'test', 'Temperature device should have searched name')
-        self.assertEqual(hum['name'], 'test', 'Humidity device should have searched name')
         self.assertEqual(temp['type'], 'temperature', 'Temperature device should have temperature type')
         self.assertEqual(hum['type'], 'humidity', 'Humidity device should have humidity type')
-        self.assertEqual(temp['subtype'], 'dht22', 'Temperature device should have dht22 subtype')
-        self.assertEqual(hum['subtype'], 'dht22', 'Humidity device should have dht22 subtype')
+
+    def test_get_dht22_devices_single_channel(self):
+        addon = self.get_addon()
+        addon._get_channels = Mock(return_value={
+            'humidity': {'uuid': '789-456-132', 'type': 'humidity', 'subtype': 'dht22', 'name': 'test'},
+        })
+
+        (temp, hum) = addon._get_dht22_devices({'uuid': '789-456-132'})
+        self.assertIsNone(temp)
+        self.assertEqual(hum['uuid'], '789-456-132')
+
+    def test_add_links_channels_to_physical_device(self):
+        addon = self.get_addon()
+        addon._search_device = Mock(return_value=None)
+
+        res = addon.add({'name': 'name', 'gpio': 'GPIO18', 'interval': 60, 'offset': 0, 'offset_unit': SensorsUtils.TEMP_CELSIUS})
+
+        (temp, hum) = res['sensors']
+        self.assertIsNotNone(temp['physicaluuid'])
+        self.assertEqual(temp['physicaluuid'], hum['physicaluuid'])
 
     def test_read_dht22(self):
         addon = self.get_addon()
@@ -2488,7 +5651,7 @@ class Dht22SensorTests(unittest.TestCase):
         addon._get_dht22_devices = lambda n: (temp, hum)
 
         task = addon.get_task(temp)
-        self.assertTrue(isinstance(task, Task), 'Get_task should returns a Task instance')
+        self.assertTrue(isinstance(task, SensorTask), 'Get_task should returns a SensorTask instance')
         self.assertFalse(task.is_running(), 'Task should not be launched')
 
     def test_task(self):
@@ -2507,7 +5670,7 @@ class Dht22SensorTests(unittest.TestCase):
         }
         hum = {
             'lastupdate': 12345678,
-            'uuid': '123-456-789',
+            'uuid': '987-654-321',
             'name': 'name',
             'type': 'humidity',
             'subtype': 'dht22',
@@ -2517,14 +5680,63 @@ class Dht22SensorTests(unittest.TestCase):
         }
         addon = self.get_addon()
         addon._read_dht22 = Mock(return_value=(30, 86, 69))
-        mock_update_value = Mock()
-        addon.update_value = mock_update_value
+        mock_update_channels = Mock(return_value={})
+        addon.update_channels = mock_update_channels
 
         addon._task(temp, hum)
-        self.assertEqual(mock_update_value.call_count, 2, 'Update_value should be called')
+        self.assertEqual(mock_update_channels.call_count, 1, 'Update_channels should be called once')
+        mock_update_channels.assert_called_with({
+            '123-456-789': {'celsius': 30, 'fahrenheit': 86, 'lastupdate': session.AnyArg()},
+            '987-654-321': {'humidity': 69, 'lastupdate': session.AnyArg()},
+        })
         self.assertEqual(self.session.event_call_count('sensors.temperature.update'), 1, 'Temperature event should be called')
         self.assertEqual(self.session.event_call_count('sensors.humidity.update'), 1, 'Humidity event should be called')
 
+    def test_async_task(self):
+        temp = {
+            'lastupdate': 12345678,
+            'uuid': '123-456-789',
+            'name': 'name',
+            'type': 'temperature',
+            'subtype': 'dht22',
+            'interval': 100,
+            'offset': 0,
+            'offsetunit': SensorsUtils.TEMP_CELSIUS,
+            'gpios': [{'gpio':'GPIO18', 'pin':18, 'uuid':'123-456-789'}],
+            'celsius': 20,
+            'fahrenheit': 68,
+        }
+        hum = {
+            'lastupdate': 12345678,
+            'uuid': '987-654-321',
+            'name': 'name',
+            'type': 'humidity',
+            'subtype': 'dht22',
+            'interval': 100,
+            'gpios': [{'gpio':'GPIO18', 'pin':18, 'uuid':'123-456-789'}],
+            'humidity': 58,
+        }
+        addon = self.get_addon()
+        async def execute_command(sensor):
+            return {'error': '', 'celsius': 30, 'humidity': 69}
+        addon._async_execute_command = execute_command
+        addon.update_channels = Mock(return_value={})
+
+        asyncio.run(addon._async_task(temp, hum))
+
+        self.assertEqual(addon.update_channels.call_count, 1, 'Update_channels should be called once')
+        self.session.assert_event_called_with('sensors.temperature.update', {
+            'celsius': 30,
+            'fahrenheit': 86,
+            'sensor': 'name',
+            'lastupdate': session.AnyArg()
+        })
+        self.session.assert_event_called_with('sensors.humidity.update', {
+            'humidity': 69,
+            'sensor': 'name',
+            'lastupdate': session.AnyArg()
+        })
+
     def test_task_temperature_only(self):
         temp = {
             'lastupdate': 12345678,
@@ -2541,11 +5753,11 @@ class Dht22SensorTests(unittest.TestCase):
         }
         addon = self.get_addon()
         addon._read_dht22 = lambda s: (30, 86, 69)
-        mock_update_value = Mock()
-        addon.update_value = mock_update_value
+        mock_update_channels = Mock(return_value={})
+        addon.update_channels = mock_update_channels
 
         addon._task(temp, None)
-        self.assertEqual(mock_update_value.call_count, 1, 'Update_value should be called')
+        self.assertEqual(mock_update_channels.call_count, 1, 'Update_channels should be called')
         self.assertEqual(self.session.event_call_count('sensors.temperature.update'), 1, 'Temperature event should be called')
         self.assertEqual(self.session.event_call_count('sensors.humidity.update'), 0, 'Humidity event should not be called')
         self.session.assert_event_called_with('sensors.temperature.update', {
@@ -2568,11 +5780,11 @@ class Dht22SensorTests(unittest.TestCase):
         }
         addon = self.get_addon()
         addon._read_dht22 = Mock(return_value=(30, 86, 69))
-        mock_update_value = Mock()
-        addon.update_value = mock_update_value
+        mock_update_channels = Mock(return_value={})
+        addon.update_channels = mock_update_channels
 
         addon._task(None, hum)
-        self.assertEqual(mock_update_value.call_count, 1, 'Update_value should be called')
+        self.assertEqual(mock_update_channels.call_count, 1, 'Update_channels should be called')
         self.assertEqual(self.session.event_call_count('sensors.temperature.update'), 0, 'Temperature event should not be called')
         self.assertEqual(self.session.event_call_count('sensors.humidity.update'), 1, 'Humidity event should be called')
         self.session.assert_event_called_with('sensors.humidity.update', {
@@ -2581,6 +5793,41 @@ class Dht22SensorTests(unittest.TestCase):
             'lastupdate': session.AnyArg()
         })
 
+    def test_task_deadband(self):
+        temp = {
+            'uuid': '123-456-789',
+            'name': 'name',
+            'type': 'temperature',
+            'subtype': 'dht22',
+            'interval': 100,
+            'offset': 0,
+            'offsetunit': SensorsUtils.TEMP_CELSIUS,
+            'gpios': [{'gpio':'GPIO18', 'pin':18, 'uuid':'123-456-789'}],
+        }
+        hum = {
+            'uuid': '987-654-321',
+            'name': 'name',
+            'type': 'humidity',
+            'subtype': 'dht22',
+            'interval': 100,
+            'gpios': [{'gpio':'GPIO18', 'pin':18, 'uuid':'123-456-789'}],
+        }
+        addon = self.get_addon()
+        addon._read_dht22 = Mock(side_effect=[(20, 68, 50), (20, 68, 55)])
+        addon.update_channels = Mock(return_value={})
+
+        addon._task(temp, hum)
+        addon._task(temp, hum)
+
+        addon.update_channels.assert_called_with({
+            '123-456-789': {'lastupdate': session.AnyArg()},
+            '987-654-321': {'humidity': 55, 'lastupdate': session.AnyArg()},
+        })
+        self.assertEqual(self.session.event_call_count('sensors.temperature.update'), 1, 'Unchanged temperature should not be sent')
+        self.assertEqual(self.session.event_call_count('sensors.humidity.update'), 2, 'Changed humidity should be sent')
+        stats = self.module._stats.get(temp['uuid'])
+        self.assertEqual(stats[0]['current']['stats']['celsius']['count'], 2, 'All polled values should be added to stats')
+
     def test_task_no_data_read(self):
         temp = {
             'lastupdate': 12345678,
@@ -2597,7 +5844,7 @@ class Dht22SensorTests(unittest.TestCase):
         }
         hum = {
             'lastupdate': 12345678,
-            'uuid': '123-456-789',
+            'uuid': '987-654-321',
             'name': 'name',
             'type': 'humidity',
             'subtype': 'dht22',
@@ -2607,11 +5854,11 @@ class Dht22SensorTests(unittest.TestCase):
         }
         addon = self.get_addon()
         addon._read_dht22 = Mock(return_value=(None, None, None))
-        addon.update_value = Mock()
+        addon.update_channels = Mock()
 
         addon._task(temp, hum)
 
-        self.assertFalse(addon.update_value.called)
+        self.assertFalse(addon.update_channels.called)
 
 
 
@@ -2760,6 +6007,66 @@ class TestsSensorsMotionOnEvent(unittest.TestCase):
 
 
 
+class TestsSensorsSnapshotUpdateEvent(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=LOG_LEVEL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.session = session.TestSession(self)
+        self.event = self.session.setup_event(SensorsSnapshotUpdateEvent)
+
+    def test_event_params(self):
+        self.assertCountEqual(self.event.EVENT_PARAMS, ['timestamp', 'interval', 'sensors'])
+
+
+
+class TestsSensorsReadingsBatchEvent(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=LOG_LEVEL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.session = session.TestSession(self)
+        self.event = self.session.setup_event(SensorsReadingsBatchEvent)
+
+    def test_event_params(self):
+        self.assertCountEqual(self.event.EVENT_PARAMS, ['timestamp', 'readings'])
+
+
+
+class TestsSensorsStatsSummaryEvent(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=LOG_LEVEL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.session = session.TestSession(self)
+        self.event = self.session.setup_event(SensorsStatsSummaryEvent)
+
+    def test_event_params(self):
+        self.assertCountEqual(self.event.EVENT_PARAMS, ['window', 'start', 'end', 'stats'])
+
+
+
+class TestsSensorsZoneOccupiedEvent(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=LOG_LEVEL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.session = session.TestSession(self)
+        self.event = self.session.setup_event(SensorsZoneOccupiedEvent)
+
+    def test_event_params(self):
+        self.assertCountEqual(self.event.EVENT_PARAMS, ['zone', 'lastupdate'])
+
+
+
+class TestsSensorsZoneVacantEvent(unittest.TestCase):
+
+    def setUp(self):
+        logging.basicConfig(level=LOG_LEVEL, format=u'%(asctime)s %(name)s:%(lineno)d %(levelname)s : %(message)s')
+        self.session = session.TestSession(self)
+        self.event = self.session.setup_event(SensorsZoneVacantEvent)
+
+    def test_event_params(self):
+        self.assertCountEqual(self.event.EVENT_PARAMS, ['zone', 'lastupdate', 'duration'])
+
+
+
 class TestsSensorsMotionOffEvent(unittest.TestCase):
 
     def setUp(self):